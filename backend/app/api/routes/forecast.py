@@ -1,13 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime, timedelta
+import time
+
+import numpy as np
 import structlog
 from pydantic import BaseModel, Field
 
-from app.database import get_db
-from app.services.forecasting_service import ForecastingService
+from app.database import get_db, get_read_db
+from app.services.forecasting_service import TILE_HOURS, ForecastingService
+from app.services.station_service import StationService
 from app.services.spatial_service import SpatialService
+from app.services.tiles import MAX_ZOOM, get_tile
 
 logger = structlog.get_logger()
 
@@ -31,10 +36,58 @@ class ForecastResponse(BaseModel):
     model_version: str
 
 
+class QuadTreeEncoding(BaseModel):
+    """Adaptive grid layout (see app.services.quadtree for the node encoding).
+
+    Leaves are blocks of ``size`` x ``size`` uniform-grid cells. ``structure`` holds
+    2 bits per node breadth first from ``roots`` root blocks of ``root_cells`` cells;
+    leaf centres are listed in the same order as the values.
+
+    ``evaluated_cells`` / ``elapsed_ms`` are the adaptive cost, ``uniform_cells`` /
+    ``uniform_estimate_ms`` the uniform grid's. The uniform time is an estimate (the
+    per-cell model time of the largest refinement level x ``uniform_cells``), not a
+    second run; benchmarks/bench_quadtree.py times both for real.
+    """
+
+    root_cells: int
+    roots: List[int]
+    nodes: int
+    structure: str
+    leaf_sizes: List[int]
+    levels: int
+    threshold: float
+    evaluated_cells: int
+    uniform_cells: int
+    elapsed_ms: float
+    uniform_estimate_ms: float
+
+
 class HyperLocalForecastResponse(BaseModel):
+    """Column-oriented grid forecast: one entry per cell within the radius.
+
+    ``cell_index`` is each cell's row-major position in the ``shape`` raster (rows
+    south to north, columns west to east); ``aqi`` and ``pm2_5`` are [hour][cell].
+    In adaptive mode the entries are quadtree leaves instead: ``quadtree`` describes
+    them, ``latitudes`` / ``longitudes`` are leaf centres and ``cell_index`` /
+    ``cell_ids`` are omitted.
+    """
+
     center_location: LocationInput
     grid_size_km: float
-    grid_forecasts: List[List[dict]]
+    radius_km: float
+    mode: str = "uniform"
+    shape: List[int]
+    cell_index: Optional[List[int]] = None
+    latitudes: List[float]
+    longitudes: List[float]
+    cell_ids: Optional[List[int]] = None
+    quadtree: Optional[QuadTreeEncoding] = None
+    times: List[datetime]
+    aqi: List[List[int]]
+    pm2_5: List[List[float]]
+    # Per-cell plume contribution, only when requested with ``dispersion=true``
+    dispersion_pm2_5: Optional[List[float]] = None
+    dispersion_sources: Optional[int] = None
     timestamp: datetime
     forecast_horizon_hours: int
 
@@ -105,6 +158,9 @@ async def get_hyperlocal_forecast(
     radius_km: float = Query(5, ge=1, le=50, description="Radius in kilometers"),
     resolution_km: float = Query(1, ge=0.5, le=5, description="Grid resolution in km"),
     hours: int = Query(24, ge=1, le=72, description="Forecast horizon in hours"),
+    dispersion: bool = Query(False, description="Include plume dispersion from fires and fixed sources"),
+    mode: str = Query("uniform", pattern="^(uniform|adaptive)$", description="Uniform grid or quadtree"),
+    threshold: float = Query(10, gt=0, description="Adaptive mode: AQI difference that splits a block"),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -113,8 +169,13 @@ async def get_hyperlocal_forecast(
     Provides:
     - Spatial grid of AQI forecasts
     - 1km x 1km resolution predictions
-    - Kriging spatial interpolation
-    - Wind dispersion modeling
+    - Adaptive mode: coarse blocks refined down to ``resolution_km`` only where
+      neighbouring blocks differ by more than ``threshold`` AQI
+    - Wind dispersion modeling: with ``dispersion=true``, ``dispersion_pm2_5`` holds the
+      Gaussian plume PM2.5 contribution (ug/m3) of active fires and fixed sources per
+      cell, under the current station winds (uniform mode only)
+
+    Interpolated station observations (kriging / IDW) are served by /forecast/surface.
     """
     try:
         logger.info(
@@ -123,35 +184,70 @@ async def get_hyperlocal_forecast(
             center_lon=center_lon,
             radius_km=radius_km,
             resolution_km=resolution_km,
+            mode=mode,
         )
 
         spatial_service = SpatialService(db)
         forecasting_service = ForecastingService(db)
 
-        # Generate spatial grid
-        grid_points = spatial_service.generate_grid(
-            center_lat, center_lon, radius_km, resolution_km
+        # Generate spatial grid, clipped to the requested radius
+        grid = spatial_service.generate_grid(
+            center_lat, center_lon, radius_km, resolution_km, clip=True
         )
-
-        # Get forecasts for each grid point
-        grid_forecasts = []
-        for row in grid_points:
-            row_forecasts = []
-            for point in row:
-                forecast = await forecasting_service.get_point_forecast(
-                    point["lat"], point["lon"], hours
-                )
-                row_forecasts.append(forecast)
-            grid_forecasts.append(row_forecasts)
-
-        return HyperLocalForecastResponse(
+        common = dict(
             center_location=LocationInput(latitude=center_lat, longitude=center_lon),
             grid_size_km=resolution_km,
-            grid_forecasts=grid_forecasts,
+            radius_km=radius_km,
+            mode=mode,
+            shape=list(grid.shape),
             timestamp=datetime.utcnow(),
             forecast_horizon_hours=hours,
         )
 
+        if mode == "adaptive":
+            forecast = await forecasting_service.get_adaptive_forecast(grid, hours, threshold)
+            tree = forecast["tree"]
+            lat, lon = tree.leaf_centres()
+            return HyperLocalForecastResponse(
+                **common,
+                latitudes=np.round(lat, 6).tolist(),
+                longitudes=np.round(lon, 6).tolist(),
+                quadtree=QuadTreeEncoding(
+                    root_cells=tree.root_cells,
+                    roots=list(tree.roots),
+                    nodes=len(tree.codes),
+                    structure=tree.structure(),
+                    leaf_sizes=tree.leaf_size.tolist(),
+                    levels=tree.levels,
+                    threshold=threshold,
+                    evaluated_cells=tree.evaluated,
+                    uniform_cells=grid.size,
+                    elapsed_ms=round(tree.elapsed_seconds * 1000, 2),
+                    uniform_estimate_ms=round(tree.uniform_estimate_seconds * 1000, 2),
+                ),
+                times=forecast["times"],
+                aqi=tree.values["aqi"].tolist(),
+                pm2_5=tree.values["pm2_5"].tolist(),
+            )
+
+        # Forecast every cell in one vectorized call
+        forecast = await forecasting_service.get_grid_forecast(grid, hours)
+        lat, lon = grid.points()
+        plume = forecasting_service.get_dispersion(grid) if dispersion else None
+
+        return HyperLocalForecastResponse(
+            **common,
+            cell_index=grid.index.tolist(),
+            latitudes=np.round(lat, 6).tolist(),
+            longitudes=np.round(lon, 6).tolist(),
+            cell_ids=grid.cell_ids[grid.mask].tolist(),
+            times=forecast["times"],
+            aqi=forecast["aqi"].tolist(),
+            pm2_5=forecast["pm2_5"].tolist(),
+            dispersion_pm2_5=plume["pm2_5"].tolist() if plume else None,
+            dispersion_sources=plume["sources"] if plume else None,
+        )
+
     except Exception as e:
         logger.error("Error fetching hyperlocal forecast", error=str(e))
         raise HTTPException(
@@ -159,6 +255,102 @@ async def get_hyperlocal_forecast(
         )
 
 
+@router.get("/tiles/{z}/{x}/{y}.png", response_class=Response)
+async def get_heatmap_tile(
+    z: int,
+    x: int,
+    y: int,
+    hour: int = Query(0, ge=0, lt=TILE_HOURS, description="Forecast hour, 0 = current hour"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """AQI heatmap as an XYZ (Web Mercator, 256 px) PNG map tile.
+
+    Rendered from the regional hourly forecast raster (see
+    ForecastingService.get_tile_field) and cached per tile, forecast hour and forecast
+    run. Responses carry an ETag; a matching If-None-Match gets 304 Not Modified.
+    Tiles outside the forecast area are transparent.
+    """
+    if not 0 <= z <= MAX_ZOOM or not (0 <= x < 1 << z and 0 <= y < 1 << z):
+        raise HTTPException(status_code=404, detail="No such tile")
+    try:
+        field, version = await ForecastingService(db).get_tile_field()
+        tile = get_tile(field, version, hour, z, x, y)
+    except Exception as e:
+        logger.error("Error rendering heatmap tile", error=str(e), z=z, x=x, y=y)
+        raise HTTPException(status_code=500, detail="Failed to render tile")
+
+    # Cacheable until the next forecast run at the top of the hour
+    max_age = 3600 - int(time.time()) % 3600
+    headers = {"ETag": tile.etag, "Cache-Control": f"public, max-age={max_age}"}
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or tile.etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    ):
+        return Response(status_code=304, headers=headers)
+    return Response(content=tile.png, media_type="image/png", headers=headers)
+
+
+class SurfaceResponse(BaseModel):
+    """Interpolated observations in the same column layout as the hyperlocal grid;
+    ``values`` is [hour][cell]."""
+
+    center_location: LocationInput
+    grid_size_km: float
+    radius_km: float
+    method: str
+    field: str
+    stations: int
+    shape: List[int]
+    cell_index: List[int]
+    latitudes: List[float]
+    longitudes: List[float]
+    cell_ids: List[int]
+    times: List[datetime]
+    values: List[List[float]]
+
+
+@router.get("/surface", response_model=SurfaceResponse)
+async def get_observed_surface(
+    center_lat: float = Query(..., ge=-90, le=90, description="Center latitude"),
+    center_lon: float = Query(..., ge=-180, le=180, description="Center longitude"),
+    radius_km: float = Query(10, ge=1, le=100, description="Radius in kilometers"),
+    resolution_km: float = Query(1, ge=0.5, le=5, description="Grid resolution in km"),
+    hours: int = Query(1, ge=1, le=72, description="Hours of observations, ending now"),
+    method: str = Query("kriging", pattern="^(idw|kriging)$"),
+    field: str = Query("aqi", pattern="^(aqi|pm2_5|pm10|no2|so2|o3|co)$"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Spatially interpolated station observations: ordinary kriging (variogram fitted
+    to the stations' recent values) or inverse distance weighting over the nearest
+    stations, for every cell of a grid clipped to the radius."""
+    try:
+        grid = SpatialService(db).generate_grid(
+            center_lat, center_lon, radius_km, resolution_km, clip=True
+        )
+        surface = await ForecastingService(db).get_observed_surface(grid, hours, field, method)
+        lat, lon = grid.points()
+        return SurfaceResponse(
+            center_location=LocationInput(latitude=center_lat, longitude=center_lon),
+            grid_size_km=resolution_km,
+            radius_km=radius_km,
+            method=method,
+            field=field,
+            stations=surface["stations"],
+            shape=list(grid.shape),
+            cell_index=grid.index.tolist(),
+            latitudes=np.round(lat, 6).tolist(),
+            longitudes=np.round(lon, 6).tolist(),
+            cell_ids=grid.cell_ids[grid.mask].tolist(),
+            times=surface["times"],
+            values=surface["values"].tolist(),
+        )
+
+    except Exception as e:
+        logger.error("Error interpolating observations", error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to interpolate observations")
+
+
 @router.get("/route")
 async def get_route_forecast(
     start_lat: float = Query(..., description="Start latitude"),
@@ -166,7 +358,12 @@ async def get_route_forecast(
     end_lat: float = Query(..., description="End latitude"),
     end_lon: float = Query(..., description="End longitude"),
     transport_mode: str = Query(
-        "walking", description="Transport mode: walking, cycling, driving"
+        "walking",
+        pattern="^(walking|cycling|driving)$",
+        description="Transport mode: walking, cycling, driving",
+    ),
+    depart_at: Optional[datetime] = Query(
+        None, description="Departure time (UTC), default now; from the current hour up to 72 hours ahead"
     ),
     db: AsyncSession = Depends(get_db),
 ):
@@ -174,10 +371,11 @@ async def get_route_forecast(
     Get pollution forecast along a specific route
 
     Provides:
-    - Route-specific AQI predictions
+    - Route-specific AQI predictions: the route densified to ROUTE_SPACING_KM, each
+      point sampled from the hourly forecast raster at its arrival time
     - Transport mode optimization
-    - Alternative route suggestions
-    - Exposure time calculations
+    - Alternative route suggestions, evaluated in the same vectorized pass
+    - Exposure time calculations (AQI x hours along the trip)
     """
     try:
         logger.info(
@@ -197,9 +395,13 @@ async def get_route_forecast(
             start_lat, start_lon, end_lat, end_lon, transport_mode
         )
 
-        # Calculate pollution exposure along route
+        alternatives = await spatial_service.get_alternative_routes(
+            start_lat, start_lon, end_lat, end_lon, transport_mode
+        )
+
+        # Calculate pollution exposure along the route and its alternatives
         route_forecast = await forecasting_service.calculate_route_exposure(
-            route_points, transport_mode
+            route_points, transport_mode, alternatives, depart_at
         )
 
         return {
@@ -210,6 +412,8 @@ async def get_route_forecast(
             "timestamp": datetime.utcnow(),
         }
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("Error fetching route forecast", error=str(e))
         raise HTTPException(status_code=500, detail="Failed to fetch route forecast")
@@ -248,3 +452,32 @@ async def get_historical_forecast_accuracy(
     except Exception as e:
         logger.error("Error fetching forecast accuracy", error=str(e))
         raise HTTPException(status_code=500, detail="Failed to fetch accuracy metrics")
+
+
+@router.get("/stations")
+async def get_station_readings(
+    min_lat: Optional[float] = Query(None, ge=-90, le=90),
+    max_lat: Optional[float] = Query(None, ge=-90, le=90),
+    min_lon: Optional[float] = Query(None, ge=-180, le=180),
+    max_lon: Optional[float] = Query(None, ge=-180, le=180),
+    max_age_hours: Optional[float] = Query(
+        None, gt=0, description="Skip stations whose latest reading is older than this"
+    ),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Latest reading of every monitoring station (the station map), optionally
+    limited to a bounding box. Served from core.latest_readings: one row per station."""
+    bounds = (min_lat, max_lat, min_lon, max_lon)
+    if any(b is None for b in bounds) and any(b is not None for b in bounds):
+        raise HTTPException(
+            status_code=400, detail="min_lat, max_lat, min_lon and max_lon go together"
+        )
+    try:
+        stations = await StationService(db).get_latest_readings(
+            bbox=None if bounds[0] is None else bounds, max_age_hours=max_age_hours
+        )
+        return {"count": len(stations), "stations": stations, "timestamp": datetime.utcnow()}
+
+    except Exception as e:
+        logger.error("Error fetching station readings", error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to fetch station readings")
@@ -295,9 +295,15 @@ async def get_safe_routes(
     start_lon: float = Query(..., description="Start longitude"),
     end_lat: float = Query(..., description="End latitude"),
     end_lon: float = Query(..., description="End longitude"),
-    transport_mode: str = Query("walking", description="Transport mode"),
+    transport_mode: str = Query(
+        "walking",
+        pattern="^(walking|cycling|driving)$",
+        description="Transport mode: walking, cycling, driving",
+    ),
     health_priority: str = Query(
-        "medium", description="Health priority: low, medium, high"
+        "medium",
+        pattern="^(low|medium|high)$",
+        description="Health priority: low, medium, high",
     ),
     db: AsyncSession = Depends(get_db),
 ):
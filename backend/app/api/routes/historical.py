@@ -1,10 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime, timedelta
 import structlog
 
-from app.database import get_db
+from app.database import get_read_db, read_session_factory
+from app.services.historical_service import (
+    HistoricalService,
+    REGIONS,
+    TREND_PERIODS,
+    parse_cursor,
+    stream_readings,
+)
 
 logger = structlog.get_logger()
 
@@ -17,15 +25,60 @@ async def get_historical_aqi(
     longitude: float = Query(..., description="Longitude coordinate"),
     start_date: datetime = Query(..., description="Start date"),
     end_date: datetime = Query(..., description="End date"),
-    db: AsyncSession = Depends(get_db),
+    radius_km: float = Query(5.0, gt=0, le=50, description="Stations within this radius are aggregated"),
+    resolution: Optional[str] = Query(
+        None,
+        pattern="^(raw|hourly|daily)$",
+        description="Force raw, hourly or daily data; chosen from the range by default",
+    ),
+    format: str = Query(
+        "json",
+        pattern="^(json|ndjson|csv)$",
+        description="json: aggregated series; ndjson/csv: stream every raw reading",
+    ),
+    after: Optional[str] = Query(
+        None, description="ndjson/csv only: resume after '<timestamp>,<id>' of the last received row"
+    ),
+    limit: Optional[int] = Query(None, gt=0, description="ndjson/csv only: stop after this many rows"),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """Get historical AQI data for a specific location and time period"""
+    """Get historical AQI data for a specific location and time period.
+
+    Short ranges are read from raw readings, longer ones from the hourly or daily
+    continuous aggregates. With format=ndjson or format=csv every raw reading in the
+    range is streamed in (timestamp, id) order with constant memory.
+    """
+    if end_date <= start_date:
+        raise HTTPException(status_code=400, detail="end_date must be after start_date")
+    if format != "json":
+        if after:
+            try:
+                parse_cursor(after)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        body = stream_readings(
+            latitude,
+            longitude,
+            start_date,
+            end_date,
+            radius_km=radius_km,
+            fmt=format,
+            after=after,
+            limit=limit,
+            session_factory=await read_session_factory(),
+        )
+        media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+        return StreamingResponse(body, media_type=media_type)
     try:
-        # Implementation for historical AQI data
+        service = HistoricalService(db)
+        resolution, data = await service.get_aqi_series(
+            latitude, longitude, start_date, end_date, radius_km=radius_km, resolution=resolution
+        )
         return {
-            "location": {"latitude": latitude, "longitude": longitude},
+            "location": {"latitude": latitude, "longitude": longitude, "radius_km": radius_km},
             "period": {"start": start_date, "end": end_date},
-            "data": [],  # Historical data will be implemented
+            "resolution": resolution,
+            "data": data,
             "timestamp": datetime.utcnow(),
         }
     except Exception as e:
@@ -37,15 +90,19 @@ async def get_historical_aqi(
 async def get_pollution_trends(
     region: str = Query("delhi-ncr", description="Region for trend analysis"),
     period: str = Query("1y", description="Time period: 1m, 6m, 1y, 5y"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """Get pollution trends and patterns for a region"""
+    """Get pollution trends and patterns for a region (served from the daily rollups)"""
+    if region not in REGIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown region. Options: {sorted(REGIONS)}")
+    if period not in TREND_PERIODS:
+        raise HTTPException(status_code=400, detail=f"Unknown period. Options: {list(TREND_PERIODS)}")
     try:
-        # Implementation for trend analysis
+        trends = await HistoricalService(db).get_trends(region, period)
         return {
             "region": region,
             "period": period,
-            "trends": {},  # Trend data will be implemented
+            "trends": trends,
             "timestamp": datetime.utcnow(),
         }
     except Exception as e:
@@ -5,7 +5,7 @@ from datetime import datetime
 import structlog
 from pydantic import BaseModel, Field
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.services.policy_service import PolicyService
 
 logger = structlog.get_logger()
@@ -98,7 +98,7 @@ async def get_historical_policy_effectiveness(
     ),
     region: str = Query("delhi-ncr", description="Geographic region"),
     years: int = Query(5, ge=1, le=10, description="Years of historical data"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Analyze historical effectiveness of pollution control policies
@@ -5,7 +5,7 @@ from datetime import datetime, timedelta
 import structlog
 from pydantic import BaseModel, Field
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.services.source_attribution_service import SourceAttributionService
 
 logger = structlog.get_logger()
@@ -160,7 +160,7 @@ async def get_source_trends(
     latitude: float = Query(..., description="Latitude coordinate"),
     longitude: float = Query(..., description="Longitude coordinate"),
     period: str = Query("7d", description="Analysis period: 1d, 7d, 30d, 1y"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get historical trends in pollution source contributions
@@ -266,7 +266,7 @@ async def get_fire_impact_analysis(
 async def get_source_model_validation(
     region: str = Query("delhi-ncr", description="Region for validation"),
     model_version: Optional[str] = Query(None, description="Specific model version"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get source attribution model validation metrics
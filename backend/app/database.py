@@ -5,14 +5,16 @@ Improvements applied:
  - Updated import path for declarative_base (SQLAlchemy 2.x recommendation).
  - Added naming convention metadata for future migrations.
  - Added sensible defaults for created_at / updated_at style columns.
- - Added pool_pre_ping for more robust long-lived connections.
+ - Pool sizing and pre-ping strategy configurable via env, with pool metrics (app.db_pool).
  - Centralized environment variable access with fallback and explicit error if required parts missing.
 """
 
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from sqlalchemy import (
+    BigInteger,
     Column,
+    Index,
     Integer,
     Float,
     String,
@@ -20,7 +22,9 @@ from sqlalchemy import (
     Boolean,
     JSON,
     MetaData,
+    UniqueConstraint,
     event,
+    text,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
@@ -31,15 +35,24 @@ from typing import AsyncGenerator
 import asyncio
 import logging
 
+from prometheus_client import Counter
+
+from app.db_pool import engine_kwargs, instrument_engine, pool_settings
+from app.db_replica import READ_ROUTING, ReplicaLagMonitor, engine_lag_probe
+
 load_dotenv()
 
 
-def _build_database_url() -> str:
-    user = os.getenv("DB_USER") or ""
-    password = os.getenv("DB_PASSWORD") or ""
-    host = os.getenv("DB_HOST") or "localhost"
-    port = os.getenv("DB_PORT") or "5432"
-    name = os.getenv("DB_NAME") or ""
+def _build_database_url(prefix: str = "DB") -> str:
+    # Non-primary prefixes (DB_REPLICA) fall back to the primary's DB_* values
+    def env(key: str) -> str:
+        return os.getenv(f"{prefix}_{key}") or os.getenv(f"DB_{key}") or ""
+
+    user = env("USER")
+    password = env("PASSWORD")
+    host = env("HOST") or "localhost"
+    port = env("PORT") or "5432"
+    name = env("NAME")
     missing = [
         k
         for k, v in {"DB_USER": user, "DB_PASSWORD": password, "DB_NAME": name}.items()
@@ -56,17 +69,47 @@ def _build_database_url() -> str:
 DATABASE_URL = _build_database_url()
 
 ECHO_SQL = os.getenv("SQL_ECHO", "false").lower() == "true"
+# Pool sizing, recycling and pre-ping strategy come from DB_POOL_* / DB_PRE_PING (see app.db_pool)
+POOL_SETTINGS = pool_settings()
 engine = create_async_engine(
     DATABASE_URL,
     echo=ECHO_SQL,
-    pool_pre_ping=True,
+    **engine_kwargs("primary", POOL_SETTINGS),
 )
+instrument_engine(engine, "primary", POOL_SETTINGS)
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine, expire_on_commit=False, class_=AsyncSession
 )
 
+# Optional read replica for analytical, read-only routes (see get_read_db):
+#   DB_REPLICA_HOST                  -> enables the replica; DB_REPLICA_PORT/_USER/_PASSWORD/_NAME
+#                                       default to the primary's values
+#   DB_REPLICA_POOL_SIZE, ...        -> per-replica pool overrides (see app.db_pool)
+#   DB_REPLICA_MAX_LAG_SECONDS=30    -> read from the primary while the replica lags more
+#   DB_REPLICA_LAG_CHECK_SECONDS=5   -> how often replication lag is re-measured
+REPLICA_ENABLED = bool(os.getenv("DB_REPLICA_HOST"))
+if REPLICA_ENABLED:
+    REPLICA_POOL_SETTINGS = pool_settings("DB_REPLICA")
+    replica_engine = create_async_engine(
+        _build_database_url("DB_REPLICA"),
+        echo=ECHO_SQL,
+        execution_options={"postgresql_readonly": True},
+        **engine_kwargs("replica", REPLICA_POOL_SETTINGS),
+    )
+    instrument_engine(replica_engine, "replica", REPLICA_POOL_SETTINGS)
+else:
+    replica_engine = engine
+ReplicaSessionLocal = async_sessionmaker(
+    replica_engine, expire_on_commit=False, class_=AsyncSession
+)
+replica_monitor = ReplicaLagMonitor(
+    engine_lag_probe(replica_engine),
+    max_lag_seconds=float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "30")),
+    check_interval=float(os.getenv("DB_REPLICA_LAG_CHECK_SECONDS", "5")),
+)
+
 NAMING_CONVENTION = {
     "ix": "ix_%(column_0_label)s",
     "uq": "uq_%(table_name)s_%(column_0_name)s",
@@ -79,10 +122,73 @@ metadata = MetaData(naming_convention=NAMING_CONVENTION)
 Base = declarative_base(metadata=metadata)
 
 
+DB_SESSIONS = Counter(
+    "db_sessions_total",
+    "Request-scoped sessions handed out by get_db, by whether the route used them",
+    ["used"],
+)
+
+
+class LazySession:
+    """Stand-in for AsyncSession that only creates the real session on first use.
+
+    Most routes declare ``Depends(get_db)`` but are served from memory; with this
+    proxy they never build a session, and a pooled connection is only checked out
+    once the session actually executes something. Any attribute access (``execute``,
+    ``add``, ``begin``...) materialises the session.
+    """
+
+    __slots__ = ("_factory", "_session")
+
+    def __init__(self, factory: async_sessionmaker):
+        self._factory = factory
+        self._session: AsyncSession | None = None
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._factory()
+        return self._session
+
+    def __getattr__(self, name: str):
+        return getattr(self.session, name)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    """FastAPI dependency that yields an async DB session."""
-    async with AsyncSessionLocal() as session:  # type: ignore[call-arg]
-        yield session
+    """FastAPI dependency that yields a lazily created async DB session."""
+    session = LazySession(AsyncSessionLocal)
+    try:
+        yield session  # type: ignore[misc]
+    finally:
+        DB_SESSIONS.labels(used=str(session.started).lower()).inc()
+        await session.close()
+
+
+async def read_session_factory() -> async_sessionmaker:
+    """Session factory for read-only work: the replica unless it is lagging or down."""
+    if REPLICA_ENABLED and await replica_monitor.healthy():
+        READ_ROUTING.labels(target="replica").inc()
+        return ReplicaSessionLocal
+    READ_ROUTING.labels(target="primary").inc()
+    return AsyncSessionLocal
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Like get_db, for read-only routes: served from the read replica when it is fresh."""
+    session = LazySession(await read_session_factory())
+    try:
+        yield session  # type: ignore[misc]
+    finally:
+        DB_SESSIONS.labels(used=str(session.started).lower()).inc()
+        await session.close()
 
 
 async def init_db():
@@ -106,6 +212,9 @@ async def init_db():
     for attempt in range(1, retries + 1):
         try:
             async with engine.begin() as conn:
+                # Time-series tables live in "core"; rollups in "analytics" (see database/)
+                for schema in ("core", "analytics"):
+                    await conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema}"))
                 await conn.run_sync(Base.metadata.create_all)
             print(f"[DB] Initialization successful on attempt {attempt}")
             return
@@ -133,12 +242,22 @@ class AQIReading(Base):
     """Model for AQI readings from monitoring stations"""
 
     __tablename__ = "aqi_readings"
+    # Lives in the TimescaleDB hypertable created by database/init.sql. Unique keys on a
+    # compressed hypertable may only use segmentby/orderby columns, so the natural key
+    # (station_id, timestamp) is the primary key (and the bulk loader's upsert key); it
+    # also serves per-station newest-first reads. Indexes follow the hot queries
+    # (database/migrations/003_*).
+    __table_args__ = (
+        Index("ix_aqi_readings_grid_cell_timestamp", "grid_cell", text('"timestamp" DESC')),
+        {"schema": "core"},
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    station_id = Column(String, nullable=False, index=True)
-    timestamp = Column(DateTime, nullable=False, index=True)
+    id = Column(UUID(as_uuid=True), nullable=False, default=uuid.uuid4)
+    station_id = Column(String, primary_key=True)
+    timestamp = Column(DateTime, primary_key=True, index=True)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
+    grid_cell = Column(BigInteger)  # spatial_service.grid_cell_id(latitude, longitude)
 
     # Pollutant measurements
     pm2_5 = Column(Float)
@@ -164,6 +283,48 @@ class AQIReading(Base):
     quality_flag = Column(String, default="valid")
 
 
+class LatestReading(Base):
+    """Most recent reading per station, maintained on ingest.
+
+    Upserted from core.aqi_readings in the same transaction as every bulk load (see
+    app.services.station_service.refresh_latest_readings), so "latest reading for each
+    station" reads one row per station however long the history grows.
+    """
+
+    __tablename__ = "latest_readings"
+    __table_args__ = (
+        Index("ix_latest_readings_grid_cell", "grid_cell"),
+        {"schema": "core"},
+    )
+
+    station_id = Column(String, primary_key=True)
+    reading_id = Column(UUID(as_uuid=True), nullable=False)  # aqi_readings.id
+    timestamp = Column(DateTime, nullable=False)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    grid_cell = Column(BigInteger)
+
+    pm2_5 = Column(Float)
+    pm10 = Column(Float)
+    no2 = Column(Float)
+    so2 = Column(Float)
+    o3 = Column(Float)
+    co = Column(Float)
+
+    aqi = Column(Integer)
+    aqi_category = Column(String)
+
+    temperature = Column(Float)
+    humidity = Column(Float)
+    wind_speed = Column(Float)
+    wind_direction = Column(Float)
+    pressure = Column(Float)
+
+    data_source = Column(String)
+    quality_flag = Column(String)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
 class SourceAttribution(Base):
     """Model for pollution source attribution data"""
 
@@ -191,12 +352,23 @@ class AQIForecast(Base):
     """Model for AQI forecast data"""
 
     __tablename__ = "aqi_forecasts"
+    __table_args__ = (
+        UniqueConstraint(
+            "forecast_timestamp",
+            "target_timestamp",
+            "latitude",
+            "longitude",
+            "model_version",
+        ),
+        Index("ix_aqi_forecasts_grid_cell_target_timestamp", "grid_cell", "target_timestamp"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     forecast_timestamp = Column(DateTime, nullable=False, index=True)
     target_timestamp = Column(DateTime, nullable=False, index=True)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
+    grid_cell = Column(BigInteger)
 
     # Forecast values
     predicted_aqi = Column(Integer)
@@ -253,9 +425,12 @@ class HealthRecommendation(Base):
     """Model for personalized health recommendations"""
 
     __tablename__ = "health_recommendations"
+    __table_args__ = (
+        Index("ix_health_recommendations_user_id_timestamp", "user_id", text('"timestamp" DESC')),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
     timestamp = Column(DateTime, nullable=False)
 
     # Location and AQI context
@@ -314,11 +489,16 @@ class FireHotspot(Base):
     """Model for fire hotspot data from NASA FIRMS"""
 
     __tablename__ = "fire_hotspots"
+    __table_args__ = (
+        UniqueConstraint("timestamp", "latitude", "longitude", "satellite"),
+        Index("ix_fire_hotspots_grid_cell_timestamp", "grid_cell", "timestamp"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     timestamp = Column(DateTime, nullable=False, index=True)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
+    grid_cell = Column(BigInteger)
 
     # Fire characteristics
     brightness = Column(Float)
@@ -0,0 +1,176 @@
+"""Connection pool configuration and telemetry for the async engines.
+
+Pool settings are read from the environment (per engine, see ``pool_settings``):
+  DB_POOL_SIZE=10               -> persistent connections kept per worker process
+  DB_MAX_OVERFLOW=20            -> extra connections opened under burst load
+  DB_POOL_TIMEOUT=30            -> seconds a checkout waits for a free connection
+  DB_POOL_RECYCLE=1800          -> replace connections older than this (-1 disables)
+  DB_PRE_PING=idle              -> always | idle | never
+  DB_PRE_PING_IDLE_SECONDS=30   -> with "idle", only ping connections unused this long
+
+``always`` is SQLAlchemy's pool_pre_ping (one round-trip per checkout); ``idle`` skips
+the ping for connections that were just returned, which under load is nearly all.
+
+Metrics (labelled by engine):
+  db_pool_checkout_wait_seconds       time spent waiting for a pooled connection
+  db_pool_connections{state}          checked_out / idle / overflow, sampled on scrape
+  db_pool_connections_opened_total    new DBAPI connections
+  db_pool_connections_closed_total    connections closed, by reason (close/invalidate)
+  db_pool_pre_ping_failures_total     stale connections caught by pre-ping
+  db_query_seconds                    statement execution time
+"""
+
+import os
+import time
+from typing import Any, Dict, Type
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+PRE_PING_STRATEGIES = ("always", "idle", "never")
+
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting to check out a pooled connection",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Pooled connections by state",
+    ["engine", "state"],
+)
+POOL_OPENED = Counter(
+    "db_pool_connections_opened_total",
+    "DBAPI connections opened by the pool",
+    ["engine"],
+)
+POOL_CLOSED = Counter(
+    "db_pool_connections_closed_total",
+    "DBAPI connections closed by the pool",
+    ["engine", "reason"],
+)
+QUERY_SECONDS = Histogram(
+    "db_query_seconds",
+    "Statement execution time per engine",
+    ["engine"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+POOL_PRE_PING_FAILURES = Counter(
+    "db_pool_pre_ping_failures_total",
+    "Checkouts that found a dead connection during pre-ping",
+    ["engine"],
+)
+
+
+def _env(prefix: str, name: str, default: str) -> str:
+    # Engine-specific override first (e.g. DB_REPLICA_POOL_SIZE), then the shared DB_*
+    return os.getenv(f"{prefix}_{name}") or os.getenv(f"DB_{name}") or default
+
+
+def pool_settings(prefix: str = "DB") -> Dict[str, Any]:
+    """Pool configuration for an engine; ``prefix`` selects per-engine overrides."""
+    pre_ping = _env(prefix, "PRE_PING", "idle").lower()
+    if pre_ping not in PRE_PING_STRATEGIES:
+        raise RuntimeError(f"{prefix}_PRE_PING must be one of {', '.join(PRE_PING_STRATEGIES)}")
+    return {
+        "pool_size": int(_env(prefix, "POOL_SIZE", "10")),
+        "max_overflow": int(_env(prefix, "MAX_OVERFLOW", "20")),
+        "pool_timeout": float(_env(prefix, "POOL_TIMEOUT", "30")),
+        "pool_recycle": int(_env(prefix, "POOL_RECYCLE", "1800")),
+        "pre_ping": pre_ping,
+        "pre_ping_idle_seconds": float(_env(prefix, "PRE_PING_IDLE_SECONDS", "30")),
+    }
+
+
+def instrumented_pool_class(label: str) -> Type[AsyncAdaptedQueuePool]:
+    """AsyncAdaptedQueuePool subclass that times every checkout for ``label``."""
+
+    class InstrumentedPool(AsyncAdaptedQueuePool):
+        def _do_get(self):  # type: ignore[override]
+            started = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                POOL_CHECKOUT_WAIT.labels(engine=label).observe(time.perf_counter() - started)
+
+    InstrumentedPool.__name__ = f"InstrumentedPool[{label}]"
+    return InstrumentedPool
+
+
+def engine_kwargs(label: str, settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Keyword arguments for create_async_engine matching ``settings``."""
+    return {
+        "poolclass": instrumented_pool_class(label),
+        "pool_size": settings["pool_size"],
+        "max_overflow": settings["max_overflow"],
+        "pool_timeout": settings["pool_timeout"],
+        "pool_recycle": settings["pool_recycle"],
+        "pool_pre_ping": settings["pre_ping"] == "always",
+    }
+
+
+def instrument_engine(engine: AsyncEngine, label: str, settings: Dict[str, Any]) -> None:
+    """Attach latency, churn and occupancy metrics and the idle pre-ping strategy to an engine."""
+    pool = engine.sync_engine.pool
+    query_seconds = QUERY_SECONDS.labels(engine=label)
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("query_started")
+        if started:
+            query_seconds.observe(time.perf_counter() - started.pop())
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _on_error(context):
+        started = context.connection.info.get("query_started") if context.connection else None
+        if started:
+            started.pop()
+
+    for state, read in (
+        ("checked_out", pool.checkedout),
+        ("idle", pool.checkedin),
+        ("overflow", lambda: max(pool.overflow(), 0)),
+    ):
+        POOL_CONNECTIONS.labels(engine=label, state=state).set_function(read)
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        POOL_OPENED.labels(engine=label).inc()
+
+    @event.listens_for(pool, "close")
+    def _on_close(dbapi_connection, connection_record):
+        POOL_CLOSED.labels(engine=label, reason="close").inc()
+
+    @event.listens_for(pool, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        POOL_CLOSED.labels(engine=label, reason="invalidate").inc()
+
+    if settings["pre_ping"] != "idle":
+        return
+    idle_seconds = settings["pre_ping_idle_seconds"]
+    dialect = engine.sync_engine.dialect
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        try:
+            alive = dialect.do_ping(dbapi_connection)
+        except Exception:
+            alive = False
+        if not alive:
+            POOL_PRE_PING_FAILURES.labels(engine=label).inc()
+            # The pool invalidates this connection and retries the checkout with a new one
+            raise exc.DisconnectionError("Stale pooled connection failed pre-ping")
@@ -0,0 +1,88 @@
+"""Replication-lag tracking for routing read-only queries to a replica.
+
+``ReplicaLagMonitor`` probes the replica at most every ``check_interval`` seconds and
+caches the answer, so read-only routes can ask "is the replica fresh enough?" on every
+request for the cost of a clock read. A failed probe counts as unhealthy: reads fall
+back to the primary until the replica answers again.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+import structlog
+from prometheus_client import Counter, Gauge
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = structlog.get_logger()
+
+REPLICA_LAG = Gauge(
+    "db_replica_lag_seconds",
+    "Replication lag last measured on the read replica (-1 when the probe failed)",
+)
+READ_ROUTING = Counter(
+    "db_read_routing_total",
+    "Read-only sessions by the engine they were routed to",
+    ["target"],
+)
+
+# Zero when the replica has replayed everything it received (an idle primary would
+# otherwise look like growing lag); 0 on a server that is not a replica at all.
+LAG_SQL = text(
+    """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+)
+
+
+def engine_lag_probe(engine: AsyncEngine) -> Callable[[], Awaitable[float]]:
+    async def probe() -> float:
+        async with engine.connect() as conn:
+            return float((await conn.execute(LAG_SQL)).scalar() or 0.0)
+
+    return probe
+
+
+class ReplicaLagMonitor:
+    def __init__(
+        self,
+        probe: Callable[[], Awaitable[float]],
+        max_lag_seconds: float = 30.0,
+        check_interval: float = 5.0,
+        probe_timeout: float = 2.0,
+    ):
+        self.probe = probe
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.probe_timeout = probe_timeout
+        self.lag_seconds: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def _stale(self) -> bool:
+        return self.checked_at is None or time.monotonic() - self.checked_at >= self.check_interval
+
+    async def refresh(self) -> None:
+        async with self._lock:
+            if not self._stale():  # another request refreshed while we waited
+                return
+            try:
+                async with asyncio.timeout(self.probe_timeout):
+                    self.lag_seconds = await self.probe()
+            except Exception as e:
+                if self.lag_seconds is not None:
+                    logger.warning("Replica lag probe failed; reading from primary", error=str(e))
+                self.lag_seconds = None
+            self.checked_at = time.monotonic()
+            REPLICA_LAG.set(-1 if self.lag_seconds is None else self.lag_seconds)
+
+    async def healthy(self) -> bool:
+        """True when the replica answered recently with lag within the limit."""
+        if self._stale():
+            await self.refresh()
+        return self.lag_seconds is not None and self.lag_seconds <= self.max_lag_seconds
@@ -8,8 +8,12 @@ import os
 from dotenv import load_dotenv
 
 from app.api.routes import forecast, sources, health, policy, alerts, historical
-from app.database import init_db
+from app.database import AsyncSessionLocal, init_db
 from app.services.data_pipeline import DataPipelineService
+from app.services.latest_store import get_latest_store
+from app.services.road_graph import load_road_graph
+from app.services.spatial_service import get_spatial_index
+from app.services.user_service import UserService
 
 # Load environment variables
 load_dotenv()
@@ -44,14 +48,37 @@ async def lifespan(app: FastAPI):
     # Initialize database
     await init_db()
 
+    # Latest readings per station, restored from its snapshot when configured
+    latest_store = get_latest_store()
+
+    # Proximity indexes: stations from the restored store, users from the database
+    n = len(latest_store)
+    get_spatial_index("stations").insert(
+        latest_store.station_ids, latest_store.latitude[:n], latest_store.longitude[:n]
+    )
+    if os.getenv("SKIP_DB_INIT") != "1":
+        try:
+            async with AsyncSessionLocal() as session:
+                users = await UserService(session).index_locations(get_spatial_index("users"))
+            logger.info("Indexed user locations", points=users)
+        except Exception as e:
+            logger.warning("Could not index user locations", error=str(e))
+
+    # Road graph for /health/safe-routes, parsed or loaded off the event loop
+    try:
+        await load_road_graph()
+    except Exception as e:
+        logger.warning("Could not load road graph; safe routes use straight lines", error=str(e))
+
     # Start data pipeline service
-    data_pipeline = DataPipelineService()
+    data_pipeline = DataPipelineService(latest_store=latest_store)
     await data_pipeline.start()
 
     yield
 
     # Cleanup
     await data_pipeline.stop()
+    latest_store.snapshot()
     logger.info("Shutting down Delhi-NCR Pollution Platform API")
 
 
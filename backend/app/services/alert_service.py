@@ -1,5 +1,17 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any, List
+from datetime import datetime, timedelta
+import os
+import uuid
+
+from app.services.forecasting_service import _aqi_category
+from app.services.latest_store import get_latest_store
+from app.services.query_catalog import CATALOG
+from app.services.spatial_service import get_spatial_index
+
+# Stations at or above this AQI (the default user alert_threshold) raise an area alert
+ACTIVE_ALERT_AQI = int(os.getenv("ACTIVE_ALERT_AQI", "150"))
+ACTIVE_ALERT_MAX_AGE = timedelta(hours=2)
 
 
 class AlertService:
@@ -14,7 +26,56 @@ class AlertService:
     async def get_active_alerts(
         self, lat: float, lon: float, radius_km: float
     ) -> List[Dict[str, Any]]:
-        return []
+        """Stations within ``radius_km`` currently at or above ACTIVE_ALERT_AQI, nearest
+        first, plus one alert for fire hotspots detected in the area."""
+        store = get_latest_store()
+        cutoff = datetime.utcnow() - ACTIVE_ALERT_MAX_AGE  # store timestamps are naive UTC
+        alerts: List[Dict[str, Any]] = []
+        for station_id, distance in get_spatial_index("stations").within(lat, lon, radius_km):
+            reading = store.latest(station_id)
+            if reading is None or reading["aqi"] is None or reading["timestamp"] < cutoff:
+                continue
+            aqi = int(round(reading["aqi"]))
+            if aqi < ACTIVE_ALERT_AQI:
+                continue
+            alerts.append(
+                {
+                    "type": "air_quality",
+                    "station_id": station_id,
+                    "aqi": aqi,
+                    "category": _aqi_category(aqi),
+                    "distance_km": round(distance, 2),
+                    "observed_at": reading["timestamp"],
+                }
+            )
+        fires = get_spatial_index("fires").within(lat, lon, radius_km)
+        if fires:
+            alerts.append(
+                {
+                    "type": "fire",
+                    "fire_count": len(fires),
+                    "nearest_km": round(fires[0][1], 2),
+                }
+            )
+        return alerts
 
     async def get_user_alerts(self, user_id: str, limit: int) -> List[Dict[str, Any]]:
-        return []
+        """Most recent health alerts issued to the user, newest first."""
+        try:
+            uid = uuid.UUID(user_id)
+        except ValueError:
+            return []
+        rows = await CATALOG.fetch(self.db, "alerts_by_user", user_id=uid, limit=limit)
+        return [
+            {
+                "id": str(r["id"]),
+                "timestamp": r["timestamp"].isoformat() + "Z",
+                "latitude": r["latitude"],
+                "longitude": r["longitude"],
+                "current_aqi": r["current_aqi"],
+                "health_risk_level": r["health_risk_level"],
+                "activity_advice": r["activity_advice"],
+                "mask_recommendation": r["mask_recommendation"],
+            }
+            for r in rows
+        ]
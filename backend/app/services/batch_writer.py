@@ -0,0 +1,210 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import structlog
+from prometheus_client import Counter, Gauge, Histogram
+
+logger = structlog.get_logger()
+
+QUEUE_DEPTH = Gauge(
+    "pipeline_writer_queue_depth",
+    "Batches waiting in the ingestion writer queue",
+)
+PUT_WAIT = Histogram(
+    "pipeline_writer_put_wait_seconds",
+    "Time producers spent blocked on a full writer queue (backpressure)",
+    buckets=(0.001, 0.01, 0.1, 0.5, 1, 5, 15, 60),
+)
+FLUSH_LATENCY = Histogram(
+    "pipeline_writer_flush_seconds",
+    "Latency of one coalesced flush per table",
+    ["table"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+FLUSHED_ROWS = Counter(
+    "pipeline_writer_rows_total",
+    "Rows written by the ingestion writer per table",
+    ["table"],
+)
+FLUSH_FAILURES = Counter(
+    "pipeline_writer_flush_failures_total",
+    "Failed flush attempts per table",
+    ["table"],
+)
+DROPPED_ROWS = Counter(
+    "pipeline_writer_dropped_rows_total",
+    "Rows discarded after failed flushes (retries exhausted and pending limit exceeded)",
+    ["table"],
+)
+
+Sink = Callable[[str, List[Dict[str, Any]]], Awaitable[None]]
+
+
+@dataclass
+class Batch:
+    """Rows produced by one fetch, all destined for the same table."""
+
+    table: str
+    rows: List[Dict[str, Any]]
+    source: str = ""
+
+
+async def bulk_upsert_rows(table: str, rows: List[Dict[str, Any]]) -> None:
+    """Default sink: COPY into a staging table and upsert on natural keys."""
+    from app.services.bulk_loader import copy_rows
+
+    await copy_rows(table, rows)
+
+
+async def insert_rows(table: str, rows: List[Dict[str, Any]]) -> None:
+    """Plain sink: one multi-row INSERT per flush through the ORM table definition.
+
+    Rows are normalised to the union of their columns first (as for the bulk loader):
+    an executemany INSERT takes its column list from the first row only.
+    """
+    from app.database import AsyncSessionLocal, Base
+    from app.services.bulk_loader import stage_records
+
+    target = next(t for t in Base.metadata.sorted_tables if t.name == table)
+    names, records = stage_records(target, rows)
+    async with AsyncSessionLocal() as session:
+        await session.execute(target.insert(), [dict(zip(names, r)) for r in records])
+        if table == "aqi_readings":
+            from app.services.station_service import STATION_KEYS_SQL, refresh_latest_readings
+
+            await refresh_latest_readings(
+                await session.connection(),
+                STATION_KEYS_SQL,
+                station_ids=sorted({r["station_id"] for r in rows}),
+            )
+        await session.commit()
+
+
+class BatchWriter:
+    """Bounded producer/consumer stage between ingestors and the database.
+
+    Producers ``await put(batch)``; once ``max_queue`` batches are waiting, ``put``
+    blocks, so a slow database throttles the fetchers instead of growing memory.
+    The consumer coalesces rows per table and flushes a table once it holds
+    ``flush_rows`` rows, or every ``flush_interval`` seconds, whichever comes first.
+
+    A failed flush keeps its rows and is retried up to ``max_retries`` times, backing
+    off from ``retry_delay`` (doubling, at most ``max_retry_delay`` seconds). The
+    consumer stops pulling from the queue meanwhile, so a database outage blocks the
+    producers too. Once the retries are spent the rows stay pending for the next
+    flush; only rows beyond ``max_pending_rows`` per table (oldest first) are dropped,
+    and counted in pipeline_writer_dropped_rows_total. ``stop`` makes one last
+    attempt and drops what it cannot write.
+    """
+
+    def __init__(
+        self,
+        sink: Optional[Sink] = None,
+        max_queue: int = 32,
+        flush_rows: int = 5000,
+        flush_interval: float = 2.0,
+        max_retries: int = 5,
+        retry_delay: float = 0.5,
+        max_retry_delay: float = 30.0,
+        max_pending_rows: Optional[int] = None,
+    ) -> None:
+        self._sink = sink or bulk_upsert_rows
+        self._queue: asyncio.Queue[Batch] = asyncio.Queue(maxsize=max_queue)
+        self._flush_rows = flush_rows
+        self._flush_interval = flush_interval
+        self._max_retries = max_retries
+        self._retry_delay = retry_delay
+        self._max_retry_delay = max_retry_delay
+        self._max_pending_rows = max_pending_rows or 10 * flush_rows
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}
+        self._task: Optional[asyncio.Task] = None
+        QUEUE_DEPTH.set_function(self._queue.qsize)
+
+    async def put(self, batch: Batch) -> None:
+        if not batch.rows:
+            return
+        started = time.monotonic()
+        await self._queue.put(batch)
+        PUT_WAIT.observe(time.monotonic() - started)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop consuming, then drain whatever is queued and flush it."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        while not self._queue.empty():
+            self._coalesce(self._queue.get_nowait())
+        await self.flush(retries=0)
+        for table, rows in self._pending.items():
+            DROPPED_ROWS.labels(table=table).inc(len(rows))
+            logger.error("Dropped unwritten rows at shutdown", table=table, rows=len(rows))
+        self._pending.clear()
+
+    async def flush(self, retries: Optional[int] = None) -> None:
+        for table in list(self._pending):
+            await self._flush_table(table, retries)
+
+    def _coalesce(self, batch: Batch) -> None:
+        self._pending.setdefault(batch.table, []).extend(batch.rows)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._flush_interval
+        while True:
+            try:
+                # asyncio.timeout (unlike wait_for) never swallows a cancel from stop()
+                async with asyncio.timeout_at(deadline):
+                    batch = await self._queue.get()
+            except TimeoutError:
+                await self.flush()
+                deadline = loop.time() + self._flush_interval
+                continue
+            self._coalesce(batch)
+            if len(self._pending[batch.table]) >= self._flush_rows:
+                await self._flush_table(batch.table)
+
+    async def _flush_table(self, table: str, retries: Optional[int] = None) -> None:
+        rows = self._pending.pop(table, None)
+        if not rows:
+            return
+        retries = self._max_retries if retries is None else retries
+        try:
+            for attempt in range(retries + 1):
+                if attempt:
+                    await asyncio.sleep(min(self._retry_delay * 2 ** (attempt - 1), self._max_retry_delay))
+                started = time.monotonic()
+                try:
+                    await self._sink(table, rows)
+                except Exception as e:  # Broad by design: keep the writer alive on DB errors
+                    FLUSH_FAILURES.labels(table=table).inc()
+                    logger.error(
+                        "Batch flush failed", table=table, rows=len(rows), attempt=attempt + 1, error=str(e)
+                    )
+                    continue
+                FLUSH_LATENCY.labels(table=table).observe(time.monotonic() - started)
+                FLUSHED_ROWS.labels(table=table).inc(len(rows))
+                return
+        except asyncio.CancelledError:
+            # Interrupted by stop(): keep the rows so the final drain flushes them
+            self._pending.setdefault(table, [])[:0] = rows
+            raise
+
+        # Keep the rows for the next flush, up to the pending limit (newest kept)
+        pending = self._pending.setdefault(table, [])
+        pending[:0] = rows
+        excess = len(pending) - self._max_pending_rows
+        if excess > 0:
+            del pending[:excess]
+            DROPPED_ROWS.labels(table=table).inc(excess)
+            logger.error("Dropped rows over the writer's pending limit", table=table, rows=excess)
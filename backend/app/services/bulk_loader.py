@@ -0,0 +1,182 @@
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Tuple
+
+import structlog
+from prometheus_client import Counter, Histogram
+from sqlalchemy import Table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AQIForecast, AQIReading, AsyncSessionLocal, FireHotspot
+from app.services.spatial_service import grid_cell_id
+from app.services.station_service import refresh_latest_readings
+
+logger = structlog.get_logger()
+
+BULK_ROWS = Counter(
+    "bulk_load_rows_total",
+    "Rows upserted through the COPY bulk loader per table",
+    ["table"],
+)
+BULK_SECONDS = Histogram(
+    "bulk_load_seconds",
+    "Duration of one COPY + staging upsert per table",
+    ["table"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+# Tables the bulk loader accepts, keyed by table name, with their natural keys
+# (must match the unique constraints declared on the models).
+BULK_MODELS = {
+    "aqi_readings": AQIReading,
+    "fire_hotspots": FireHotspot,
+    "aqi_forecasts": AQIForecast,
+}
+NATURAL_KEYS = {
+    "aqi_readings": ("station_id", "timestamp"),
+    "fire_hotspots": ("timestamp", "latitude", "longitude", "satellite"),
+    "aqi_forecasts": (
+        "forecast_timestamp",
+        "target_timestamp",
+        "latitude",
+        "longitude",
+        "model_version",
+    ),
+}
+
+
+@dataclass
+class LoadResult:
+    table: str
+    rows: int
+    upserted: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _qualified(target: Table) -> str:
+    return ".".join(_quote(p) for p in target.fullname.split("."))
+
+
+def stage_records(target: Table, rows: Sequence[Dict[str, Any]]) -> Tuple[List[str], List[tuple]]:
+    """Staging columns and one record per row, aligned to them.
+
+    Rows are sparse dicts: the columns are the union of their keys plus ``id`` and
+    columns with scalar ORM defaults; a row lacking a column gets the default, else
+    NULL. ``grid_cell`` is derived from latitude / longitude where missing.
+    """
+    if "grid_cell" in target.c:
+        rows = [
+            r
+            if r.get("grid_cell") is not None
+            else {**r, "grid_cell": grid_cell_id(r["latitude"], r["longitude"])}
+            for r in rows
+        ]
+    defaults = {
+        c.name: c.default.arg
+        for c in target.columns
+        if c.default is not None and getattr(c.default, "is_scalar", False)
+    }
+    present = set().union(*(r.keys() for r in rows))
+    names = [c.name for c in target.columns if c.name == "id" or c.name in present or c.name in defaults]
+    records = [
+        tuple(uuid.uuid4() if name == "id" else row.get(name, defaults.get(name)) for name in names)
+        for row in rows
+    ]
+    return names, records
+
+
+def upsert_sql(target: Table, names: Sequence[str], key: Sequence[str]) -> str:
+    """Merge the staging table into ``target`` on its natural ``key``.
+
+    On conflict a NULL staged for a row that lacked the column keeps the stored value,
+    so re-ingesting a reading without e.g. ``o3`` does not wipe an ``o3`` already stored.
+    """
+    stage = _quote(f"_stage_{target.name}")
+    cols = ", ".join(_quote(n) for n in names)
+    key_cols = ", ".join(_quote(k) for k in key)
+    updates = ", ".join(
+        f"{_quote(n)} = COALESCE(EXCLUDED.{_quote(n)}, t.{_quote(n)})"
+        for n in names
+        if n != "id" and n not in key
+    )
+    return (
+        f"INSERT INTO {_qualified(target)} AS t ({cols}) "
+        f"SELECT DISTINCT ON ({key_cols}) {cols} FROM {stage} "
+        f"ORDER BY {key_cols} "
+        f"ON CONFLICT ({key_cols}) DO " + (f"UPDATE SET {updates}" if updates else "NOTHING")
+    )
+
+
+class BulkLoader:
+    """Bulk upserts through asyncpg binary COPY into a temporary staging table.
+
+    Rows are COPYed into ``_stage_<table>`` (dropped on commit) and merged into the
+    target with one ``INSERT ... SELECT DISTINCT ON (key) ... ON CONFLICT (key) DO
+    UPDATE`` (``upsert_sql``), so a batch costs two statements regardless of its size. Readings batches
+    also refresh core.latest_readings for the stations they touched. Runs inside the
+    session's current transaction; the caller commits.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def load(self, table: str, rows: Sequence[Dict[str, Any]]) -> LoadResult:
+        if table not in BULK_MODELS:
+            raise ValueError(f"Bulk loading not supported for table: {table}")
+        if not rows:
+            return LoadResult(table, 0, 0, 0.0)
+        started = time.perf_counter()
+        target: Table = BULK_MODELS[table].__table__
+        key = NATURAL_KEYS[table]
+        names, records = stage_records(target, rows)
+
+        conn = await self.db.connection()
+        stage = f"_stage_{target.name}"
+        target_name = _qualified(target)
+        # Statements go through the SQLAlchemy connection so they join the session's
+        # transaction (asyncpg only opens it on the first SQLAlchemy-issued statement);
+        # only the COPY itself uses the raw driver connection.
+        await conn.exec_driver_sql(
+            f"CREATE TEMP TABLE IF NOT EXISTS {_quote(stage)} "
+            f"(LIKE {target_name} INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+        raw = (await conn.get_raw_connection()).driver_connection
+        await raw.copy_records_to_table(stage, records=records, columns=names)
+
+        result = await conn.exec_driver_sql(upsert_sql(target, names, key))
+        upserted = result.rowcount
+        if table == "aqi_readings":
+            await refresh_latest_readings(
+                conn,
+                f'SELECT station_id, max("timestamp") AS ts FROM {_quote(stage)} GROUP BY station_id',
+            )
+        await conn.exec_driver_sql(f"TRUNCATE {_quote(stage)}")
+
+        seconds = time.perf_counter() - started
+        BULK_ROWS.labels(table=table).inc(upserted)
+        BULK_SECONDS.labels(table=table).observe(seconds)
+        load = LoadResult(table, len(rows), upserted, seconds)
+        logger.info(
+            "Bulk load completed",
+            table=table,
+            rows=load.rows,
+            upserted=upserted,
+            rows_per_second=round(load.rows_per_second),
+        )
+        return load
+
+
+async def copy_rows(table: str, rows: List[Dict[str, Any]]) -> None:
+    """BatchWriter sink: one COPY-based upsert per flush, committed on its own."""
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            await BulkLoader(session).load(table, rows)
@@ -1,9 +1,134 @@
 import asyncio
+import csv
+import io
+import json
+import os
+import random
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
 import structlog
-from typing import Any
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.services.batch_writer import Batch, BatchWriter
+from app.services.latest_store import LatestReadingsStore, get_latest_store
+from app.services.spatial_service import get_spatial_index
+from app.services.weather_field import WeatherField, set_weather_field, weather_nodes
 
 logger = structlog.get_logger()
 
+# Reuse the standalone data-pipeline ingestors when the repo layout is available
+# (same approach ForecastingService uses for ml-models). Fallback gracefully if not.
+try:
+    REPO_ROOT = Path(__file__).resolve().parents[3]
+    PIPELINE_DIR = REPO_ROOT / "data-pipeline"
+    if PIPELINE_DIR.exists():
+        if str(PIPELINE_DIR) not in sys.path:
+            sys.path.append(str(PIPELINE_DIR))
+        from ingestors.openaq import fetch_measurements  # type: ignore
+        from ingestors.firms import fetch_fires_24h  # type: ignore
+        from ingestors.open_meteo import fetch_hourly_weather  # type: ignore
+        from ingestors.open_meteo_air_quality import fetch_air_quality  # type: ignore
+        from utils.http import retries_off  # type: ignore
+        from utils.stages import StageRecorder  # type: ignore
+        from utils.validate import count_rows  # type: ignore
+
+        _INGESTORS_AVAILABLE = True
+    else:
+        _INGESTORS_AVAILABLE = False
+except Exception:  # pragma: no cover
+    _INGESTORS_AVAILABLE = False
+
+DELHI_LAT = 28.6139
+DELHI_LON = 77.2090
+
+SOURCE_DURATION = Histogram(
+    "pipeline_source_duration_seconds",
+    "Wall time of one ingestion run per source (including retries)",
+    ["source"],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+SOURCE_LAG = Gauge(
+    "pipeline_source_lag_seconds",
+    "Seconds since the last successful ingestion run per source",
+    ["source"],
+)
+SOURCE_RUNS = Counter(
+    "pipeline_source_runs_total",
+    "Ingestion runs per source by outcome",
+    ["source", "outcome"],
+)
+
+# Fire hotspots stay in the in-memory spatial index this long after detection
+FIRE_INDEX_HOURS = float(os.getenv("FIRE_INDEX_HOURS", "48"))
+
+# Columns that must be present for a row to be written, per target table
+REQUIRED_COLUMNS = {
+    "aqi_readings": ("station_id", "timestamp", "latitude", "longitude"),
+    "fire_hotspots": ("timestamp", "latitude", "longitude"),
+}
+
+
+class _UnrecordedStages:
+    """Used when data-pipeline utils are not importable: stages run without accounting."""
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None) -> Iterator[Any]:
+        yield SimpleNamespace(rows_in=rows_in, rows_out=None, add_retry=lambda: None)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {}
+
+    def total_seconds(self) -> float:
+        return 0.0
+
+
+async def _fetch_in_thread(func: Callable[..., Any], *args: Any) -> Any:
+    """Run a blocking data-pipeline ingestor in a worker thread, making single HTTP
+    attempts: IngestionSource retries whole fetches, so a timed-out attempt does not
+    leave a thread behind that is still sleeping between retries of its own."""
+
+    def call() -> Any:
+        with retries_off():
+            return func(*args)
+
+    return await asyncio.to_thread(call)
+
+
+@dataclass
+class IngestionSource:
+    """A periodically fetched upstream source and its scheduling policy.
+
+    ``fetch`` is an async callable; blocking ingestors should be wrapped with
+    ``_fetch_in_thread`` (``asyncio.to_thread`` with HTTP-level retries off).
+    ``parse`` turns a fetch result into typed batches for the database writer;
+    sources without it are fetched but not persisted. Each failed attempt is
+    retried up to ``max_retries`` times with exponential backoff
+    (``backoff_seconds * 2**attempt`` capped at ``backoff_max_seconds``);
+    ``timeout_seconds`` bounds every single attempt.
+    """
+
+    name: str
+    fetch: Callable[[], Awaitable[Any]]
+    interval_seconds: float
+    parse: Optional[Callable[[Any], List[Batch]]] = None
+    jitter_seconds: float = 0.0
+    timeout_seconds: float = 60.0
+    max_retries: int = 3
+    backoff_seconds: float = 2.0
+    backoff_max_seconds: float = 60.0
+    last_success: Optional[float] = field(default=None, init=False)
+    registered_at: float = field(default_factory=time.time, init=False)
+
+    def lag_seconds(self) -> float:
+        return time.time() - (self.last_success or self.registered_at)
+
 
 class DataPipelineService:
     """
@@ -12,38 +137,354 @@ class DataPipelineService:
     - NASA MODIS and FIRMS
     - IMD weather
     - Traffic density
+
+    Each registered source runs in its own task on its own interval, so a slow or
+    failing source never delays the others.
+
+    Parsed batches go through a bounded BatchWriter queue, so a slow database
+    applies backpressure to the fetchers rather than buffering without limit.
+    Validated aqi_readings rows also feed the in-memory LatestReadingsStore.
+
+    Environment variables:
+      PIPELINE_SOURCES=openaq,firms  -> Default sources to register (default: all; empty disables)
+      PIPELINE_WRITER_QUEUE=32       -> Max batches waiting for the writer
+      PIPELINE_FLUSH_ROWS=5000       -> Flush a table once this many rows are pending
+      PIPELINE_FLUSH_INTERVAL=2      -> Flush pending rows at least every N seconds
+      PIPELINE_FLUSH_RETRIES=5       -> Retries (with backoff) of a failed flush before moving on
+      PIPELINE_MAX_PENDING_ROWS=...  -> Unwritten rows kept per table before the oldest are dropped
+                                        (default: 10 x PIPELINE_FLUSH_ROWS)
+      PIPELINE_MANIFEST_PATH=...     -> Write the per-source stage manifest here after each run
+      PIPELINE_TRACK_MEMORY=1        -> Record tracemalloc peak memory per stage (adds overhead)
     """
 
-    def __init__(self) -> None:
-        self._task: asyncio.Task | None = None
+    def __init__(
+        self,
+        register_defaults: bool = True,
+        writer: Optional[BatchWriter] = None,
+        latest_store: Optional[LatestReadingsStore] = None,
+    ) -> None:
+        self._sources: Dict[str, IngestionSource] = {}
+        self._writer = writer or BatchWriter(
+            max_queue=int(os.getenv("PIPELINE_WRITER_QUEUE", "32")),
+            flush_rows=int(os.getenv("PIPELINE_FLUSH_ROWS", "5000")),
+            flush_interval=float(os.getenv("PIPELINE_FLUSH_INTERVAL", "2")),
+            max_retries=int(os.getenv("PIPELINE_FLUSH_RETRIES", "5")),
+            max_pending_rows=int(os.getenv("PIPELINE_MAX_PENDING_ROWS", "0")) or None,
+        )
+        self._latest_store = latest_store or get_latest_store()
+        self._tasks: List[asyncio.Task] = []
         self._running: bool = False
+        self._manifest_path = os.getenv("PIPELINE_MANIFEST_PATH")
+        self._track_memory = os.getenv("PIPELINE_TRACK_MEMORY") == "1"
+        # Latest run per source, same shape as the standalone runner's run_manifest.json
+        self.manifest: Dict[str, Dict[str, Any]] = {}
+        if register_defaults:
+            self._register_default_sources()
+
+    def register_source(self, source: IngestionSource) -> None:
+        if source.name in self._sources:
+            raise ValueError(f"Ingestion source already registered: {source.name}")
+        self._sources[source.name] = source
+        SOURCE_LAG.labels(source=source.name).set_function(source.lag_seconds)
+        if self._running:
+            self._tasks.append(asyncio.create_task(self._run_source(source)))
+
+    @property
+    def sources(self) -> Dict[str, IngestionSource]:
+        return dict(self._sources)
+
+    def _register_default_sources(self) -> None:
+        if not _INGESTORS_AVAILABLE:
+            logger.warning("data-pipeline ingestors not importable; no default sources")
+            return
+        defaults = [
+            IngestionSource(
+                "openaq",
+                lambda: _fetch_in_thread(fetch_measurements, 1000, 2),
+                interval_seconds=900,
+                parse=parse_openaq,
+                jitter_seconds=60,
+                timeout_seconds=120,
+            ),
+            IngestionSource(
+                "firms",
+                lambda: _fetch_in_thread(fetch_fires_24h, "IND"),
+                interval_seconds=3600,
+                parse=parse_firms,
+                jitter_seconds=300,
+                timeout_seconds=90,
+            ),
+            IngestionSource(
+                "weather",
+                lambda: _fetch_in_thread(fetch_hourly_weather, *weather_nodes()),
+                interval_seconds=3600,
+                parse=parse_weather,
+                jitter_seconds=120,
+                timeout_seconds=45,
+            ),
+            IngestionSource(
+                "air_quality",
+                lambda: _fetch_in_thread(fetch_air_quality, DELHI_LAT, DELHI_LON, 72),
+                interval_seconds=1800,
+                jitter_seconds=120,
+                timeout_seconds=45,
+            ),
+        ]
+        enabled = os.getenv("PIPELINE_SOURCES")
+        wanted = None if enabled is None else {s.strip() for s in enabled.split(",") if s.strip()}
+        for source in defaults:
+            if wanted is None or source.name in wanted:
+                self.register_source(source)
 
     async def start(self) -> None:
         if self._running:
             return
         self._running = True
-        logger.info("Starting data pipeline background task")
-        self._task = asyncio.create_task(self._run_loop())
+        logger.info("Starting data pipeline scheduler", sources=list(self._sources))
+        await self._writer.start()
+        self._tasks = [
+            asyncio.create_task(self._run_source(source))
+            for source in self._sources.values()
+        ]
 
     async def stop(self) -> None:
         if not self._running:
             return
-        logger.info("Stopping data pipeline background task")
+        logger.info("Stopping data pipeline scheduler")
         self._running = False
-        if self._task:
-            self._task.cancel()
-            try:
-                await self._task
-            except asyncio.CancelledError:
-                pass
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self._writer.stop()
 
-    async def _run_loop(self) -> None:
+    async def _run_source(self, source: IngestionSource) -> None:
+        """Scheduling loop for one source: run, then sleep until the next jittered slot."""
         try:
             while self._running:
-                # TODO: Fetch from CPCB, NASA, IMD; validate; write to DB/cache
-                logger.info("Data pipeline tick")
-                await asyncio.sleep(60)  # run every minute
+                started = time.monotonic()
+                await self.run_once(source)
+                delay = source.interval_seconds + random.uniform(0, source.jitter_seconds)
+                await asyncio.sleep(max(0.0, delay - (time.monotonic() - started)))
         except asyncio.CancelledError:
-            logger.info("Data pipeline loop cancelled")
-        except Exception as e:
-            logger.error("Data pipeline error", error=str(e))
+            logger.info("Data pipeline source cancelled", source=source.name)
+
+    async def run_once(self, source: IngestionSource) -> bool:
+        """Run one fetch for ``source`` with timeout and retry policy; returns success.
+
+        A failure anywhere in the run (fetch, parse, validate or write) is counted as a
+        failed run and recorded in the manifest; it never escapes to the scheduler.
+        Stages are recorded as fetch (including retries), parse, validate and write;
+        write covers handing batches to the writer queue, including backpressure waits.
+        """
+        started = time.monotonic()
+        recorder = StageRecorder(self._track_memory) if _INGESTORS_AVAILABLE else _UnrecordedStages()
+        entry: Dict[str, Any] = {"status": "error"}
+        try:
+            try:
+                with recorder.stage("fetch") as stage:
+                    result = await self._fetch_with_retries(source, stage)
+                entry["rows"] = await self._handle_result(source, result, recorder)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # Broad by design: network / parse errors
+                entry["message"] = "timeout" if isinstance(e, TimeoutError) else str(e)
+                logger.error("Ingestion run failed", source=source.name, error=entry["message"])
+                SOURCE_RUNS.labels(source=source.name, outcome="failed").inc()
+                return False
+            source.last_success = time.time()
+            SOURCE_RUNS.labels(source=source.name, outcome="ok").inc()
+            entry["status"] = "ok"
+            return True
+        finally:
+            SOURCE_DURATION.labels(source=source.name).observe(time.monotonic() - started)
+            entry["stages"] = recorder.as_dict()
+            entry["seconds"] = round(time.monotonic() - started, 4)
+            entry["finished_at"] = datetime.now(timezone.utc).isoformat()
+            self.manifest[source.name] = entry
+            self._write_manifest()
+
+    async def _fetch_with_retries(self, source: IngestionSource, stage: Any) -> Any:
+        for attempt in range(source.max_retries + 1):
+            try:
+                async with asyncio.timeout(source.timeout_seconds):
+                    return await source.fetch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # Broad by design: network / parse errors
+                timed_out = isinstance(e, TimeoutError)
+                logger.warning(
+                    "Ingestion attempt failed",
+                    source=source.name,
+                    attempt=attempt + 1,
+                    error="timeout" if timed_out else str(e),
+                )
+                if attempt == source.max_retries:
+                    raise
+                stage.add_retry()
+                backoff = min(source.backoff_max_seconds, source.backoff_seconds * 2**attempt)
+                await asyncio.sleep(backoff * random.uniform(0.5, 1.0))
+
+    async def _handle_result(self, source: IngestionSource, result: Any, recorder: Any) -> Optional[int]:
+        """Parse, validate and enqueue a fetch result; returns rows handed to the writer."""
+        if source.parse is None:
+            logger.info("Ingestion run completed", source=source.name)
+            return None
+        rows_in = count_rows(result) if _INGESTORS_AVAILABLE else None
+        with recorder.stage("parse", rows_in=rows_in) as stage:
+            batches = source.parse(result)
+            stage.rows_out = sum(len(b.rows) for b in batches)
+        with recorder.stage("validate", rows_in=stage.rows_out) as stage:
+            batches = [validate_batch(b) for b in batches]
+            stage.rows_out = sum(len(b.rows) for b in batches)
+        with recorder.stage("write", rows_in=stage.rows_out) as stage:
+            for batch in batches:
+                batch.source = source.name
+                if batch.table == "aqi_readings":
+                    self._latest_store.ingest(batch.rows)
+                self._index_batch(batch)
+                # Blocks while the writer queue is full (backpressure)
+                await self._writer.put(batch)
+            stage.rows_out = stage.rows_in
+        await asyncio.to_thread(self._latest_store.maybe_snapshot)
+        logger.info("Ingestion run completed", source=source.name, rows=stage.rows_out)
+        return stage.rows_out
+
+    def _index_batch(self, batch: Batch) -> None:
+        """Keep the station and fire spatial indexes current with ingested rows."""
+        if batch.table == "aqi_readings":
+            stations = {r["station_id"]: (r["latitude"], r["longitude"]) for r in batch.rows}
+            get_spatial_index("stations").insert(
+                list(stations),
+                [p[0] for p in stations.values()],
+                [p[1] for p in stations.values()],
+            )
+        elif batch.table == "fire_hotspots" and batch.rows:
+            fires = get_spatial_index("fires")
+            fires.insert(
+                [(r["timestamp"], r["latitude"], r["longitude"], r.get("satellite")) for r in batch.rows],
+                [r["latitude"] for r in batch.rows],
+                [r["longitude"] for r in batch.rows],
+                stamps=[_epoch_seconds(r["timestamp"]) for r in batch.rows],
+            )
+            fires.prune(time.time() - FIRE_INDEX_HOURS * 3600)
+
+    def _write_manifest(self) -> None:
+        if not self._manifest_path:
+            return
+        tmp = f"{self._manifest_path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.manifest, f, indent=2, default=str)
+            os.replace(tmp, self._manifest_path)
+        except OSError as e:
+            logger.warning("Could not write pipeline manifest", error=str(e))
+
+
+def _epoch_seconds(ts: datetime) -> float:
+    # Source timestamps without a zone are UTC
+    return (ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def validate_batch(batch: Batch) -> Batch:
+    """Drop rows missing required columns or with coordinates out of range."""
+    required = REQUIRED_COLUMNS.get(batch.table, ())
+    rows = [
+        row
+        for row in batch.rows
+        if all(row.get(c) is not None for c in required)
+        and -90 <= row.get("latitude", 0) <= 90
+        and -180 <= row.get("longitude", 0) <= 180
+    ]
+    if len(rows) < len(batch.rows):
+        logger.warning(
+            "Dropped invalid rows", table=batch.table, dropped=len(batch.rows) - len(rows)
+        )
+    return Batch(batch.table, rows, batch.source)
+
+
+OPENAQ_PARAMETER_COLUMNS = {
+    "pm25": "pm2_5",
+    "pm10": "pm10",
+    "no2": "no2",
+    "so2": "so2",
+    "o3": "o3",
+    "co": "co",
+}
+
+FIRMS_CONFIDENCE = {"l": 30.0, "n": 60.0, "h": 90.0}
+
+
+def _parse_timestamp(value: str) -> datetime:
+    # Columns are naive UTC DateTime
+    ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def _float_or_none(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_openaq(result: Dict[str, Any]) -> List[Batch]:
+    """Pivot the OpenAQ columnar batch into one aqi_readings row per (station, timestamp)."""
+    columns = result.get("columns") or {}
+    readings: Dict[tuple, Dict[str, Any]] = {}
+    for i, ts in enumerate(columns.get("datetime") or []):
+        column = OPENAQ_PARAMETER_COLUMNS.get(columns["parameter"][i])
+        lat, lon = columns["latitude"][i], columns["longitude"][i]
+        if not ts or column is None or lat is None or lon is None:
+            continue
+        station = columns["location_id"][i]
+        station_id = str(station if station is not None else columns["location"][i])
+        timestamp = _parse_timestamp(ts)
+        row = readings.setdefault(
+            (station_id, timestamp),
+            {
+                "station_id": station_id,
+                "timestamp": timestamp,
+                "latitude": lat,
+                "longitude": lon,
+                "data_source": "OpenAQ",
+            },
+        )
+        row[column] = _float_or_none(columns["value"][i])
+    return [Batch("aqi_readings", list(readings.values()))]
+
+
+def parse_weather(result: Any) -> List[Batch]:
+    """Install the weather node forecast as the current WeatherField (not persisted)."""
+    set_weather_field(WeatherField.from_open_meteo(result))
+    return []
+
+
+def parse_firms(text: str) -> List[Batch]:
+    """Parse the FIRMS country CSV into fire_hotspots rows (empty on error pages)."""
+    rows = []
+    for rec in csv.DictReader(io.StringIO(text)):
+        lat, lon = _float_or_none(rec.get("latitude")), _float_or_none(rec.get("longitude"))
+        acq_date, acq_time = rec.get("acq_date"), (rec.get("acq_time") or "").zfill(4)
+        if lat is None or lon is None or not acq_date:
+            continue
+        timestamp = datetime.strptime(f"{acq_date} {acq_time}", "%Y-%m-%d %H%M")
+        confidence = rec.get("confidence") or ""
+        rows.append(
+            {
+                "timestamp": timestamp,
+                "latitude": lat,
+                "longitude": lon,
+                "brightness": _float_or_none(rec.get("bright_ti4") or rec.get("brightness")),
+                "confidence": FIRMS_CONFIDENCE.get(confidence, _float_or_none(confidence)),
+                "fire_radiative_power": _float_or_none(rec.get("frp")),
+                "satellite": rec.get("satellite"),
+                "instrument": rec.get("instrument"),
+                "track": rec.get("track"),
+                "acquisition_date": datetime.strptime(acq_date, "%Y-%m-%d"),
+                "acquisition_time": acq_time,
+            }
+        )
+    return [Batch("fire_hotspots", rows)]
@@ -0,0 +1,217 @@
+"""Gaussian plume dispersion of point and area sources onto grid cells.
+
+Ground-level concentration downwind of a source with emission rate Q (g/s) and
+effective height H (m), with ground reflection:
+
+    C = Q / (pi u sy sz) * exp(-y^2 / 2 sy^2) * exp(-H^2 / 2 sz^2)
+
+where x is the downwind and y the crosswind distance of the cell, u the wind speed at
+the source and sy(x), sz(x) the Briggs urban dispersion coefficients of the
+Pasquill-Gifford stability class. Area sources (industrial clusters, burn fields) are
+virtual point sources with an initial lateral spread of width / 4.3.
+
+Only cells within the cutoff radius of a source are evaluated: the (source, cell)
+pairs come from a ``SpatialIndex`` over the cells, every pair is computed in one
+broadcast pass and contributions are summed per cell with ``np.bincount``, so cost is
+linear in sources x nearby cells.
+
+Environment variables:
+  DISPERSION_CUTOFF_KM=25        -> Cells farther than this from a source get no contribution
+  DISPERSION_MIN_WIND=1.0        -> Wind speed floor (m/s); the plume model breaks down in calms
+  DISPERSION_FIRE_PM25_GS=50     -> PM2.5 emission assumed per active fire hotspot (g/s)
+  DISPERSION_SOURCES_FILE=path   -> JSON list of fixed sources (industrial clusters), records
+                                    as accepted by ``EmissionSources.from_records``
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+from app.services.spatial_service import KM_PER_DEGREE, SpatialIndex
+
+CUTOFF_KM = float(os.getenv("DISPERSION_CUTOFF_KM", "25"))
+MIN_WIND = float(os.getenv("DISPERSION_MIN_WIND", "1.0"))
+FIRE_PM25_GS = float(os.getenv("DISPERSION_FIRE_PM25_GS", "50"))
+SOURCES_FILE = os.getenv("DISPERSION_SOURCES_FILE")
+# (hour, source, cell) triples evaluated per block, bounding temporary memory
+BLOCK_SIZE = 1 << 20
+# Crosswind truncation: exp(-PLUME_SIGMAS^2 / 2) of the centreline value is dropped
+PLUME_SIGMAS = 5.0
+
+# Briggs urban coefficients per class A-F (x in metres):
+#   sy = a x (1 + 0.0004 x)^-1/2      sz = b x (1 + c x)^p
+_SY_A = np.array([0.32, 0.32, 0.22, 0.16, 0.11, 0.11])
+_SZ_B = np.array([0.24, 0.24, 0.20, 0.14, 0.08, 0.08])
+_SZ_C = np.array([0.001, 0.001, 0.0, 0.0003, 0.0015, 0.0015])
+_SZ_P = np.array([0.5, 0.5, 0.0, -0.5, -0.5, -0.5])
+
+# Pasquill classes by 10 m wind speed: moderate insolation by day, clear skies at night
+_WIND_EDGES = np.array([2.0, 3.0, 5.0, 6.0])
+_DAY_CLASS = np.array([1, 1, 2, 3, 3])  # B B C D D
+_NIGHT_CLASS = np.array([5, 5, 4, 3, 3])  # F F E D D
+IST = timedelta(hours=5, minutes=30)
+
+
+def stability_class(wind_speed: np.ndarray, daytime: Any = True) -> np.ndarray:
+    """Pasquill-Gifford class index (0 = A ... 5 = F) per wind speed."""
+    band = np.digitize(np.asarray(wind_speed, dtype=np.float64), _WIND_EDGES)
+    return np.where(daytime, _DAY_CLASS[band], _NIGHT_CLASS[band])
+
+
+def is_daytime(times: Sequence[datetime]) -> np.ndarray:
+    """Local (IST) daytime, 06:00-18:00, for naive UTC timestamps."""
+    return np.array([6 <= (t + IST).hour < 18 for t in times], dtype=bool)
+
+
+def sigma_y(x_m: np.ndarray, classes: np.ndarray) -> np.ndarray:
+    """Briggs urban lateral spread (m) at downwind distance ``x_m``."""
+    return _SY_A[classes] * x_m / np.sqrt(1.0 + 0.0004 * x_m)
+
+
+def sigma_z(x_m: np.ndarray, classes: np.ndarray) -> np.ndarray:
+    """Briggs urban vertical spread (m) at downwind distance ``x_m``."""
+    return _SZ_B[classes] * x_m * (1.0 + _SZ_C[classes] * x_m) ** _SZ_P[classes]
+
+
+@dataclass
+class EmissionSources:
+    """Columnar point/area sources. ``width_m`` is 0 for point sources."""
+
+    lat: np.ndarray
+    lon: np.ndarray
+    rate_gs: np.ndarray
+    height_m: np.ndarray
+    width_m: np.ndarray
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "EmissionSources":
+        """Build from dicts with latitude, longitude, rate_gs and optional height_m, width_m."""
+        records = list(records)
+
+        def column(key: str) -> np.ndarray:
+            return np.array([float(r.get(key) or 0.0) for r in records], dtype=np.float64)
+
+        return cls(
+            lat=column("latitude"),
+            lon=column("longitude"),
+            rate_gs=column("rate_gs"),
+            height_m=column("height_m"),
+            width_m=column("width_m"),
+        )
+
+    @classmethod
+    def concat(cls, *parts: "EmissionSources") -> "EmissionSources":
+        return cls(
+            *(np.concatenate([getattr(p, f) for p in parts]) for f in ("lat", "lon", "rate_gs", "height_m", "width_m"))
+        )
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+
+_fixed_sources: Optional[EmissionSources] = None
+
+
+def fixed_sources() -> EmissionSources:
+    """Sources from DISPERSION_SOURCES_FILE, read once per process (empty when unset)."""
+    global _fixed_sources
+    if _fixed_sources is None:
+        records = []
+        if SOURCES_FILE:
+            with open(SOURCES_FILE) as f:
+                records = json.load(f)
+        _fixed_sources = EmissionSources.from_records(records)
+    return _fixed_sources
+
+
+def plume_concentration(
+    sources: EmissionSources,
+    lat: np.ndarray,
+    lon: np.ndarray,
+    wind_speed: np.ndarray,
+    wind_dir: np.ndarray,
+    daytime: Any = True,
+    cutoff_km: float = CUTOFF_KM,
+    index: Optional[SpatialIndex] = None,
+) -> np.ndarray:
+    """Summed ground-level concentration (ug/m3) of all sources at every point.
+
+    ``wind_speed`` (m/s) and ``wind_dir`` (degrees the wind blows *from*) are given per
+    point, shaped (points,) or (hours, points); each source uses the wind of its
+    nearest point. ``daytime`` is a bool or one per hour. Returns (points,) or
+    (hours, points) to match the wind. ``index`` is an optional prebuilt index over
+    the points (ids 0..n-1, inserted in order), reusable across calls on one grid.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    single = np.ndim(wind_speed) == 1
+    speed = np.atleast_2d(np.asarray(wind_speed, dtype=np.float64))
+    direction = np.atleast_2d(np.asarray(wind_dir, dtype=np.float64))
+    hours, n = speed.shape[0], lat.size
+    out = np.zeros((hours, n))
+    if len(sources) == 0 or n == 0:
+        return out[0] if single else out
+
+    if index is None:
+        index = SpatialIndex()
+        index.insert(list(range(n)), lat, lon)
+    offsets, cells, _ = index.within_batch(sources.lat, sources.lon, cutoff_km)
+    owner = np.repeat(np.arange(len(sources)), np.diff(offsets))
+    at_source, _ = index.nearest_batch(sources.lat, sources.lon, k=1)
+    at_source = at_source[:, 0]
+
+    # Cell offsets from each source on the source's local plane, in metres
+    kx = KM_PER_DEGREE * 1000.0 * np.cos(np.radians(sources.lat))
+    dx = (lon[cells] - sources.lon[owner]) * kx[owner]
+    dy = (lat[cells] - sources.lat[owner]) * KM_PER_DEGREE * 1000.0
+    rate = sources.rate_gs[owner]
+    height2 = sources.height_m[owner] ** 2
+    spread2 = (sources.width_m[owner] / 4.3) ** 2
+    day = np.broadcast_to(np.asarray(daytime, dtype=bool), (hours,))
+
+    hour_chunk = max(1, min(hours, BLOCK_SIZE // max(len(cells), 1)))
+    pair_chunk = max(1, BLOCK_SIZE // hour_chunk)
+    for start in range(0, hours, hour_chunk):
+        h = np.arange(start, min(start + hour_chunk, hours))
+        # Wind, direction and stability depend only on (hour, source)
+        u_src = np.maximum(speed[h][:, at_source], MIN_WIND)
+        theta = np.radians(direction[h][:, at_source])
+        # Wind from ``theta`` carries the plume towards theta + 180 degrees
+        ex_src, ey_src = -np.sin(theta), -np.cos(theta)
+        class_src = stability_class(u_src, day[h][:, None])
+        for lo in range(0, len(cells), pair_chunk):
+            p = np.arange(lo, min(lo + pair_chunk, len(cells)))
+            ex, ey = ex_src[:, owner[p]], ey_src[:, owner[p]]
+            x = dx[p] * ex + dy[p] * ey
+            # Only downwind pairs, flattened to (hour, pair) positions
+            keep = np.flatnonzero(x > 0)
+            row, pair = keep // len(p), p[keep % len(p)]
+            x = x.ravel()[keep]
+            y = dx[pair] * ey.ravel()[keep] - dy[pair] * ex.ravel()[keep]
+            src = owner[pair]
+            u, classes = u_src[row, src], class_src[row, src]
+            sy2 = sigma_y(x, classes) ** 2 + spread2[pair]
+            # Truncate the plume at PLUME_SIGMAS crosswind standard deviations
+            near = y**2 < PLUME_SIGMAS**2 * sy2
+            x, y, u, classes, sy2, row, pair = (a[near] for a in (x, y, u, classes, sy2, row, pair))
+            sz = sigma_z(x, classes)
+            conc = rate[pair] / (np.pi * u * np.sqrt(sy2) * sz) * np.exp(-0.5 * y**2 / sy2 - 0.5 * height2[pair] / sz**2)
+            target = (h[row] - start) * n + cells[pair]
+            out[h] += np.bincount(target, weights=conc * 1e6, minlength=len(h) * n).reshape(len(h), n)
+    return out[0] if single else out
+
+
+def wind_components(speed: np.ndarray, direction: np.ndarray):
+    """(u, v) of a meteorological wind (``direction`` = degrees blowing from)."""
+    theta = np.radians(direction)
+    return -speed * np.sin(theta), -speed * np.cos(theta)
+
+
+def wind_from_components(u: np.ndarray, v: np.ndarray):
+    """Inverse of ``wind_components``: (speed, direction in [0, 360))."""
+    return np.hypot(u, v), np.degrees(np.arctan2(-u, -v)) % 360.0
+
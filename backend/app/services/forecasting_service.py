@@ -1,10 +1,47 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+import asyncio
 import random
 import os
+import time
 from pathlib import Path
 
+import numpy as np
+
+from app.services.dispersion import (
+    CUTOFF_KM,
+    FIRE_PM25_GS,
+    EmissionSources,
+    fixed_sources,
+    is_daytime,
+    plume_concentration,
+    wind_components,
+    wind_from_components,
+)
+from app.services.interpolation import Interpolator, interpolate_grid
+from app.services.latest_store import get_latest_store
+from app.services.quadtree import refine
+from app.services.query_catalog import CATALOG
+from app.services.route_exposure import (
+    MODE_SPEED_KMH,
+    SpaceTimeGrid,
+    point_rows,
+    route_exposure,
+    summarize,
+)
+from app.services.spatial_service import (
+    KM_PER_DEGREE,
+    SpatialGrid,
+    SpatialService,
+    cell_centres,
+    cell_keys,
+    densify_routes,
+    get_spatial_index,
+    grid_cell_id,
+)
+from app.services.weather_field import get_weather_field, point_weather
+
 # Attempt to import local ML model utilities. Fallback gracefully if not present.
 try:
     # Add ml-models directory to path dynamically
@@ -15,7 +52,12 @@ try:
 
         if str(ML_DIR) not in sys.path:
             sys.path.append(str(ML_DIR))
-        from model_utils import load_model_bundle, predict_pm25  # type: ignore
+        from model_utils import (  # type: ignore
+            load_model_bundle,
+            pm25_to_aqi_array,
+            predict_pm25,
+            predict_pm25_batch,
+        )
         from config import MODEL_BUNDLE_PATH  # type: ignore
 
         _ML_AVAILABLE = True
@@ -26,6 +68,50 @@ except Exception:  # pragma: no cover
     MODEL_BUNDLE_PATH = None  # type: ignore
 
 
+# A station this close that reported within the last two hours answers "current AQI"
+OBSERVED_MAX_KM = float(os.getenv("CURRENT_AQI_STATION_RADIUS_KM", "3"))
+# Station winds older than this are ignored; without any, the model defaults apply
+WIND_MAX_AGE_HOURS = 3
+DEFAULT_WIND_SPEED, DEFAULT_WIND_DIR = 2.5, 90.0
+# Route exposure samples a forecast raster at this resolution, cached per area and hour
+ROUTE_GRID_KM = float(os.getenv("ROUTE_GRID_KM", "1"))
+# centred on the level-14 cell (0.04 degree) holding the area's midpoint, radius rounded
+# up to whole ROUTE_GRID_SNAP_KM
+ROUTE_GRID_CELL_LEVEL = 14
+ROUTE_GRID_SNAP_KM = 5.0
+ROUTE_GRID_CACHE_SIZE = 32
+# Hours ahead the route raster (and so a route's departure) can reach
+ROUTE_HORIZON_HOURS = 72
+_route_fields: Dict[Any, SpaceTimeGrid] = {}
+# Map tiles are rendered from one regional raster per forecast run (the current hour)
+TILE_GRID_CENTER = (28.6139, 77.2090)
+TILE_GRID_RADIUS_KM = float(os.getenv("TILE_GRID_RADIUS_KM", "60"))
+TILE_GRID_KM = float(os.getenv("TILE_GRID_KM", "1"))
+TILE_HOURS = 24
+_tile_field: Dict[Any, SpaceTimeGrid] = {}
+_tile_lock = asyncio.Lock()
+
+
+def _aqi_category(aqi: int) -> str:
+    return (
+        "Good"
+        if aqi <= 50
+        else (
+            "Satisfactory"
+            if aqi <= 100
+            else (
+                "Moderate"
+                if aqi <= 200
+                else (
+                    "Poor"
+                    if aqi <= 300
+                    else "Very Poor" if aqi <= 400 else "Severe"
+                )
+            )
+        )
+    )
+
+
 class ForecastingService:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -36,19 +122,33 @@ class ForecastingService:
             except Exception:
                 self._model_bundle = None
 
+    @property
+    def model_version(self) -> str:
+        return "rf_pm25_v1" if self._model_bundle else "stub"
+
     async def get_current_aqi(self, lat: float, lon: float) -> Dict[str, Any]:
-        """Return current AQI estimate using trained model if available; fallback to random."""
+        """Return current AQI: a nearby station's latest reading from the in-memory store,
+        else the trained model's estimate if available; fallback to random."""
+        observed = get_latest_store().nearest(lat, lon, max_km=OBSERVED_MAX_KM, max_age_hours=2)
+        if observed is not None and observed["aqi"] is not None:
+            aqi = int(round(observed["aqi"]))
+            return {
+                "aqi": aqi,
+                "category": _aqi_category(aqi),
+                "pm25": observed["pm2_5"],
+                "confidence": 0.95,
+                "model_version": "observed",
+                "station_id": observed["station_id"],
+                "observed_at": observed["timestamp"],
+            }
+
         if self._model_bundle:
-            # Minimal feature vector; in future include latest weather ingestion
             now = datetime.utcnow()
+            weather = point_weather(np.array([lat]), np.array([lon]), [now])
             feat = {
                 "lat": lat,
                 "lon": lon,
-                "temp": 25.0,  # TODO: inject real-time weather
-                "humidity": 40.0,
-                "wind_speed": 2.5,
-                "wind_dir": 90.0,
-                "pressure": 1008.0,
+                **{k: float(np.ravel(v)[0]) for k, v in weather.items()},
                 "hour": now.hour,
                 "month": now.month,
                 "location": "delhi_center",
@@ -69,26 +169,9 @@ class ForecastingService:
                 pass  # fall through to random
 
         aqi = random.randint(50, 250)
-        category = (
-            "Good"
-            if aqi <= 50
-            else (
-                "Satisfactory"
-                if aqi <= 100
-                else (
-                    "Moderate"
-                    if aqi <= 200
-                    else (
-                        "Poor"
-                        if aqi <= 300
-                        else "Very Poor" if aqi <= 400 else "Severe"
-                    )
-                )
-            )
-        )
         return {
             "aqi": aqi,
-            "category": category,
+            "category": _aqi_category(aqi),
             "confidence": round(random.uniform(0.6, 0.9), 2),
             "model_version": "stub",
         }
@@ -97,19 +180,16 @@ class ForecastingService:
         self, lat: float, lon: float, hours: int
     ) -> List[Dict[str, Any]]:
         now = datetime.utcnow()
+        times = [now + timedelta(hours=i) for i in range(hours)]
+        weather = point_weather(np.array([lat]), np.array([lon]), times)
         series = []
-        for i in range(hours):
-            ts = now + timedelta(hours=i)
+        for i, ts in enumerate(times):
             base_pm25 = random.uniform(30, 140)
             if self._model_bundle:
                 feat = {
                     "lat": lat,
                     "lon": lon,
-                    "temp": 25.0,  # placeholder
-                    "humidity": 40.0,
-                    "wind_speed": 2.5,
-                    "wind_dir": 90.0,
-                    "pressure": 1008.0,
+                    **{k: float(np.ravel(v)[i] if np.ndim(v) else v) for k, v in weather.items()},
                     "hour": ts.hour,
                     "month": ts.month,
                     "location": "delhi_center",
@@ -139,6 +219,164 @@ class ForecastingService:
             )
         return series
 
+    async def get_grid_forecast(self, grid: SpatialGrid, hours: int) -> Dict[str, Any]:
+        """Hourly forecast for every evaluated grid cell at once.
+
+        Returns ``times`` plus ``aqi`` / ``pm2_5`` arrays shaped (hours, grid.size), in
+        the order of ``grid.points()``; the model (when loaded) is called once for the
+        whole grid rather than per cell.
+        """
+        now = datetime.utcnow()
+        times = [now + timedelta(hours=i) for i in range(hours)]
+        lat, lon = grid.points()
+        return {"times": times, **self.forecast_points(lat, lon, times)}
+
+    async def get_adaptive_forecast(
+        self, grid: SpatialGrid, hours: int, threshold: float, root_cells: int = 16
+    ) -> Dict[str, Any]:
+        """Quadtree forecast over ``grid``: blocks are split only where AQI differs from
+        a neighbouring block by more than ``threshold`` in some hour, and always around
+        active fire hotspots."""
+        now = datetime.utcnow()
+        times = [now + timedelta(hours=i) for i in range(hours)]
+        fires = get_spatial_index("fires").within(grid.center_lat, grid.center_lon, grid.radius_km)
+        # Fire ids are (timestamp, latitude, longitude, satellite)
+        focus = (np.array([f[0][1] for f in fires]), np.array([f[0][2] for f in fires]))
+        tree = refine(
+            grid,
+            lambda lat, lon: self.forecast_points(lat, lon, times),
+            threshold,
+            "aqi",
+            root_cells,
+            focus=focus,
+        )
+        return {"times": times, "tree": tree}
+
+    def forecast_points(self, lat: np.ndarray, lon: np.ndarray, times: List[datetime]) -> Dict[str, np.ndarray]:
+        """``aqi`` / ``pm2_5`` arrays shaped (len(times), points) for arbitrary points."""
+        hours, n = len(times), lat.size
+        rng = np.random.default_rng()
+        pm25 = rng.uniform(30, 140, size=(hours, n))
+        aqi = rng.integers(60, 241, size=(hours, n))
+        if self._model_bundle and n:
+            import pandas as pd
+
+            # Per point and hour, interpolated from the weather nodes
+            weather = point_weather(lat, lon, times)
+            features = pd.DataFrame(
+                {
+                    "lat": np.tile(lat, hours),
+                    "lon": np.tile(lon, hours),
+                    **{k: np.ravel(v) if np.ndim(v) else v for k, v in weather.items()},
+                    "hour": np.repeat([t.hour for t in times], n),
+                    "month": np.repeat([t.month for t in times], n),
+                    "location": "delhi_center",
+                    "city": "Delhi",
+                    "country": "IN",
+                    "unit": "µg/m³",
+                }
+            )
+            try:
+                pm25 = predict_pm25_batch(self._model_bundle, features).reshape(hours, n)
+                aqi = pm25_to_aqi_array(pm25)
+            except Exception:
+                pass
+        return {"pm2_5": np.round(pm25, 1), "aqi": aqi.astype(np.int32)}
+
+    async def get_observed_surface(
+        self, grid: SpatialGrid, hours: int, field: str = "aqi", method: str = "kriging"
+    ) -> Dict[str, Any]:
+        """Station observations of the last ``hours`` hours interpolated onto the grid.
+
+        Returns ``times`` and ``values`` shaped (hours, grid.size) for the hours in which
+        at least one station reported, plus the number of stations used.
+        """
+        times, ids, lat, lon, values = get_latest_store().history_matrix(field, hours)
+        reported = ~np.isnan(values).all(axis=1)
+        times = [t for t, r in zip(times, reported) if r]
+        values = values[reported]
+        cell_lat, cell_lon = grid.points()
+        if not ids or not len(values):
+            return {"times": [], "values": np.empty((0, cell_lat.size)), "stations": 0}
+        surface = interpolate_grid(
+            ids, lat, lon, values, cell_lat, cell_lon, method=method, hour_key=(field, times[-1])
+        )
+        return {"times": times, "values": np.round(surface, 1), "stations": len(ids)}
+
+    def get_grid_wind(self, grid: SpatialGrid):
+        """Latest station winds interpolated onto the grid cells as (speed, direction).
+
+        Components are interpolated (IDW) rather than directions, so winds either side
+        of north average correctly. Without recent station winds the current hour of
+        the weather field is used, else the model defaults.
+        """
+        lat, lon = grid.points()
+        store = get_latest_store()
+        ids, s_lat, s_lon, speed = store.latest_arrays("wind_speed", WIND_MAX_AGE_HOURS)
+        _, _, _, direction = store.latest_arrays("wind_direction", WIND_MAX_AGE_HOURS)
+        ok = ~np.isnan(speed) & ~np.isnan(direction)
+        if not ok.any():
+            weather = get_weather_field()
+            if weather is not None:
+                wind = weather.at(lat, lon, [datetime.utcnow()])
+                # Open-Meteo reports km/h
+                return wind["wind_speed"][0].astype(np.float64) / 3.6, wind["wind_dir"][0].astype(np.float64)
+            return np.full(lat.size, DEFAULT_WIND_SPEED), np.full(lat.size, DEFAULT_WIND_DIR)
+        u, v = wind_components(speed[ok].astype(np.float64), direction[ok].astype(np.float64))
+        surface = Interpolator(s_lat[ok], s_lon[ok], method="idw").interpolate(np.stack([u, v]), lat, lon)
+        return wind_from_components(surface[0], surface[1])
+
+    def get_dispersion(self, grid: SpatialGrid, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Steady-state PM2.5 (ug/m3) per grid cell from active fires and fixed sources.
+
+        Fires come from the in-memory fire index within the grid radius plus the
+        dispersion cutoff; each is a point source of DISPERSION_FIRE_PM25_GS.
+        """
+        fires = get_spatial_index("fires").within(
+            grid.center_lat, grid.center_lon, grid.radius_km + CUTOFF_KM
+        )
+        # Fire ids are (timestamp, latitude, longitude, satellite)
+        fire_sources = EmissionSources.from_records(
+            {"latitude": fid[1], "longitude": fid[2], "rate_gs": FIRE_PM25_GS} for fid, _ in fires
+        )
+        sources = EmissionSources.concat(fire_sources, fixed_sources())
+        lat, lon = grid.points()
+        speed, direction = self.get_grid_wind(grid)
+        pm2_5 = plume_concentration(
+            sources, lat, lon, speed, direction, daytime=is_daytime([now or datetime.utcnow()])[0]
+        )
+        return {"pm2_5": np.round(pm2_5, 2), "fires": len(fire_sources), "sources": len(sources)}
+
+    async def get_stored_forecast(
+        self, lat: float, lon: float, hours: int
+    ) -> List[Dict[str, Any]]:
+        """Persisted forecasts for the grid cell containing (lat, lon), one per target
+        hour (the most recent model run wins)."""
+        now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        rows = await CATALOG.fetch(
+            self.db,
+            "forecasts_by_cell",
+            grid_cell=grid_cell_id(lat, lon),
+            start=now,
+            end=now + timedelta(hours=hours),
+        )
+        series: Dict[datetime, Dict[str, Any]] = {}
+        for r in rows:
+            # Rows are ordered by target hour, newest forecast run first
+            series.setdefault(
+                r["target_timestamp"],
+                {
+                    "time": r["target_timestamp"].isoformat() + "Z",
+                    "aqi": r["predicted_aqi"],
+                    "pm2_5": r["predicted_pm2_5"],
+                    "pm10": r["predicted_pm10"],
+                    "lower": r["aqi_lower"],
+                    "upper": r["aqi_upper"],
+                    "model_version": r["model_version"],
+                },
+            )
+        return list(series.values())
+
     async def get_daily_forecast(
         self, lat: float, lon: float, days: int
     ) -> List[Dict[str, Any]]:
@@ -172,14 +410,103 @@ class ForecastingService:
             "hourly": await self.get_hourly_forecast(lat, lon, hours),
         }
 
+    async def get_space_time_grid(self, lat: np.ndarray, lon: np.ndarray, hours: int) -> SpaceTimeGrid:
+        """Hourly AQI forecast raster covering the points, from the current hour.
+
+        The area is snapped (centre to its ROUTE_GRID_CELL_LEVEL cell, radius up to
+        whole ROUTE_GRID_SNAP_KM) so nearby requests in the same hour reuse one raster.
+        """
+        cell = cell_keys(float(lat.min() + lat.max()) / 2, float(lon.min() + lon.max()) / 2, ROUTE_GRID_CELL_LEVEL)
+        center_lat, center_lon = (float(v) for v in cell_centres(cell))
+        coslat = max(np.cos(np.radians(center_lat)), 1e-6)
+        reach = max(
+            np.abs(lat - center_lat).max() * KM_PER_DEGREE,
+            np.abs(lon - center_lon).max() * KM_PER_DEGREE * coslat,
+        )
+        radius = ROUTE_GRID_SNAP_KM * np.ceil((reach + ROUTE_GRID_KM) / ROUTE_GRID_SNAP_KM)
+        hours = min(max(hours, 2), ROUTE_HORIZON_HOURS)
+        key = (int(cell), radius, hours, int(time.time() // 3600))
+        field = _route_fields.get(key)
+        if field is None:
+            grid = SpatialService(self.db).generate_grid(center_lat, center_lon, radius, ROUTE_GRID_KM)
+            forecast = await self.get_grid_forecast(grid, hours)
+            field = SpaceTimeGrid.from_grid(grid, forecast["times"][0], forecast["aqi"])
+            if len(_route_fields) >= ROUTE_GRID_CACHE_SIZE:
+                _route_fields.pop(next(iter(_route_fields)))
+            _route_fields[key] = field
+        return field
+
+    async def get_tile_field(self) -> Tuple[SpaceTimeGrid, str]:
+        """Hourly AQI raster behind the map tiles and the name of its forecast run.
+
+        A square of TILE_GRID_RADIUS_KM around central Delhi at TILE_GRID_KM, forecast
+        for TILE_HOURS from the start of the current hour; rebuilt once per hour or
+        when the model changes. The rebuild (one model prediction over every cell and
+        hour) runs in a worker thread under a lock, so concurrent cold requests wait
+        for a single build without blocking the event loop.
+        """
+        issued = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        key = (issued, self.model_version)
+        field = _tile_field.get(key)
+        if field is None:
+            async with _tile_lock:
+                field = _tile_field.get(key)
+                if field is None:
+                    grid = SpatialService(self.db).generate_grid(*TILE_GRID_CENTER, TILE_GRID_RADIUS_KM, TILE_GRID_KM)
+                    times = [issued + timedelta(hours=i) for i in range(TILE_HOURS)]
+                    lat, lon = grid.points()
+                    forecast = await asyncio.to_thread(self.forecast_points, lat, lon, times)
+                    field = SpaceTimeGrid.from_grid(grid, issued, forecast["aqi"])
+                    _tile_field.clear()
+                    _tile_field[key] = field
+        return field, f"{self.model_version}-{issued:%Y%m%d%H}"
+
     async def calculate_route_exposure(
-        self, route_points: List[Dict[str, float]], mode: str
+        self,
+        route_points: List[Dict[str, float]],
+        mode: str,
+        alternatives: Optional[List[List[Dict[str, float]]]] = None,
+        depart_at: Optional[datetime] = None,
     ) -> Dict[str, Any]:
-        exposure = sum(random.uniform(1, 5) for _ in route_points)
+        """Exposure along ``route_points`` and any ``alternatives``, evaluated together.
+
+        Points are densified to ROUTE_SPACING_KM and sampled from the forecast raster at
+        their arrival time for the mode's speed (see app.services.route_exposure).
+        ``depart_at`` must lie between the start of the current hour and
+        ROUTE_HORIZON_HOURS ahead (ValueError otherwise); the raster reaches from the
+        current hour to the end of the trip, capped at the horizon.
+        """
+        if mode not in MODE_SPEED_KMH:
+            raise ValueError(f"Unknown transport mode: {mode}")
+        speed = MODE_SPEED_KMH[mode]
+        now = datetime.utcnow()
+        depart = depart_at or now
+        if depart.tzinfo is not None:
+            depart = depart.astimezone(timezone.utc).replace(tzinfo=None)
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        if not hour <= depart <= now + timedelta(hours=ROUTE_HORIZON_HOURS):
+            raise ValueError(f"depart_at must be between {hour.isoformat()}Z and {ROUTE_HORIZON_HOURS} hours ahead")
+        routes = [route_points] + list(alternatives or [])
+        batch = densify_routes([([p["lat"] for p in r], [p["lon"] for p in r]) for r in routes])
+        offset = (depart - hour).total_seconds() / 3600.0
+        hours = min(int(np.ceil(offset + batch.lengths_km.max() / speed)) + 1, ROUTE_HORIZON_HOURS)
+        field = await self.get_space_time_grid(batch.lat, batch.lon, hours)
+        result = route_exposure(batch, field, speed, depart)
+
+        summary = [summarize(batch, result, i) for i in range(len(batch))]
+        recommendations = ["Avoid peak traffic hours", "Use mask if AQI > 200"]
+        best = int(np.argmin(result["exposure"]))
+        if best > 0 and result["exposure"][0] > 0:
+            saving = 1 - result["exposure"][best] / result["exposure"][0]
+            recommendations.insert(0, f"Alternative route {best} cuts exposure by {saving:.0%}")
         return {
-            "total_exposure": round(exposure, 2),
-            "recommendations": ["Avoid peak traffic hours", "Use mask if AQI > 200"],
-            "alternatives": [],
+            "total_exposure": summary[0]["exposure_aqi_hours"],
+            **summary[0],
+            "points": point_rows(batch, result, 0),
+            "recommendations": recommendations,
+            "alternatives": [
+                {"route": batch.points(i), **summary[i]} for i in range(1, len(batch))
+            ],
         }
 
     async def get_forecast_accuracy(
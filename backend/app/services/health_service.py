@@ -1,6 +1,41 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta
 import random
+import time
+
+import numpy as np
+
+from app.services.forecasting_service import ForecastingService
+from app.services.road_graph import get_road_graph
+from app.services.route_exposure import MODE_SPEED_KMH, point_rows, route_exposure, summarize
+from app.services.routing import PRIORITY_WEIGHTS, SNAP_MAX_KM, cell_weights, shortest_path
+from app.services.spatial_service import SpatialService, densify_routes
+
+# Later departures (hours) compared for the lowest-exposure route
+SAFE_ROUTE_DEPARTURE_HOURS = 6
+# Route the others are compared against: the fastest road route, else the straight line
+BASELINE_ROUTES = ("fastest", "direct")
+
+
+def compare_routes(routes: List[Dict[str, Any]], exposure: List[float]) -> Dict[str, Any]:
+    """Lowest-exposure route and what it saves (and costs in minutes) against the
+    baseline route. Without a baseline, or with a zero baseline exposure (a zero-length
+    trip), there is nothing to save and both figures are 0."""
+    best = int(np.argmin(exposure))
+    names = [r["name"] for r in routes]
+    baseline = next((names.index(n) for n in BASELINE_ROUTES if n in names), None)
+    saving_pct = extra_minutes = 0.0
+    if baseline is not None:
+        extra_minutes = round(routes[best]["duration_min"] - routes[baseline]["duration_min"], 1)
+        if exposure[baseline] > 0:
+            saving_pct = round(100 * (1 - exposure[best] / exposure[baseline]), 1)
+    return {
+        "lowest_exposure_route": names[best],
+        "baseline_route": None if baseline is None else names[baseline],
+        "exposure_saving_pct": saving_pct,
+        "extra_minutes": extra_minutes,
+    }
 
 
 class HealthService:
@@ -135,9 +170,87 @@ class HealthService:
         mode: str,
         priority: str,
     ) -> Dict[str, Any]:
-        return {
-            "routes": [],
-            "exposure_analysis": {},
-            "health_scores": {},
-            "timing": {},
+        """Fastest and healthiest routes between two points.
+
+        On the road graph (ROAD_GRAPH_PATH) the healthiest route minimises travel time
+        priced by the forecast AQI along the way (app.services.routing), with the
+        exposure weight set by ``priority``. Without a graph the straight line and
+        placeholder detours are compared instead. Routes are then scored with the same
+        exposure integral as /forecast/route.
+        """
+        if mode not in MODE_SPEED_KMH:
+            raise ValueError(f"Unknown transport mode: {mode}")
+        if priority not in PRIORITY_WEIGHTS:
+            raise ValueError(f"Unknown health priority: {priority}")
+        forecasting = ForecastingService(self.db)
+        depart = datetime.utcnow()
+        lat = np.array([start_lat, end_lat])
+        lon = np.array([start_lon, end_lon])
+        straight_km = densify_routes([(lat, lon)]).lengths_km[0]
+        # Road distance rarely exceeds twice the straight line; the extra hours leave
+        # room to compare later departures
+        hours = int(np.ceil(2 * straight_km / MODE_SPEED_KMH[mode])) + SAFE_ROUTE_DEPARTURE_HOURS + 1
+        field = await forecasting.get_space_time_grid(lat, lon, hours)
+        start_hour = (depart - field.start).total_seconds() / 3600.0
+
+        graph = get_road_graph()
+        started = time.perf_counter()
+        candidates: Dict[str, Tuple[List[Dict[str, float]], Optional[float]]] = {}
+        if graph is not None:
+            costs = graph.mode_costs(mode)
+            nodes, gap_km = graph.snap(lat, lon, costs.bit)
+            cells = graph.edge_cells(field.lat0, field.lon0, field.dlat, field.dlon, *field.values.shape[1:])
+            searches = (("fastest", 0.0), ("healthiest", PRIORITY_WEIGHTS[priority]))
+            # Endpoints off the mapped network fall back to the straight line
+            for name, weight in searches if gap_km.max() <= SNAP_MAX_KM else ():
+                weights = cell_weights(field, weight)
+                path = shortest_path(graph, int(nodes[0]), int(nodes[1]), costs, cells, weights, start_hour)
+                if path is not None:
+                    points = [{"lat": start_lat, "lon": start_lon}, *path.coordinates(graph)]
+                    points.append({"lat": end_lat, "lon": end_lon})
+                    candidates[name] = (points, path.seconds)
+        routing = "road_graph" if candidates else "straight_line"
+        if not candidates:
+            spatial = SpatialService(self.db)
+            candidates["direct"] = (
+                await spatial.get_route_points(start_lat, start_lon, end_lat, end_lon, mode),
+                None,
+            )
+            detours = await spatial.get_alternative_routes(start_lat, start_lon, end_lat, end_lon, mode)
+            for i, points in enumerate(detours, 1):
+                candidates[f"detour_{i}"] = (points, None)
+        search_ms = (time.perf_counter() - started) * 1000
+
+        routes, batches, speeds, exposure = [], [], [], []
+        for name, (points, seconds) in candidates.items():
+            batch = densify_routes([([p["lat"] for p in points], [p["lon"] for p in points])])
+            # Searched routes keep their own (road class) travel time
+            speed = batch.lengths_km[0] / (seconds / 3600) if seconds else MODE_SPEED_KMH[mode]
+            result = route_exposure(batch, field, speed, depart)
+            routes.append(
+                {"name": name, **summarize(batch, result, 0), "points": point_rows(batch, result, 0)}
+            )
+            batches.append(batch)
+            speeds.append(speed)
+            exposure.append(float(result["exposure"][0]))
+        best = int(np.argmin(exposure))
+        analysis = {"routing": routing, "search_ms": round(search_ms, 1), **compare_routes(routes, exposure)}
+        # 100 at AQI 0 down to 0 at the top of the AQI scale
+        scores = {r["name"]: round(max(0.0, 100 - r["mean_aqi"] / 5), 1) for r in routes}
+
+        # Same route, later departures within the forecast horizon
+        trip_hours = float(batches[best].lengths_km[0] / speeds[best])
+        horizon = int(field.values.shape[0] - 1 - start_hour - trip_hours)
+        later = range(min(max(horizon, 0), SAFE_ROUTE_DEPARTURE_HOURS) + 1)
+        by_hour = [
+            float(route_exposure(batches[best], field, speeds[best], depart + timedelta(hours=h))["exposure"][0])
+            for h in later
+        ]
+        wait = int(np.argmin(by_hour))
+        timing = {
+            "depart_now_exposure": round(by_hour[0], 2),
+            "best_departure": (depart + timedelta(hours=wait)).isoformat(),
+            "best_departure_exposure": round(by_hour[wait], 2),
+            "hourly_exposure": [round(v, 2) for v in by_hour],
         }
+        return {"routes": routes, "exposure_analysis": analysis, "health_scores": scores, "timing": timing}
@@ -0,0 +1,374 @@
+import csv
+import io
+import json
+import math
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.spatial_service import grid_cell_ranges_in_bbox
+
+# Which table serves a request depends on its range (see database/migrations/002_*):
+#   HISTORICAL_RAW_MAX_DAYS=2     -> up to this many days: raw core.aqi_readings
+#   HISTORICAL_HOURLY_MAX_DAYS=90 -> up to this many days: hourly rollups, beyond: daily
+RAW_MAX_RANGE = timedelta(days=float(os.getenv("HISTORICAL_RAW_MAX_DAYS", "2")))
+HOURLY_MAX_RANGE = timedelta(days=float(os.getenv("HISTORICAL_HOURLY_MAX_DAYS", "90")))
+
+ROLLUPS = {
+    "hourly": {"station": "analytics.aqi_hourly_station", "cell": "analytics.aqi_hourly_cell"},
+    "daily": {"station": "analytics.aqi_daily_station", "cell": "analytics.aqi_daily_cell"},
+}
+METRICS = ("aqi", "pm2_5", "pm10")
+PERCENTILES = (0.5, 0.95)
+
+# Grid used by the per-cell rollups: cell = floor(coordinate / CELL_DEGREES)
+CELL_DEGREES = 0.01
+KM_PER_DEGREE = 111.32
+# Raw-reading bbox filters go through the grid_cell index when the box covers at most
+# this many cells, as at most MAX_FILTER_RANGES key ranges of the hierarchical cells
+# (the cover may overhang the box; the lat/lon range still applies). Larger boxes fall
+# back to the lat/lon range alone.
+MAX_FILTER_CELLS = 4096
+MAX_FILTER_RANGES = 16
+
+# Trend regions as (min_lat, max_lat, min_lon, max_lon)
+REGIONS = {
+    "delhi-ncr": (27.60, 28.90, 76.84, 77.58),
+    "delhi": (28.40, 28.88, 76.84, 77.35),
+}
+# Trend period -> (look-back, bucket width applied on top of the daily rollup)
+TREND_PERIODS = {
+    "1m": (timedelta(days=30), "1 day"),
+    "6m": (timedelta(days=182), "1 week"),
+    "1y": (timedelta(days=365), "1 week"),
+    "5y": (timedelta(days=5 * 365), "1 month"),
+}
+# Raw-reading export (format=ndjson|csv) is streamed as keyset pages on (timestamp, id):
+#   HISTORICAL_STREAM_PAGE_ROWS=10000 -> rows per keyset page (one short transaction each)
+#   HISTORICAL_STREAM_FETCH_ROWS=1000 -> rows pulled per round trip from the server-side cursor
+STREAM_PAGE_ROWS = int(os.getenv("HISTORICAL_STREAM_PAGE_ROWS", "10000"))
+STREAM_FETCH_ROWS = int(os.getenv("HISTORICAL_STREAM_FETCH_ROWS", "1000"))
+STREAM_COLUMNS = (
+    "timestamp",
+    "id",
+    "station_id",
+    "latitude",
+    "longitude",
+    "aqi",
+    "pm2_5",
+    "pm10",
+    "no2",
+    "so2",
+    "o3",
+    "co",
+    "data_source",
+)
+
+# Relative change in mean AQI between the first and last buckets below which a trend is "stable"
+STABLE_CHANGE = 0.05
+
+
+def choose_resolution(start: datetime, end: datetime) -> str:
+    """Pick the cheapest source that still resolves the requested range: raw, hourly or daily."""
+    span = end - start
+    if span <= RAW_MAX_RANGE:
+        return "raw"
+    if span <= HOURLY_MAX_RANGE:
+        return "hourly"
+    return "daily"
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _bbox(latitude: float, longitude: float, radius_km: float) -> Dict[str, float]:
+    dlat = radius_km / KM_PER_DEGREE
+    dlon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6))
+    return {
+        "min_lat": latitude - dlat,
+        "max_lat": latitude + dlat,
+        "min_lon": longitude - dlon,
+        "max_lon": longitude + dlon,
+    }
+
+
+def _raw_bbox_filter(params: Dict[str, Any]) -> str:
+    """WHERE fragment for raw readings in params' bbox; adds ``:cell_lo_i`` /
+    ``:cell_hi_i`` grid_cell ranges when worthwhile."""
+    clause = (
+        "latitude BETWEEN :min_lat AND :max_lat AND longitude BETWEEN :min_lon AND :max_lon"
+    )
+    rows = math.floor(params["max_lat"] / CELL_DEGREES) - math.floor(params["min_lat"] / CELL_DEGREES) + 1
+    cols = math.floor(params["max_lon"] / CELL_DEGREES) - math.floor(params["min_lon"] / CELL_DEGREES) + 1
+    if rows * cols > MAX_FILTER_CELLS:
+        return clause
+    ranges = grid_cell_ranges_in_bbox(
+        params["min_lat"], params["max_lat"], params["min_lon"], params["max_lon"], MAX_FILTER_RANGES
+    )
+    terms = []
+    for i, (lo, hi) in enumerate(ranges):
+        params[f"cell_lo_{i}"], params[f"cell_hi_{i}"] = lo, hi
+        terms.append(f"grid_cell BETWEEN :cell_lo_{i} AND :cell_hi_{i}")
+    return "(" + " OR ".join(terms) + ") AND " + clause
+
+
+def parse_cursor(token: str) -> Tuple[datetime, uuid.UUID]:
+    """Parse an ``after`` token: ``<ISO timestamp>,<id>`` of the last row already received."""
+    ts, _, row_id = token.rpartition(",")
+    try:
+        return _naive_utc(datetime.fromisoformat(ts)), uuid.UUID(row_id)
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {token!r}; expected '<timestamp>,<id>'")
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def encode_ndjson(rows: Sequence[Sequence[Any]]) -> str:
+    return "".join(
+        json.dumps({c: _json_value(v) for c, v in zip(STREAM_COLUMNS, row)}, separators=(",", ":")) + "\n"
+        for row in rows
+    )
+
+
+def encode_csv(rows: Sequence[Sequence[Any]], header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(STREAM_COLUMNS)
+    writer.writerows([_json_value(v) for v in row] for row in rows)
+    return buffer.getvalue()
+
+
+async def stream_readings(
+    latitude: float,
+    longitude: float,
+    start: datetime,
+    end: datetime,
+    radius_km: float = 5.0,
+    fmt: str = "ndjson",
+    after: Optional[str] = None,
+    limit: Optional[int] = None,
+    session_factory: Any = None,
+) -> AsyncIterator[str]:
+    """Stream raw readings in (timestamp, id) order as NDJSON or CSV text chunks.
+
+    The range is walked in keyset pages of STREAM_PAGE_ROWS, each read through a
+    server-side cursor STREAM_FETCH_ROWS rows at a time inside its own short
+    transaction, so memory stays flat however long the range is. ``after`` resumes
+    after a previously received row (see ``parse_cursor``). Opens its own sessions
+    from ``session_factory`` (default: the primary) because the response body is
+    produced after the request's session has closed.
+    """
+    if session_factory is None:
+        from app.database import AsyncSessionLocal as session_factory
+    encode = encode_csv if fmt == "csv" else encode_ndjson
+    cursor = parse_cursor(after) if after else None
+    params: Dict[str, Any] = {
+        "start": _naive_utc(start),
+        "end": _naive_utc(end),
+        **_bbox(latitude, longitude, radius_km),
+    }
+    columns = ", ".join(f'"{c}"' for c in STREAM_COLUMNS)
+    base = f"""
+SELECT {columns}
+FROM core.aqi_readings
+WHERE "timestamp" >= :start AND "timestamp" < :end
+  AND {_raw_bbox_filter(params)}"""
+    # The plain bound lets chunk exclusion and the timestamp indexes skip everything
+    # already sent; the row comparison then only breaks ties within :after_ts
+    keyset = '\n  AND "timestamp" >= :after_ts AND ("timestamp", id) > (:after_ts, :after_id)'
+    order = '\nORDER BY "timestamp", id\nLIMIT :page_rows'
+
+    if fmt == "csv":
+        yield encode_csv([], header=True)
+    remaining = limit
+    while remaining is None or remaining > 0:
+        page_rows = STREAM_PAGE_ROWS if remaining is None else min(STREAM_PAGE_ROWS, remaining)
+        stmt = text(base + (keyset if cursor else "") + order).execution_options(
+            yield_per=STREAM_FETCH_ROWS
+        )
+        page_params = {**params, "page_rows": page_rows}
+        if cursor:
+            page_params.update(after_ts=cursor[0], after_id=cursor[1])
+        fetched = 0
+        async with session_factory() as session:
+            async with session.begin():
+                result = await session.stream(stmt, page_params)
+                async for rows in result.partitions(STREAM_FETCH_ROWS):
+                    fetched += len(rows)
+                    cursor = (rows[-1][0], rows[-1][1])
+                    yield encode(rows)
+        if remaining is not None:
+            remaining -= fetched
+        if fetched < page_rows:
+            break
+
+
+def _stat_columns(rollup: bool) -> str:
+    """avg/min/max/percentile select list for each metric, from raw rows or from rollups."""
+    parts = []
+    for m in METRICS:
+        if rollup:
+            parts += [
+                f"sum(sum_{m})::float / NULLIF(sum(n_{m}), 0) AS avg_{m}",
+                f"min(min_{m}) AS min_{m}",
+                f"max(max_{m}) AS max_{m}",
+            ]
+            parts += [
+                f"approx_percentile({q}, rollup(pct_{m})) AS p{round(q * 100)}_{m}"
+                for q in PERCENTILES
+            ]
+        else:
+            parts += [f"avg({m}) AS avg_{m}", f"min({m}) AS min_{m}", f"max({m}) AS max_{m}"]
+            parts += [
+                f"percentile_cont({q}) WITHIN GROUP (ORDER BY {m}) AS p{round(q * 100)}_{m}"
+                for q in PERCENTILES
+            ]
+    return ",\n    ".join(parts)
+
+
+def _round(value: Any) -> Optional[float]:
+    return None if value is None else round(float(value), 2)
+
+
+def _bucket_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    point: Dict[str, Any] = {
+        "timestamp": row["bucket"],
+        "stations": row.get("stations"),
+        "samples": row.get("samples"),
+    }
+    for m in METRICS:
+        point[m] = {"avg": _round(row[f"avg_{m}"]), "min": _round(row[f"min_{m}"]), "max": _round(row[f"max_{m}"])}
+        for q in PERCENTILES:
+            key = f"p{round(q * 100)}"
+            point[m][key] = _round(row[f"{key}_{m}"])
+    return point
+
+
+def summarize_trend(series: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Mean, first-to-last change and direction of mean AQI over a bucketed series."""
+    values = [(p["timestamp"], p["aqi"]["avg"]) for p in series if p["aqi"]["avg"] is not None]
+    if not values:
+        return {"mean_aqi": None, "change": None, "change_pct": None, "direction": "unknown", "peak": None}
+    first, last = values[0][1], values[-1][1]
+    change = last - first
+    change_pct = change / first if first else None
+    if change_pct is None or abs(change_pct) < STABLE_CHANGE:
+        direction = "stable"
+    else:
+        direction = "worsening" if change > 0 else "improving"
+    peak = max(values, key=lambda v: v[1])
+    return {
+        "mean_aqi": round(sum(v for _, v in values) / len(values), 2),
+        "change": round(change, 2),
+        "change_pct": None if change_pct is None else round(change_pct * 100, 1),
+        "direction": direction,
+        "peak": {"timestamp": peak[0], "aqi": peak[1]},
+    }
+
+
+class HistoricalService:
+    """Historical AQI queries served from raw readings or the continuous-aggregate rollups."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_aqi_series(
+        self,
+        latitude: float,
+        longitude: float,
+        start: datetime,
+        end: datetime,
+        radius_km: float = 5.0,
+        resolution: Optional[str] = None,
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """Per-bucket AQI/PM statistics across stations within ``radius_km`` of a point.
+
+        Returns ``(resolution, series)``; resolution is chosen from the range unless given.
+        """
+        start, end = _naive_utc(start), _naive_utc(end)
+        resolution = resolution or choose_resolution(start, end)
+        params = {"start": start, "end": end, **_bbox(latitude, longitude, radius_km)}
+        if resolution == "raw":
+            source, time_col, rollup = "core.aqi_readings", '"timestamp"', False
+            samples = "count(*)"
+            where = _raw_bbox_filter(params)
+        else:
+            source, time_col, rollup = ROLLUPS[resolution]["station"], "bucket", True
+            samples = "sum(samples)"
+            where = (
+                "latitude BETWEEN :min_lat AND :max_lat "
+                "AND longitude BETWEEN :min_lon AND :max_lon"
+            )
+        sql = f"""
+SELECT
+    {time_col} AS bucket,
+    count(DISTINCT station_id) AS stations,
+    {samples} AS samples,
+    {_stat_columns(rollup)}
+FROM {source}
+WHERE {time_col} >= :start AND {time_col} < :end
+  AND {where}
+GROUP BY 1
+ORDER BY 1"""
+        result = await self.db.execute(text(sql), params)
+        return resolution, [_bucket_row(dict(r)) for r in result.mappings()]
+
+    async def get_trends(self, region: str, period: str, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Region-wide AQI trend from the daily per-cell rollup, re-bucketed per period."""
+        if region not in REGIONS:
+            raise ValueError(f"Unknown region: {region}")
+        if period not in TREND_PERIODS:
+            raise ValueError(f"Unknown period: {period}")
+        lookback, step = TREND_PERIODS[period]
+        end = _naive_utc(now or datetime.utcnow())
+        start = end - lookback
+        min_lat, max_lat, min_lon, max_lon = REGIONS[region]
+        params = {
+            "start": start,
+            "end": end,
+            "min_y": math.floor(min_lat / CELL_DEGREES),
+            "max_y": math.floor(max_lat / CELL_DEGREES),
+            "min_x": math.floor(min_lon / CELL_DEGREES),
+            "max_x": math.floor(max_lon / CELL_DEGREES),
+        }
+        # step comes from TREND_PERIODS, never from the request
+        sql = f"""
+SELECT
+    time_bucket(INTERVAL '{step}', bucket) AS bucket,
+    count(DISTINCT (cell_y, cell_x)) AS cells,
+    sum(samples) AS samples,
+    {_stat_columns(True)}
+FROM {ROLLUPS["daily"]["cell"]}
+WHERE bucket >= :start AND bucket < :end
+  AND cell_y BETWEEN :min_y AND :max_y
+  AND cell_x BETWEEN :min_x AND :max_x
+GROUP BY 1
+ORDER BY 1"""
+        result = await self.db.execute(text(sql), params)
+        series = []
+        for r in result.mappings():
+            point = _bucket_row(dict(r))
+            point.pop("stations")
+            point["cells"] = r["cells"]
+            series.append(point)
+        return {
+            "start": start,
+            "end": end,
+            "bucket": step,
+            "series": series,
+            "summary": summarize_trend(series),
+        }
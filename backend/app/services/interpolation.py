@@ -0,0 +1,251 @@
+"""Station-to-grid interpolation: inverse distance weighting and ordinary kriging.
+
+Both methods reduce to per-cell neighbour weights: each grid cell takes its ``k``
+nearest stations from a ``SpatialIndex`` and a (cells, k) weight matrix. Weights
+depend only on where the stations and cells are, so they are computed once and every
+hour is a gather-multiply-sum over the (hours, cells, k) block. Hours whose set of
+reporting stations differs get their own weights, cached per station pattern.
+
+Kriging fits a spherical variogram to the pooled station values (weighted least
+squares over distance bins, no SciPy) and solves one (k + 1) system per cell in a
+single batched ``np.linalg.solve``. Fits are cached per station set and hour for
+``KRIGING_VARIOGRAM_TTL_SECONDS`` (default 3600).
+"""
+
+import math
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Hashable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.spatial_service import INDEX_REF_LAT, KM_PER_DEGREE, SpatialIndex
+
+METHODS = ("idw", "kriging")
+VARIOGRAM_TTL_SECONDS = float(os.getenv("KRIGING_VARIOGRAM_TTL_SECONDS", "3600"))
+# Hours are gathered this many at a time to bound the (hours, cells, k) block
+HOUR_CHUNK = 8
+
+
+@dataclass(frozen=True)
+class Variogram:
+    """Spherical model: gamma(h) = nugget + psill * (1.5 h/a - 0.5 (h/a)^3), h < a."""
+
+    nugget: float
+    psill: float
+    range_km: float
+
+    @property
+    def sill(self) -> float:
+        return self.nugget + self.psill
+
+    def gamma(self, h: np.ndarray) -> np.ndarray:
+        r = np.minimum(np.asarray(h) / self.range_km, 1.0)
+        g = self.nugget + self.psill * (1.5 * r - 0.5 * r**3)
+        return np.where(np.asarray(h) > 0, g, 0.0)
+
+    def covariance(self, h: np.ndarray) -> np.ndarray:
+        return self.sill - self.gamma(h)
+
+
+def _project(lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Same local plane as SpatialIndex, so index distances and kriging distances agree
+    kx = KM_PER_DEGREE * math.cos(math.radians(INDEX_REF_LAT))
+    return np.asarray(lon, dtype=np.float64) * kx, np.asarray(lat, dtype=np.float64) * KM_PER_DEGREE
+
+
+def fit_variogram(lat: Sequence[float], lon: Sequence[float], values: np.ndarray, bins: int = 12) -> Variogram:
+    """Fit a spherical variogram to station values shaped (hours, stations) or (stations,).
+
+    Semivariances are pooled over hours per station pair, binned by distance up to
+    half the largest separation, and fitted by weighted least squares: for each
+    candidate range the nugget and partial sill follow in closed form.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    x, y = _project(lat, lon)
+    i, j = np.triu_indices(len(x), k=1)
+    h = np.hypot(x[i] - x[j], y[i] - y[j])
+    diff = values[:, i] - values[:, j]
+    semi = 0.5 * np.nanmean(diff**2, axis=0)
+    ok = np.isfinite(semi) & (h > 0)
+    h, semi = h[ok], semi[ok]
+    variance = float(np.nanvar(values)) or 1.0
+    if len(h) < 3:
+        return Variogram(nugget=0.0, psill=variance, range_km=10.0)
+
+    edges = np.linspace(0.0, h.max() / 2, bins + 1)
+    which = np.digitize(h, edges) - 1
+    used = (which >= 0) & (which < bins)
+    counts = np.bincount(which[used], minlength=bins)
+    sums = np.bincount(which[used], weights=semi[used], minlength=bins)
+    hsum = np.bincount(which[used], weights=h[used], minlength=bins)
+    filled = counts > 0
+    lag, gamma, weight = hsum[filled] / counts[filled], sums[filled] / counts[filled], counts[filled]
+    if len(lag) < 2:
+        return Variogram(nugget=0.0, psill=variance, range_km=max(float(h.max()), 1.0))
+
+    best: Optional[Tuple[float, Variogram]] = None
+    for range_km in np.linspace(lag[0], 2 * h.max(), 40):
+        r = np.minimum(lag / range_km, 1.0)
+        shape = 1.5 * r - 0.5 * r**3
+        design = np.stack([np.ones_like(shape), shape], axis=1) * np.sqrt(weight)[:, None]
+        coef, *_ = np.linalg.lstsq(design, gamma * np.sqrt(weight), rcond=None)
+        nugget, psill = max(float(coef[0]), 0.0), max(float(coef[1]), 1e-9)
+        err = float(np.sum(weight * (nugget + psill * shape - gamma) ** 2))
+        if best is None or err < best[0]:
+            best = (err, Variogram(nugget=nugget, psill=psill, range_km=float(range_km)))
+    assert best is not None
+    return best[1]
+
+
+class VariogramCache:
+    """Variogram fits keyed by (station set, hour), reused for ``ttl`` seconds."""
+
+    def __init__(self, ttl: float = VARIOGRAM_TTL_SECONDS, max_entries: int = 64):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, Variogram]] = {}
+
+    def get(self, key: Hashable, lat: Sequence[float], lon: Sequence[float], values: np.ndarray) -> Variogram:
+        now = time.monotonic()
+        hit = self._entries.get(key)
+        if hit is not None and now - hit[0] < self.ttl:
+            return hit[1]
+        fit = fit_variogram(lat, lon, values)
+        if len(self._entries) >= self.max_entries:
+            self._entries.pop(min(self._entries, key=lambda k: self._entries[k][0]))
+        self._entries[key] = (now, fit)
+        return fit
+
+
+_variograms = VariogramCache()
+
+
+class Interpolator:
+    """Interpolates station values onto arbitrary points (typically a SpatialGrid).
+
+    ``interpolate(values, lat, lon)`` takes station values shaped (stations,) or
+    (hours, stations), NaN where a station did not report, and returns (hours, points).
+    """
+
+    def __init__(
+        self,
+        station_lat: Sequence[float],
+        station_lon: Sequence[float],
+        method: str = "idw",
+        k: int = 8,
+        power: float = 2.0,
+        max_km: Optional[float] = None,
+        variogram: Optional[Variogram] = None,
+    ):
+        if method not in METHODS:
+            raise ValueError(f"Unknown interpolation method: {method}")
+        self.lat = np.asarray(station_lat, dtype=np.float64)
+        self.lon = np.asarray(station_lon, dtype=np.float64)
+        self.method = method
+        self.k = k
+        self.power = power
+        self.max_km = max_km
+        self.variogram = variogram
+        self._weights: Dict[bytes, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def _neighbours(self, stations: np.ndarray, lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        index = SpatialIndex()
+        index.insert(stations.tolist(), self.lat[stations], self.lon[stations])
+        slots, dist = index.nearest_batch(lat, lon, k=min(self.k, len(stations)), max_km=self.max_km)
+        # Slots are insertion order, i.e. positions within ``stations``
+        return np.where(slots >= 0, stations[np.maximum(slots, 0)], -1), dist
+
+    def _idw(self, nbr: np.ndarray, dist: np.ndarray) -> np.ndarray:
+        with np.errstate(divide="ignore"):
+            w = 1.0 / np.maximum(dist, 1e-6) ** self.power
+        w[nbr < 0] = 0.0
+        # A cell on top of a station takes that station's value
+        exact = dist < 1e-6
+        hit = exact.any(axis=1)
+        w[hit] = exact[hit].astype(np.float64)
+        total = w.sum(axis=1, keepdims=True)
+        return np.divide(w, total, out=np.zeros_like(w), where=total > 0)
+
+    def _kriging(self, nbr: np.ndarray, dist: np.ndarray, variogram: Variogram) -> np.ndarray:
+        m, k = nbr.shape
+        sx, sy = _project(self.lat, self.lon)
+        safe = np.maximum(nbr, 0)
+        px, py = sx[safe], sy[safe]
+        pair = np.hypot(px[:, :, None] - px[:, None, :], py[:, :, None] - py[:, None, :])
+        system = np.zeros((m, k + 1, k + 1))
+        system[:, :k, :k] = variogram.covariance(pair)
+        system[:, :k, k] = system[:, k, :k] = 1.0
+        # Tiny ridge keeps co-located stations solvable
+        system[:, np.arange(k), np.arange(k)] += 1e-9 * variogram.sill
+        rhs = np.ones((m, k + 1))
+        rhs[:, :k] = variogram.covariance(np.where(np.isfinite(dist), dist, 0.0))
+        missing = nbr < 0
+        if missing.any():
+            # Short neighbourhoods: decouple the missing slots (lambda = 0)
+            rows, cols = np.nonzero(missing)
+            system[rows, cols, :] = 0.0
+            system[rows, :, cols] = 0.0
+            system[rows, cols, cols] = 1.0
+            rhs[rows, cols] = 0.0
+        return np.linalg.solve(system, rhs[..., None])[:, :k, 0]
+
+    def weights(
+        self, lat: np.ndarray, lon: np.ndarray, valid: Optional[np.ndarray] = None, variogram: Optional[Variogram] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(neighbours, weights), both (points, k), for the stations flagged ``valid``.
+
+        Cached per valid-station pattern: call with the same points between calls."""
+        valid = np.ones(len(self.lat), dtype=bool) if valid is None else valid
+        key = np.packbits(valid).tobytes()
+        if key not in self._weights:
+            stations = np.flatnonzero(valid)
+            nbr, dist = self._neighbours(stations, np.asarray(lat), np.asarray(lon))
+            if self.method == "idw":
+                w = self._idw(nbr, dist)
+            else:
+                w = self._kriging(nbr, dist, variogram or self.variogram or Variogram(0.0, 1.0, 10.0))
+            self._weights[key] = (np.maximum(nbr, 0), w)
+        return self._weights[key]
+
+    def interpolate(self, values: np.ndarray, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+        hours = values.shape[0]
+        out = np.full((hours, len(np.atleast_1d(lat))), np.nan)
+        reported = ~np.isnan(values)
+        if self.method == "kriging" and self.variogram is None:
+            self.variogram = fit_variogram(self.lat, self.lon, values)
+        # Padding slots point at station 0 with zero weight; keep them finite
+        filled = np.where(reported, values, 0.0)
+        patterns, which = np.unique(reported, axis=0, return_inverse=True)
+        for p, pattern in enumerate(patterns):
+            if not pattern.any():
+                continue
+            nbr, w = self.weights(lat, lon, pattern)
+            rows = np.flatnonzero(which.ravel() == p)
+            for start in range(0, len(rows), HOUR_CHUNK):
+                chunk = rows[start : start + HOUR_CHUNK]
+                out[chunk] = np.einsum("hmk,mk->hm", filled[chunk][:, nbr], w)
+        return out
+
+
+def interpolate_grid(
+    station_ids: Sequence[str],
+    station_lat: Sequence[float],
+    station_lon: Sequence[float],
+    values: np.ndarray,
+    lat: np.ndarray,
+    lon: np.ndarray,
+    method: str = "idw",
+    k: int = 8,
+    hour_key: Hashable = None,
+) -> np.ndarray:
+    """One-shot helper: interpolate (hours, stations) values onto points, with the
+    kriging variogram taken from the module cache keyed by (stations, ``hour_key``)."""
+    variogram = None
+    if method == "kriging":
+        variogram = _variograms.get((tuple(station_ids), hour_key), station_lat, station_lon, values)
+    return Interpolator(station_lat, station_lon, method=method, k=k, variogram=variogram).interpolate(
+        values, lat, lon
+    )
@@ -0,0 +1,334 @@
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+# Per-hour fields kept for every station (one ring buffer each)
+FIELDS = (
+    "aqi",
+    "pm2_5",
+    "pm10",
+    "no2",
+    "so2",
+    "o3",
+    "co",
+    "temperature",
+    "humidity",
+    "wind_speed",
+    "wind_direction",
+    "pressure",
+)
+KM_PER_DEGREE = 111.32
+
+
+def _epoch_hour(ts: datetime) -> int:
+    # Naive timestamps are UTC throughout the pipeline
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return int(ts.timestamp() // 3600)
+
+
+def _hours_to_datetimes(hours: np.ndarray) -> List[datetime]:
+    return (hours * 3600).astype("datetime64[s]").tolist()
+
+
+class LatestReadingsStore:
+    """Last ``hours`` hourly readings per station in preallocated NumPy ring buffers.
+
+    Each field is a ``(stations, hours)`` float32 array indexed by ``epoch_hour % hours``;
+    ``slot_hour`` records which hour a slot currently holds, so stale slots are
+    recognised without clearing the buffers. Readings for the same station and hour
+    merge (a later row only overwrites the fields it carries). Station capacity doubles
+    when exhausted. Writes take a lock; reads are plain array lookups.
+
+    Environment variables (``from_env``):
+      LATEST_STORE_HOURS=72              -> Hours of history kept per station
+      LATEST_STORE_STATIONS=512          -> Initial station capacity
+      LATEST_STORE_SNAPSHOT=path.npz     -> Snapshot file restored at startup, written on shutdown
+      LATEST_STORE_SNAPSHOT_SECONDS=300  -> Also snapshot after ingest at most this often
+    """
+
+    def __init__(self, hours: int = 72, capacity: int = 512, fields: Sequence[str] = FIELDS):
+        self.hours = hours
+        self.fields = tuple(fields)
+        self._lock = threading.Lock()
+        self._index: Dict[str, int] = {}
+        self.station_ids: List[str] = []
+        self._allocate(capacity)
+        self.snapshot_path: Optional[str] = None
+        self.snapshot_interval = 300.0
+        self._last_snapshot = 0.0
+
+    @classmethod
+    def from_env(cls) -> "LatestReadingsStore":
+        store = cls(
+            hours=int(os.getenv("LATEST_STORE_HOURS", "72")),
+            capacity=int(os.getenv("LATEST_STORE_STATIONS", "512")),
+        )
+        store.snapshot_path = os.getenv("LATEST_STORE_SNAPSHOT") or None
+        store.snapshot_interval = float(os.getenv("LATEST_STORE_SNAPSHOT_SECONDS", "300"))
+        if store.snapshot_path and os.path.exists(store.snapshot_path):
+            try:
+                store.restore(store.snapshot_path)
+            except Exception as e:  # A bad snapshot must not block startup
+                logger.warning("Could not restore latest-readings snapshot", error=str(e))
+        return store
+
+    def _allocate(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.values = {f: np.full((capacity, self.hours), np.nan, dtype=np.float32) for f in self.fields}
+        self.slot_hour = np.full((capacity, self.hours), -1, dtype=np.int64)
+        self.latest_hour = np.full(capacity, -1, dtype=np.int64)
+        self.latitude = np.full(capacity, np.nan)
+        self.longitude = np.full(capacity, np.nan)
+
+    def _grow(self, needed: int) -> None:
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        old_values, old_slots = self.values, self.slot_hour
+        old_latest, old_lat, old_lon, n = self.latest_hour, self.latitude, self.longitude, self.capacity
+        self._allocate(capacity)
+        for f in self.fields:
+            self.values[f][:n] = old_values[f]
+        self.slot_hour[:n] = old_slots
+        self.latest_hour[:n] = old_latest
+        self.latitude[:n] = old_lat
+        self.longitude[:n] = old_lon
+
+    def __len__(self) -> int:
+        return len(self.station_ids)
+
+    # ------------------------------------------------------------------ writes
+    def ingest(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Add aqi_readings-shaped rows; returns how many were kept (not older than the window)."""
+        rows = [r for r in rows if r.get("station_id") is not None and r.get("timestamp") is not None]
+        if not rows:
+            return 0
+        with self._lock:
+            for r in rows:
+                sid = str(r["station_id"])
+                if sid not in self._index:
+                    self._index[sid] = len(self.station_ids)
+                    self.station_ids.append(sid)
+            if len(self.station_ids) > self.capacity:
+                self._grow(len(self.station_ids))
+
+            idx = np.fromiter((self._index[str(r["station_id"])] for r in rows), dtype=np.int64, count=len(rows))
+            hour = np.fromiter((_epoch_hour(r["timestamp"]) for r in rows), dtype=np.int64, count=len(rows))
+            lat = np.array([r.get("latitude", math.nan) for r in rows], dtype=np.float64)
+            lon = np.array([r.get("longitude", math.nan) for r in rows], dtype=np.float64)
+
+            # Newest hour per station after this batch; rows outside the window are dropped
+            np.maximum.at(self.latest_hour, idx, hour)
+            keep = hour > self.latest_hour[idx] - self.hours
+            idx, hour, lat, lon = idx[keep], hour[keep], lat[keep], lon[keep]
+            kept_rows = [r for r, k in zip(rows, keep) if k]
+            slot = hour % self.hours
+
+            # Slots still holding an older hour are reset before writing
+            stale = self.slot_hour[idx, slot] != hour
+            if stale.any():
+                for f in self.fields:
+                    self.values[f][idx[stale], slot[stale]] = np.nan
+                self.slot_hour[idx[stale], slot[stale]] = hour[stale]
+
+            for f in self.fields:
+                col = np.array(
+                    [math.nan if r.get(f) is None else r[f] for r in kept_rows], dtype=np.float32
+                )
+                present = ~np.isnan(col)
+                if present.any():
+                    self.values[f][idx[present], slot[present]] = col[present]
+
+            has_pos = ~(np.isnan(lat) | np.isnan(lon))
+            self.latitude[idx[has_pos]] = lat[has_pos]
+            self.longitude[idx[has_pos]] = lon[has_pos]
+            return int(keep.sum())
+
+    # ------------------------------------------------------------------- reads
+    def _latest_rows(self, idx: np.ndarray) -> List[Dict[str, Any]]:
+        """Latest-hour rows for station indices (all must have data), gathered column-wise."""
+        hours = self.latest_hour[idx]
+        slots = hours % self.hours
+        columns: Dict[str, List[Any]] = {
+            "station_id": [self.station_ids[i] for i in idx.tolist()],
+            "timestamp": _hours_to_datetimes(hours),
+            "latitude": self.latitude[idx].tolist(),
+            "longitude": self.longitude[idx].tolist(),
+        }
+        for f in self.fields:
+            values = self.values[f][idx, slots].astype(np.float64)
+            columns[f] = np.where(np.isnan(values), None, values).tolist()
+        names = list(columns)
+        return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+    def latest(self, station_id: str) -> Optional[Dict[str, Any]]:
+        """Most recent hour for a station (fields missing that hour are None)."""
+        i = self._index.get(station_id)
+        if i is None or self.latest_hour[i] < 0:
+            return None
+        return self._latest_rows(np.array([i]))[0]
+
+    def history(self, station_id: str, hours: Optional[int] = None) -> Optional[Dict[str, np.ndarray]]:
+        """The station's buffered hours in time order: ``{"timestamp": [...], field: array}``."""
+        i = self._index.get(station_id)
+        if i is None or self.latest_hour[i] < 0:
+            return None
+        span = min(hours or self.hours, self.hours)
+        wanted = np.arange(self.latest_hour[i] - span + 1, self.latest_hour[i] + 1)
+        slots = wanted % self.hours
+        valid = self.slot_hour[i, slots] == wanted
+        out: Dict[str, Any] = {"timestamp": _hours_to_datetimes(wanted[valid])}
+        for f in self.fields:
+            out[f] = self.values[f][i, slots[valid]]
+        return out
+
+    def _fresh_mask(self, max_age_hours: Optional[int], now: Optional[datetime]) -> np.ndarray:
+        n = len(self.station_ids)
+        mask = self.latest_hour[:n] >= 0
+        if max_age_hours is not None:
+            current = _epoch_hour(now or datetime.now(timezone.utc))
+            mask &= self.latest_hour[:n] > current - max_age_hours
+        return mask
+
+    def latest_in_bbox(
+        self,
+        min_lat: float,
+        max_lat: float,
+        min_lon: float,
+        max_lon: float,
+        max_age_hours: Optional[int] = None,
+        now: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Latest hour of every station inside the box (optionally only recent ones)."""
+        n = len(self.station_ids)
+        lat, lon = self.latitude[:n], self.longitude[:n]
+        mask = self._fresh_mask(max_age_hours, now)
+        mask &= (lat >= min_lat) & (lat <= max_lat) & (lon >= min_lon) & (lon <= max_lon)
+        return self._latest_rows(np.flatnonzero(mask))
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        max_km: float = 5.0,
+        max_age_hours: Optional[int] = 2,
+        now: Optional[datetime] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Latest hour of the closest recently reporting station within ``max_km``."""
+        n = len(self.station_ids)
+        if n == 0:
+            return None
+        dy = (self.latitude[:n] - lat) * KM_PER_DEGREE
+        dx = (self.longitude[:n] - lon) * KM_PER_DEGREE * math.cos(math.radians(lat))
+        dist = np.hypot(dx, dy)
+        dist[~self._fresh_mask(max_age_hours, now) | np.isnan(dist)] = np.inf
+        i = int(np.argmin(dist))
+        if dist[i] > max_km:
+            return None
+        row = self._latest_rows(np.array([i]))[0]
+        row["distance_km"] = round(float(dist[i]), 3)
+        return row
+
+    def latest_arrays(self, field: str, max_age_hours: Optional[int] = None, now: Optional[datetime] = None):
+        """(station_ids, lat, lon, values) of the latest hour per station, for vectorized consumers."""
+        n = len(self.station_ids)
+        mask = self._fresh_mask(max_age_hours, now)
+        idx = np.flatnonzero(mask)
+        slots = self.latest_hour[idx] % self.hours
+        values = self.values[field][idx, slots]
+        ids = [self.station_ids[i] for i in idx]
+        return ids, self.latitude[:n][idx], self.longitude[:n][idx], values
+
+    def history_matrix(self, field: str, hours: int, now: Optional[datetime] = None):
+        """(times, station_ids, lat, lon, values) for the ``hours`` hours ending now.
+
+        ``values`` is (hours, stations) float64 with NaN where a station has no reading
+        that hour; stations without a position or with nothing in the window are left out.
+        """
+        n = len(self.station_ids)
+        current = _epoch_hour(now or datetime.now(timezone.utc))
+        wanted = np.arange(current - min(hours, self.hours) + 1, current + 1)
+        slots = wanted % self.hours
+        valid = self.slot_hour[:n][:, slots] == wanted
+        values = np.where(valid, self.values[field][:n][:, slots], np.nan).astype(np.float64)
+        has_pos = ~np.isnan(self.latitude[:n]) & ~np.isnan(self.longitude[:n])
+        idx = np.flatnonzero(~np.isnan(values).all(axis=1) & has_pos)
+        ids = [self.station_ids[i] for i in idx]
+        return (
+            _hours_to_datetimes(wanted),
+            ids,
+            self.latitude[:n][idx],
+            self.longitude[:n][idx],
+            values[idx].T,
+        )
+
+    # --------------------------------------------------------------- snapshots
+    def snapshot(self, path: Optional[str] = None) -> Optional[str]:
+        """Write all buffers to an ``.npz`` file atomically; returns the path written."""
+        path = path or self.snapshot_path
+        if not path:
+            return None
+        with self._lock:
+            n = len(self.station_ids)
+            arrays = {f"field_{f}": self.values[f][:n] for f in self.fields}
+            arrays.update(
+                station_ids=np.array(self.station_ids, dtype=str),
+                slot_hour=self.slot_hour[:n],
+                latest_hour=self.latest_hour[:n],
+                latitude=self.latitude[:n],
+                longitude=self.longitude[:n],
+                hours=np.array(self.hours),
+            )
+            tmp = f"{path}.tmp.npz"
+            np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+        self._last_snapshot = time.monotonic()
+        return path
+
+    def maybe_snapshot(self) -> None:
+        """Snapshot if a path is configured and the last one is older than the interval."""
+        if self.snapshot_path and time.monotonic() - self._last_snapshot >= self.snapshot_interval:
+            try:
+                self.snapshot()
+            except OSError as e:
+                logger.warning("Could not write latest-readings snapshot", error=str(e))
+
+    def restore(self, path: str) -> None:
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["hours"]) != self.hours:
+                raise ValueError(f"Snapshot holds {int(data['hours'])} hours, store expects {self.hours}")
+            ids = [str(s) for s in data["station_ids"]]
+            n = len(ids)
+            with self._lock:
+                self._index = {sid: i for i, sid in enumerate(ids)}
+                self.station_ids = ids
+                self._allocate(max(self.capacity, n))
+                for f in self.fields:
+                    key = f"field_{f}"
+                    if key in data:
+                        self.values[f][:n] = data[key]
+                self.slot_hour[:n] = data["slot_hour"]
+                self.latest_hour[:n] = data["latest_hour"]
+                self.latitude[:n] = data["latitude"]
+                self.longitude[:n] = data["longitude"]
+        logger.info("Restored latest-readings snapshot", path=path, stations=n)
+
+
+_store: Optional[LatestReadingsStore] = None
+
+
+def get_latest_store() -> LatestReadingsStore:
+    """Process-wide store shared by the ingestion pipeline and the read paths."""
+    global _store
+    if _store is None:
+        _store = LatestReadingsStore.from_env()
+    return _store
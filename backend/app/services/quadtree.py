@@ -0,0 +1,246 @@
+"""Adaptive quadtree refinement over a SpatialGrid.
+
+The quadtree lives on the uniform grid's own cell index space: a block of size ``s``
+covers ``s x s`` grid cells and is evaluated once, at its centre. Refinement starts
+from root blocks of ``root_cells`` cells and proceeds one level at a time: every block
+of the level is evaluated in one vectorized call, compared with its four neighbours
+on the level raster (coarser leaves painted in), and split when the largest
+difference over all hours exceeds ``threshold``. Blocks within ``focus_km`` of a
+``focus`` point (e.g. a fire hotspot, whose plume can be narrower than a coarse block
+and so invisible at block centres) always split. Size-1 blocks are exactly the uniform
+grid's cells, so a field that varies everywhere degrades to the uniform grid.
+
+Encoding (pointer-less, breadth first): roots in row-major order, then the four
+children (SW, SE, NW, NE; rows run south to north) of each split node in the order the
+split nodes appear. Every node is 2 bits, 0 = empty (outside the grid or its clip
+radius), 1 = leaf, 2 = split, packed four per byte, most significant first. Leaf
+values follow the same order.
+"""
+
+import base64
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.spatial_service import KM_PER_DEGREE, SpatialGrid
+
+# Child quadrants in encoding order: (row offset, column offset)
+_QUAD_ROW = np.array([0, 0, 1, 1])
+_QUAD_COL = np.array([0, 1, 0, 1])
+EMPTY, LEAF, SPLIT = 0, 1, 2
+
+
+@dataclass
+class QuadTree:
+    """Leaves of an adaptive refinement; ``values[field]`` is (hours, leaves)."""
+
+    grid: SpatialGrid
+    root_cells: int
+    roots: Tuple[int, int]
+    codes: np.ndarray
+    leaf_row: np.ndarray
+    leaf_col: np.ndarray
+    leaf_size: np.ndarray
+    values: Dict[str, np.ndarray]
+    evaluated: int
+    levels: int
+    elapsed_seconds: float
+    # evaluate() time per point on the level with the most points, the closest in
+    # batch size to one uniform-grid call
+    cell_seconds: float = 0.0
+
+    @property
+    def leaves(self) -> int:
+        return len(self.leaf_size)
+
+    @property
+    def uniform_estimate_seconds(self) -> float:
+        """Estimated time to evaluate every uniform-grid cell in one call (per-point
+        cost of the largest level x grid cells); benchmarks/bench_quadtree.py
+        measures the real thing."""
+        return self.cell_seconds * self.grid.size
+
+    def structure(self) -> str:
+        """Node codes packed 2 bits per node, base64."""
+        return encode_codes(self.codes)
+
+    def leaf_centres(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(lat, lon) of every leaf's centre."""
+        return _centres(self.grid, self.leaf_row, self.leaf_col, self.leaf_size)
+
+    def raster(self, field: str) -> np.ndarray:
+        """Leaf values painted onto the uniform grid, (hours, rows, cols)."""
+        values = self.values[field]
+        rows, cols = self.grid.shape
+        size = self.roots[0] * self.root_cells
+        out = np.full((values.shape[0], size, size), np.nan)
+        for s in np.unique(self.leaf_size):
+            pick = np.flatnonzero(self.leaf_size == s)
+            r = self.leaf_row[pick][:, None] + np.arange(s)
+            c = self.leaf_col[pick][:, None] + np.arange(s)
+            out[:, r[:, :, None], c[:, None, :]] = values[:, pick][:, :, None, None]
+        out = out[:, :rows, :cols]
+        out[:, ~self.grid.mask] = np.nan
+        return out
+
+
+def encode_codes(codes: np.ndarray) -> str:
+    padded = np.zeros(-(-len(codes) // 4) * 4, dtype=np.uint8)
+    padded[: len(codes)] = codes
+    quads = padded.reshape(-1, 4)
+    packed = (quads[:, 0] << 6) | (quads[:, 1] << 4) | (quads[:, 2] << 2) | quads[:, 3]
+    return base64.b64encode(packed.astype(np.uint8).tobytes()).decode("ascii")
+
+
+def decode_structure(
+    structure: str, roots: Tuple[int, int], root_cells: int, nodes: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(row, col, size) of every leaf, in value order, from an encoded structure."""
+    packed = np.frombuffer(base64.b64decode(structure), dtype=np.uint8)
+    codes = ((packed[:, None] >> np.array([6, 4, 2, 0], dtype=np.uint8)) & 3).ravel()[:nodes]
+    bi, bj = (a.ravel() for a in np.indices(roots))
+    size, pos = root_cells, 0
+    rows: List[np.ndarray] = []
+    cols: List[np.ndarray] = []
+    sizes: List[np.ndarray] = []
+    while len(bi):
+        level = codes[pos : pos + len(bi)]
+        pos += len(bi)
+        leaf = level == LEAF
+        rows.append(bi[leaf] * size)
+        cols.append(bj[leaf] * size)
+        sizes.append(np.full(int(leaf.sum()), size))
+        split = level == SPLIT
+        bi = (2 * bi[split][:, None] + _QUAD_ROW).ravel()
+        bj = (2 * bj[split][:, None] + _QUAD_COL).ravel()
+        size //= 2
+    return np.concatenate(rows), np.concatenate(cols), np.concatenate(sizes)
+
+
+def _centres(grid: SpatialGrid, row: np.ndarray, col: np.ndarray, size: np.ndarray):
+    # Same arithmetic as SpatialService.generate_grid, so size-1 blocks land exactly
+    # on the uniform cell centres
+    half = (grid.shape[0] - 1) // 2
+    coslat = max(np.cos(np.radians(grid.center_lat)), 1e-6)
+    fi = row + (size - 1) / 2.0 - half
+    fj = col + (size - 1) / 2.0 - half
+    lat = grid.center_lat + fi * grid.resolution_km / KM_PER_DEGREE
+    lon = grid.center_lon + fj * grid.resolution_km / (KM_PER_DEGREE * coslat)
+    return lat, lon
+
+
+def _cells_of(grid: SpatialGrid, lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Inverse of _centres for size-1 blocks: the grid cell containing each point
+    half = (grid.shape[0] - 1) // 2
+    coslat = max(np.cos(np.radians(grid.center_lat)), 1e-6)
+    row = np.rint((np.asarray(lat) - grid.center_lat) * KM_PER_DEGREE / grid.resolution_km) + half
+    col = np.rint((np.asarray(lon) - grid.center_lon) * KM_PER_DEGREE * coslat / grid.resolution_km) + half
+    return row.astype(np.int64), col.astype(np.int64)
+
+
+def refine(
+    grid: SpatialGrid,
+    evaluate: Callable[[np.ndarray, np.ndarray], Dict[str, np.ndarray]],
+    threshold: float,
+    field: str = "aqi",
+    root_cells: int = 16,
+    focus: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    focus_km: float = 1.0,
+) -> QuadTree:
+    """Adaptively evaluate ``grid`` down to its resolution.
+
+    ``evaluate(lat, lon)`` returns a dict of (hours, points) arrays; ``field`` drives
+    refinement. ``root_cells`` (a power of two) is the coarsest block edge in cells.
+    ``focus`` is (lat, lon) of points around which cells within ``focus_km`` are
+    refined to full resolution regardless.
+    """
+    started = time.perf_counter()
+    n = grid.shape[0]
+    root_cells = int(min(root_cells, 1 << max(n - 1, 1).bit_length()))
+    roots = -(-n // root_cells)
+    padded = roots * root_cells
+    fine_mask = np.zeros((padded, padded), dtype=bool)
+    fine_mask[:n, :n] = grid.mask
+
+    # Fine cells within focus_km (as a square of cells) of a focus point
+    focus_mask = np.zeros((padded, padded), dtype=bool)
+    if focus is not None and len(focus[0]):
+        reach = int(np.ceil(focus_km / grid.resolution_km))
+        row, col = _cells_of(grid, *focus)
+        span = np.arange(-reach, reach + 1)
+        rows = np.clip(row[:, None] + span, -1, padded)
+        cols = np.clip(col[:, None] + span, -1, padded)
+        ok_r, ok_c = (rows >= 0) & (rows < padded), (cols >= 0) & (cols < padded)
+        for r, c, okr, okc in zip(rows, cols, ok_r, ok_c):
+            focus_mask[np.ix_(r[okr], c[okc])] = True
+    focus_mask &= fine_mask
+
+    bi, bj = (a.ravel() for a in np.indices((roots, roots)))
+    size = root_cells
+    level_values: Dict[str, np.ndarray] = {}
+    codes: List[np.ndarray] = []
+    leaf_parts: List[Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, np.ndarray]]] = []
+    evaluated = levels = 0
+    largest_level, cell_seconds = 0, 0.0
+    while len(bi):
+        levels += 1
+        side = padded // size
+        present_raster = fine_mask.reshape(side, size, side, size).any(axis=(1, 3))
+        present = present_raster[bi, bj]
+        pi, pj = bi[present], bj[present]
+        lat, lon = _centres(grid, pi * size, pj * size, np.full(len(pi), size))
+        level_started = time.perf_counter()
+        result = evaluate(lat, lon)
+        if len(pi) > largest_level:
+            largest_level = len(pi)
+            cell_seconds = (time.perf_counter() - level_started) / len(pi)
+        evaluated += len(pi)
+
+        # Level raster: coarser leaves painted in, this level's blocks written over
+        if level_values:
+            level_values = {k: v.repeat(2, axis=1).repeat(2, axis=2) for k, v in level_values.items()}
+        else:
+            hours = next(iter(result.values())).shape[0]
+            level_values = {k: np.full((hours, side, side), np.nan) for k in result}
+        for k, v in result.items():
+            level_values[k][:, pi, pj] = v
+
+        split = np.zeros(len(pi), dtype=bool)
+        if size > 1:
+            raster = np.where(present_raster, level_values[field], np.nan)
+            grad = np.zeros((raster.shape[0], len(pi)))
+            for di, dj in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                ni, nj = pi + di, pj + dj
+                inside = (ni >= 0) & (ni < side) & (nj >= 0) & (nj < side)
+                diff = np.abs(raster[:, pi[inside], pj[inside]] - raster[:, ni[inside], nj[inside]])
+                grad[:, inside] = np.fmax(grad[:, inside], np.nan_to_num(diff))
+            split = grad.max(axis=0) > threshold
+            split |= focus_mask.reshape(side, size, side, size).any(axis=(1, 3))[pi, pj]
+
+        code = np.zeros(len(bi), dtype=np.uint8)
+        code[present] = np.where(split, SPLIT, LEAF)
+        codes.append(code)
+        leaf = ~split
+        leaf_parts.append(
+            (pi[leaf] * size, pj[leaf] * size, np.full(int(leaf.sum()), size), {k: v[:, leaf] for k, v in result.items()})
+        )
+        bi = (2 * pi[split][:, None] + _QUAD_ROW).ravel()
+        bj = (2 * pj[split][:, None] + _QUAD_COL).ravel()
+        size //= 2
+
+    return QuadTree(
+        grid=grid,
+        root_cells=root_cells,
+        roots=(roots, roots),
+        codes=np.concatenate(codes),
+        leaf_row=np.concatenate([p[0] for p in leaf_parts]),
+        leaf_col=np.concatenate([p[1] for p in leaf_parts]),
+        leaf_size=np.concatenate([p[2] for p in leaf_parts]),
+        values={k: np.concatenate([p[3][k] for p in leaf_parts], axis=1) for k in leaf_parts[0][3]},
+        evaluated=evaluated,
+        levels=levels,
+        elapsed_seconds=time.perf_counter() - started,
+        cell_seconds=cell_seconds,
+    )
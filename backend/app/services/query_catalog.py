@@ -0,0 +1,151 @@
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from prometheus_client import Histogram
+from sqlalchemy import bindparam, select
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.database import AQIForecast, HealthRecommendation, LatestReading
+
+CATALOG_SECONDS = Histogram(
+    "db_catalog_query_seconds",
+    "Hot-path catalog queries by phase: compile (SQLAlchemy -> SQL, once per process), "
+    "prepare (server-side parse/plan, once per connection) and execute",
+    ["query", "phase"],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+
+
+@dataclass
+class PreparedQuery:
+    """A catalog statement compiled once to asyncpg SQL and prepared once per connection."""
+
+    name: str
+    statement: Select
+    sql: str = ""
+    params: Tuple[str, ...] = ()
+    defaults: Dict[str, Any] = field(default_factory=dict)
+    compile_seconds: float = 0.0
+    stats: Dict[str, float] = field(default_factory=lambda: {"calls": 0, "execute_seconds": 0.0})
+
+    def compile(self) -> None:
+        started = time.perf_counter()
+        compiled = self.statement.compile(dialect=asyncpg_dialect())
+        self.sql = compiled.string
+        self.params = tuple(compiled.positiontup or ())
+        # Literal values baked into the statement, e.g. LIMIT 1
+        self.defaults = {
+            name: bind.value for name, bind in compiled.binds.items() if bind.value is not None
+        }
+        self.compile_seconds = time.perf_counter() - started
+        CATALOG_SECONDS.labels(query=self.name, phase="compile").observe(self.compile_seconds)
+
+    def args(self, values: Dict[str, Any]) -> List[Any]:
+        merged = {**self.defaults, **values}
+        missing = [p for p in self.params if p not in merged]
+        if missing:
+            raise TypeError(f"{self.name}: missing parameters {missing}")
+        return [merged[p] for p in self.params]
+
+
+class QueryCatalog:
+    """Named hot-path queries executed as asyncpg prepared statements.
+
+    SQLAlchemy compilation happens once, when a query is registered, instead of on
+    every request; each pooled connection prepares a statement the first time it runs
+    it and keeps the handle in the connection's ``info`` for the connection's lifetime.
+    Queries run on the session's connection (and transaction, if one is open).
+    """
+
+    def __init__(self) -> None:
+        self._queries: Dict[str, PreparedQuery] = {}
+
+    def register(self, name: str, statement: Select) -> PreparedQuery:
+        query = PreparedQuery(name, statement)
+        query.compile()
+        self._queries[name] = query
+        return query
+
+    def __getitem__(self, name: str) -> PreparedQuery:
+        return self._queries[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._queries
+
+    async def _prepared(self, session: AsyncSession, query: PreparedQuery):
+        conn = await session.connection()
+        fairy = await conn.get_raw_connection()
+        statements = fairy.info.setdefault("catalog_statements", {})
+        prepared = statements.get(query.name)
+        if prepared is None:
+            started = time.perf_counter()
+            prepared = await fairy.driver_connection.prepare(query.sql)
+            CATALOG_SECONDS.labels(query=query.name, phase="prepare").observe(
+                time.perf_counter() - started
+            )
+            statements[query.name] = prepared
+        return statements, prepared
+
+    async def fetch(self, session: AsyncSession, name: str, **values: Any) -> List[Dict[str, Any]]:
+        query = self._queries[name]
+        args = query.args(values)
+        statements, prepared = await self._prepared(session, query)
+        started = time.perf_counter()
+        try:
+            records = await prepared.fetch(*args)
+        except Exception as e:
+            # Schema changes invalidate prepared statements; re-prepare once
+            if type(e).__name__ != "InvalidCachedStatementError":
+                raise
+            statements.pop(name, None)
+            _, prepared = await self._prepared(session, query)
+            records = await prepared.fetch(*args)
+        elapsed = time.perf_counter() - started
+        CATALOG_SECONDS.labels(query=name, phase="execute").observe(elapsed)
+        query.stats["calls"] += 1
+        query.stats["execute_seconds"] += elapsed
+        return [dict(r) for r in records]
+
+    async def fetchrow(self, session: AsyncSession, name: str, **values: Any) -> Optional[Dict[str, Any]]:
+        rows = await self.fetch(session, name, **values)
+        return rows[0] if rows else None
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-query compile time and cumulative execution time, in milliseconds."""
+        return {
+            name: {
+                "compile_ms": round(q.compile_seconds * 1000, 3),
+                "calls": q.stats["calls"],
+                "execute_ms_total": round(q.stats["execute_seconds"] * 1000, 3),
+            }
+            for name, q in self._queries.items()
+        }
+
+
+CATALOG = QueryCatalog()
+
+CATALOG.register(
+    "latest_reading_by_station",
+    select(LatestReading.__table__).where(LatestReading.station_id == bindparam("station_id")),
+)
+CATALOG.register(
+    "forecasts_by_cell",
+    select(AQIForecast.__table__)
+    .where(
+        AQIForecast.grid_cell == bindparam("grid_cell"),
+        AQIForecast.target_timestamp >= bindparam("start"),
+        AQIForecast.target_timestamp < bindparam("end"),
+    )
+    .order_by(AQIForecast.target_timestamp, AQIForecast.forecast_timestamp.desc()),
+)
+# Per-user alert feed: health recommendations are the alerts persisted per user
+CATALOG.register(
+    "alerts_by_user",
+    select(HealthRecommendation.__table__)
+    .where(HealthRecommendation.user_id == bindparam("user_id"))
+    .order_by(HealthRecommendation.timestamp.desc())
+    .limit(bindparam("limit")),
+)
@@ -0,0 +1,318 @@
+"""Road graph from a local OpenStreetMap extract, as compact CSR arrays.
+
+``ROAD_GRAPH_PATH`` points at an OSM XML extract (``.osm``, ``.osm.gz`` or
+``.osm.bz2``, e.g. cut from the Geofabrik northern-zone file for Delhi NCR) or at the
+``.npz`` the graph was compiled to. Compiling an extract parses it once with the
+standard library and writes ``<extract>.npz`` next to it (when writable); later
+starts load the arrays directly. Loading happens once, in a worker thread at startup
+(``load_road_graph``); requests only read the loaded graph. No network access is
+needed.
+
+Every way with a routable ``highway`` tag becomes directed edges between consecutive
+nodes, sorted by tail: the out-edges of node ``u`` are
+``indptr[u]:indptr[u + 1]`` of ``indices`` (heads), ``length_m``, ``road_class`` and
+``modes`` (bit mask of the transport modes allowed on the edge; ``oneway`` restricts
+driving only). Node coordinates are ``lat`` / ``lon``. Per-mode travel times, the
+edge -> raster cell map and the endpoint snapping index are derived lazily and kept
+on the graph (see app.services.routing for the search).
+"""
+
+import asyncio
+import bz2
+import gzip
+import os
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import structlog
+
+from app.services.route_exposure import MODE_SPEED_KMH
+from app.services.spatial_service import KM_PER_DEGREE, SpatialIndex
+
+logger = structlog.get_logger()
+
+ROAD_GRAPH_PATH = os.getenv("ROAD_GRAPH_PATH")
+
+WALK, BIKE, DRIVE = 1, 2, 4
+MODE_BITS = {"walking": WALK, "cycling": BIKE, "driving": DRIVE}
+# highway tag -> (allowed modes, driving speed km/h); walking and cycling speeds are
+# per mode (see MODE_SPEED_KMH in route_exposure)
+ROAD_CLASSES: Dict[str, Tuple[int, float]] = {
+    "motorway": (DRIVE, 60.0),
+    "motorway_link": (DRIVE, 40.0),
+    "trunk": (WALK | BIKE | DRIVE, 45.0),
+    "trunk_link": (WALK | BIKE | DRIVE, 30.0),
+    "primary": (WALK | BIKE | DRIVE, 35.0),
+    "primary_link": (WALK | BIKE | DRIVE, 25.0),
+    "secondary": (WALK | BIKE | DRIVE, 30.0),
+    "secondary_link": (WALK | BIKE | DRIVE, 25.0),
+    "tertiary": (WALK | BIKE | DRIVE, 25.0),
+    "tertiary_link": (WALK | BIKE | DRIVE, 20.0),
+    "unclassified": (WALK | BIKE | DRIVE, 20.0),
+    "residential": (WALK | BIKE | DRIVE, 18.0),
+    "living_street": (WALK | BIKE | DRIVE, 10.0),
+    "service": (WALK | BIKE | DRIVE, 12.0),
+    "road": (WALK | BIKE | DRIVE, 18.0),
+    "track": (WALK | BIKE, 0.0),
+    "cycleway": (WALK | BIKE, 0.0),
+    "path": (WALK | BIKE, 0.0),
+    "footway": (WALK, 0.0),
+    "pedestrian": (WALK, 0.0),
+    "steps": (WALK, 0.0),
+}
+CLASS_NAMES = tuple(ROAD_CLASSES)
+_CLASS_MODES = np.array([ROAD_CLASSES[c][0] for c in CLASS_NAMES], dtype=np.uint8)
+CLASS_DRIVE_KMH = np.array([ROAD_CLASSES[c][1] for c in CLASS_NAMES], dtype=np.float32)
+_ONEWAY = {"yes", "true", "1"}
+# Raster geometries whose edge -> cell mapping is kept (see RoadGraph.edge_cells)
+EDGE_CELL_CACHE_SIZE = 8
+
+
+@dataclass
+class ModeCosts:
+    bit: int
+    seconds: np.ndarray  # per edge, inf where the mode may not use it
+    top_speed: float  # m/s, bounds the remaining travel time in searches
+    typical_seconds: float  # median open edge
+
+
+@dataclass
+class RoadGraph:
+    lat: np.ndarray
+    lon: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    length_m: np.ndarray
+    road_class: np.ndarray
+    modes: np.ndarray
+    _node_index: Dict[int, Tuple[SpatialIndex, np.ndarray]] = field(default_factory=dict, repr=False)
+    _travel: Dict[str, ModeCosts] = field(default_factory=dict, repr=False)
+    _cells: Dict[Tuple, np.ndarray] = field(default_factory=dict, repr=False)
+
+    @property
+    def nodes(self) -> int:
+        return len(self.lat)
+
+    @property
+    def edges(self) -> int:
+        return len(self.indices)
+
+    def tails(self) -> np.ndarray:
+        return np.repeat(np.arange(self.nodes, dtype=np.int32), np.diff(self.indptr))
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path,
+            lat=self.lat,
+            lon=self.lon,
+            indptr=self.indptr,
+            indices=self.indices,
+            length_m=self.length_m,
+            road_class=self.road_class,
+            modes=self.modes,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "RoadGraph":
+        with np.load(path) as data:
+            return cls(**{k: data[k] for k in data.files})
+
+    def snap(self, lat: Sequence[float], lon: Sequence[float], mode_bit: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Nearest node with an out-edge usable by the mode, and its distance (km)."""
+        if mode_bit not in self._node_index:
+            usable = np.zeros(self.nodes, dtype=bool)
+            usable[self.tails()[(self.modes & mode_bit) > 0]] = True
+            nodes = np.flatnonzero(usable)
+            index = SpatialIndex(cell_km=0.5, capacity=max(len(nodes), 1))
+            index.insert(nodes.tolist(), self.lat[nodes], self.lon[nodes])
+            self._node_index[mode_bit] = (index, nodes)
+        index, nodes = self._node_index[mode_bit]
+        # Nothing is ever removed, so slots are positions in ``nodes``
+        slots, dist = index.nearest_batch(lat, lon, k=1)
+        return nodes[slots[:, 0]], dist[:, 0]
+
+    def mode_costs(self, mode: str) -> ModeCosts:
+        """Per-edge travel times for a transport mode, cached.
+
+        Driving follows each road class's speed; walking and cycling use the mode's
+        door-to-door speed (MODE_SPEED_KMH).
+        """
+        costs = self._travel.get(mode)
+        if costs is None:
+            bit = MODE_BITS[mode]
+            allowed = (self.modes & bit) > 0
+            kmh = CLASS_DRIVE_KMH[self.road_class] if bit == DRIVE else np.float32(MODE_SPEED_KMH[mode])
+            seconds = np.where(allowed, self.length_m * np.float32(3.6) / kmh, np.inf).astype(np.float32)
+            open_ = seconds[allowed]
+            costs = ModeCosts(
+                bit=bit,
+                seconds=seconds,
+                top_speed=float(np.max(kmh[allowed] if bit == DRIVE else kmh, initial=1.0)) / 3.6,
+                typical_seconds=float(np.median(open_)) if len(open_) else 1.0,
+            )
+            self._travel[mode] = costs
+        return costs
+
+    def edge_cells(self, lat0: float, lon0: float, dlat: float, dlon: float, rows: int, cols: int) -> np.ndarray:
+        """Flat index of the raster cell holding each edge's midpoint (clamped), cached
+        per raster geometry."""
+        key = (round(lat0, 6), round(lon0, 6), round(dlat, 9), round(dlon, 9), rows, cols)
+        cells = self._cells.get(key)
+        if cells is None:
+            tails = self.tails()
+            mid_lat = (self.lat[tails] + self.lat[self.indices]) / 2
+            mid_lon = (self.lon[tails] + self.lon[self.indices]) / 2
+            i = np.clip(np.rint((mid_lat - lat0) / dlat), 0, rows - 1).astype(np.int32)
+            j = np.clip(np.rint((mid_lon - lon0) / dlon), 0, cols - 1).astype(np.int32)
+            cells = i * cols + j
+            if len(self._cells) >= EDGE_CELL_CACHE_SIZE:
+                self._cells.pop(next(iter(self._cells)))
+            self._cells[key] = cells
+        return cells
+
+
+def build_graph(
+    node_lat: np.ndarray,
+    node_lon: np.ndarray,
+    ways: Iterable[Tuple[Sequence[int], str, str]],
+) -> RoadGraph:
+    """CSR graph from node coordinates and ``(node indices, highway, oneway)`` ways."""
+    tails: List[np.ndarray] = []
+    heads: List[np.ndarray] = []
+    classes: List[np.ndarray] = []
+    modes: List[np.ndarray] = []
+    for refs, highway, oneway in ways:
+        if highway not in ROAD_CLASSES or len(refs) < 2:
+            continue
+        refs = np.asarray(refs, dtype=np.int64)
+        if oneway == "-1":
+            refs = refs[::-1]
+        a, b = refs[:-1], refs[1:]
+        cls = CLASS_NAMES.index(highway)
+        allowed = int(_CLASS_MODES[cls])
+        reverse = allowed & ~DRIVE if oneway in _ONEWAY or oneway == "-1" else allowed
+        tails += [a, b]
+        heads += [b, a]
+        classes.append(np.full(2 * len(a), cls, dtype=np.uint8))
+        modes += [np.full(len(a), allowed, dtype=np.uint8), np.full(len(a), reverse, dtype=np.uint8)]
+
+    n = len(node_lat)
+    tail = np.concatenate(tails) if tails else np.empty(0, dtype=np.int64)
+    head = np.concatenate(heads) if heads else np.empty(0, dtype=np.int64)
+    road_class = np.concatenate(classes) if classes else np.empty(0, dtype=np.uint8)
+    mode = np.concatenate(modes) if modes else np.empty(0, dtype=np.uint8)
+    keep = (mode > 0) & (tail != head)
+    tail, head, road_class, mode = tail[keep], head[keep], road_class[keep], mode[keep]
+
+    order = np.argsort(tail, kind="stable")
+    tail, head, road_class, mode = tail[order], head[order], road_class[order], mode[order]
+    lat = np.asarray(node_lat, dtype=np.float64)
+    lon = np.asarray(node_lon, dtype=np.float64)
+    kx = KM_PER_DEGREE * 1000.0 * np.cos(np.radians((lat[tail] + lat[head]) / 2))
+    length = np.hypot((lon[head] - lon[tail]) * kx, (lat[head] - lat[tail]) * KM_PER_DEGREE * 1000.0)
+    return RoadGraph(
+        lat=lat,
+        lon=lon,
+        indptr=np.concatenate([[0], np.cumsum(np.bincount(tail, minlength=n))]).astype(np.int64),
+        indices=head.astype(np.int32),
+        length_m=length.astype(np.float32),
+        road_class=road_class,
+        modes=mode,
+    )
+
+
+def _open(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    return open(path, "rb")
+
+
+def parse_osm(path: str) -> RoadGraph:
+    """Stream an OSM XML extract and build the road graph from its highway ways.
+
+    Two passes: the first collects the routable ways, the second the coordinates of
+    just the nodes they reference, so memory follows the road network rather than the
+    whole extract. Ways must follow nodes, as in every standard extract.
+    """
+    ways: List[Tuple[List[int], str, str]] = []
+    with _open(path) as f:
+        for _, elem in ET.iterparse(f, events=("end",)):
+            if elem.tag == "way":
+                tags = {t.get("k"): t.get("v") for t in elem.iter("tag")}
+                highway = tags.get("highway")
+                if highway in ROAD_CLASSES and tags.get("access") not in ("no", "private"):
+                    oneway = tags.get("oneway", "yes" if tags.get("junction") == "roundabout" else "no")
+                    ways.append(([int(nd.get("ref")) for nd in elem.iter("nd")], highway, oneway))
+            if elem.tag in ("node", "way", "relation"):
+                elem.clear()
+
+    wanted = {r for refs, _, _ in ways for r in refs}
+    coords: Dict[int, Tuple[float, float]] = {}
+    with _open(path) as f:
+        for _, elem in ET.iterparse(f, events=("end",)):
+            if elem.tag == "way":
+                break
+            if elem.tag == "node":
+                node_id = int(elem.get("id"))
+                if node_id in wanted:
+                    coords[node_id] = (float(elem.get("lat")), float(elem.get("lon")))
+                elem.clear()
+
+    used = np.array(sorted(coords), dtype=np.int64)
+    position = {int(u): i for i, u in enumerate(used)}
+    lat = np.array([coords[int(u)][0] for u in used])
+    lon = np.array([coords[int(u)][1] for u in used])
+    # Ways are split where a referenced node is missing from a clipped extract
+    compact: List[Tuple[List[int], str, str]] = []
+    for refs, highway, oneway in ways:
+        run: List[int] = []
+        for r in refs + [None]:
+            if r is not None and r in position:
+                run.append(position[r])
+                continue
+            if len(run) > 1:
+                compact.append((run, highway, oneway))
+            run = []
+    return build_graph(lat, lon, compact)
+
+
+_graph: Optional[RoadGraph] = None
+_graph_lock = asyncio.Lock()
+
+
+def get_road_graph() -> Optional[RoadGraph]:
+    """Process-wide graph loaded by ``load_road_graph`` (None when unset, missing or
+    not loaded yet). Never parses on the caller's thread."""
+    return _graph
+
+
+def _read_graph(path: str) -> RoadGraph:
+    if path.endswith(".npz"):
+        return RoadGraph.load(path)
+    compiled = path + ".npz"
+    if os.path.exists(compiled) and os.path.getmtime(compiled) >= os.path.getmtime(path):
+        return RoadGraph.load(compiled)
+    graph = parse_osm(path)
+    try:
+        graph.save(compiled)
+    except OSError as e:
+        logger.warning("Could not cache compiled road graph", path=compiled, error=str(e))
+    return graph
+
+
+async def load_road_graph(path: Optional[str] = None) -> Optional[RoadGraph]:
+    """Load (compiling when needed) the graph from ``path`` (default ROAD_GRAPH_PATH)
+    in a worker thread, once: concurrent callers wait for the same load. Called from
+    the application lifespan."""
+    global _graph
+    path = path or ROAD_GRAPH_PATH
+    async with _graph_lock:
+        if _graph is not None or not path or not os.path.exists(path):
+            return _graph
+        _graph = await asyncio.to_thread(_read_graph, path)
+    logger.info("Road graph loaded", nodes=_graph.nodes, edges=_graph.edges)
+    return _graph
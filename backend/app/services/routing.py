@@ -0,0 +1,155 @@
+"""Pollution-weighted shortest paths over the road graph.
+
+The cost of an edge is its travel time scaled by the exposure it adds::
+
+    cost = seconds * (1 + weight * AQI(cell, hour) / AQI_REFERENCE)
+
+where ``AQI(cell, hour)`` is the forecast raster cell under the edge's midpoint at the
+hour the edge is entered (time-dependent: the label's elapsed time is carried along
+the search), and ``weight`` trades time for exposure (0 = fastest route). The per-cell
+weights are one small (hours, cells) table per query; the edge -> cell mapping and
+per-mode travel times are cached on the graph.
+
+The search is A* with a straight-line lower bound (distance at the mode's top speed
+times the cheapest cell weight), run as delta-stepping so each step is a whole-array
+operation: queued nodes are bucketed by their estimate ``f = g + h`` in steps of
+ROUTING_DELTA_EDGES typical edge costs, the lowest bucket is expanded at once,
+improved heads are (re)queued, and the search stops when no queued estimate can beat
+the target's label.
+With static costs this is exact; with hourly costs it is the usual time-dependent
+approximation of pricing each edge at its entry time.
+"""
+
+import heapq
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.road_graph import ModeCosts, RoadGraph
+from app.services.route_exposure import SpaceTimeGrid
+from app.services.spatial_service import KM_PER_DEGREE, expand_ranges
+
+ROUTING_DELTA_EDGES = float(os.getenv("ROUTING_DELTA_EDGES", "4"))
+AQI_REFERENCE = 100.0
+# Farthest an endpoint may be from the network to be routed on it
+SNAP_MAX_KM = float(os.getenv("ROUTING_SNAP_MAX_KM", "1"))
+# Exposure weight per /health/safe-routes health_priority
+PRIORITY_WEIGHTS = {"low": 0.5, "medium": 1.0, "high": 3.0}
+
+
+@dataclass
+class Path:
+    nodes: np.ndarray
+    cost: float
+    seconds: float
+    expanded: int
+
+    def coordinates(self, graph: RoadGraph) -> List[dict]:
+        return [{"lat": float(graph.lat[n]), "lon": float(graph.lon[n])} for n in self.nodes]
+
+
+def cell_weights(field: SpaceTimeGrid, weight: float) -> np.ndarray:
+    """(hours, cells) cost multipliers for an exposure weight."""
+    values = field.values.reshape(field.values.shape[0], -1)
+    return (1.0 + weight * np.maximum(values, 0) / AQI_REFERENCE).astype(np.float32)
+
+
+def shortest_path(
+    graph: RoadGraph,
+    source: int,
+    target: int,
+    costs: ModeCosts,
+    edge_cell: np.ndarray,
+    weights: np.ndarray,
+    start_hour: float = 0.0,
+) -> Optional[Path]:
+    """Least-cost path from ``source`` to ``target`` (None when unreachable).
+
+    ``edge_cell`` is each edge's column in ``weights`` and ``start_hour`` the departure
+    as a fractional row of ``weights``.
+    """
+    n = graph.nodes
+    travel_s = costs.seconds
+    depth = weights.shape[0]
+    start_hour = max(start_hour, 0.0)
+    delta = ROUTING_DELTA_EDGES * costs.typical_seconds * float(weights.mean())
+    # Consistent lower bound on the remaining cost, slightly shrunk for rounding
+    floor = 0.999 * float(weights.min()) / costs.top_speed
+    kx = KM_PER_DEGREE * 1000.0 * np.cos(np.radians(graph.lat[target]))
+    ky = KM_PER_DEGREE * 1000.0
+
+    def bound(nodes: np.ndarray) -> np.ndarray:
+        dx = (graph.lon[nodes] - graph.lon[target]) * kx
+        dy = (graph.lat[nodes] - graph.lat[target]) * ky
+        return floor * np.hypot(dx, dy)
+
+    g = np.full(n, np.inf)
+    h = np.full(n, -1.0)
+    elapsed = np.zeros(n)
+    pred = np.full(n, -1, dtype=np.int64)
+    g[source] = 0.0
+    h[source] = bound(np.array([source]))[0]
+    # Queued (node, estimate) pairs per bucket floor(f / delta); entries whose node has
+    # since improved are stale and dropped when their bucket is expanded
+    buckets: Dict[int, List[Tuple[np.ndarray, np.ndarray]]] = {}
+    keys: List[int] = []
+
+    def push(nodes: np.ndarray, f: np.ndarray) -> None:
+        slot = (f // delta).astype(np.int64)
+        low, high = int(slot.min()), int(slot.max())
+        for key in range(low, high + 1):
+            part = slice(None) if low == high else slot == key
+            if low != high and not part.any():
+                continue
+            if key not in buckets:
+                buckets[key] = []
+                heapq.heappush(keys, key)
+            buckets[key].append((nodes[part], f[part]))
+
+    push(np.array([source]), h[[source]])
+    expanded = 0
+    while keys and keys[0] * delta < g[target]:
+        key = keys[0]
+        parts = buckets[key]
+        frontier = np.concatenate([p[0] for p in parts])
+        f = np.concatenate([p[1] for p in parts])
+        heapq.heappop(keys)
+        del buckets[key]
+        frontier = frontier[f == g[frontier] + h[frontier]]
+        expanded += len(frontier)
+
+        starts = graph.indptr[frontier]
+        counts = graph.indptr[frontier + 1] - starts
+        edges = expand_ranges(starts, counts)
+        tails = np.repeat(frontier, counts)
+        seconds = travel_s[edges]
+        hour = np.minimum((start_hour + elapsed[tails] / 3600.0).astype(np.int64), depth - 1)
+        cand = g[tails] + seconds * weights[hour, edge_cell[edges]]
+        heads = graph.indices[edges].astype(np.int64)
+        better = cand < g[heads]
+        if not better.any():
+            continue
+        tails, seconds, cand, heads = tails[better], seconds[better], cand[better], heads[better]
+        # Cheapest candidate per head (ties keep one of the equal-cost tails)
+        np.minimum.at(g, heads, cand)
+        pick = cand == g[heads]
+        heads, tails = heads[pick], tails[pick]
+        elapsed[heads] = elapsed[tails] + seconds[pick]
+        pred[heads] = tails
+        fresh = h[heads] < 0
+        h[heads[fresh]] = bound(heads[fresh])
+        push(heads, g[heads] + h[heads])
+
+    if not np.isfinite(g[target]):
+        return None
+    nodes = [target]
+    while nodes[-1] != source:
+        nodes.append(int(pred[nodes[-1]]))
+    return Path(
+        nodes=np.array(nodes[::-1], dtype=np.int64),
+        cost=float(g[target]),
+        seconds=float(elapsed[target]),
+        expanded=expanded,
+    )
@@ -3,6 +3,18 @@ from typing import Dict, Any
 import random
 from datetime import datetime
 
+import numpy as np
+
+from app.services.spatial_service import SpatialService
+
+SOURCE_TYPES = (
+    "stubble_burning",
+    "vehicular",
+    "industrial",
+    "dust_and_construction",
+    "biomass_burning",
+)
+
 
 class SourceAttributionService:
     def __init__(self, db: AsyncSession):
@@ -97,11 +109,31 @@ class SourceAttributionService:
         radius_km: float,
         resolution_km: float,
     ) -> Dict[str, Any]:
-        # Placeholder structure
+        grid = SpatialService(self.db).generate_grid(
+            center_lat, center_lon, radius_km, resolution_km, clip=True
+        )
+        lat, lon = grid.points()
+        # Placeholder shares: one Dirichlet draw per cell, (cells, sources)
+        shares = np.random.default_rng().dirichlet(np.ones(len(SOURCE_TYPES)), size=lat.size)
+        dominant = shares.argmax(axis=1)
+        counts = np.bincount(dominant, minlength=len(SOURCE_TYPES))
         return {
-            "source_grid": [],
+            "source_grid": {
+                "shape": list(grid.shape),
+                "cell_index": grid.index.tolist(),
+                "latitudes": np.round(lat, 6).tolist(),
+                "longitudes": np.round(lon, 6).tolist(),
+                "cell_ids": grid.cell_ids[grid.mask].tolist(),
+                "shares": {
+                    source: np.round(shares[:, i], 3).tolist()
+                    for i, source in enumerate(SOURCE_TYPES)
+                },
+                "dominant_source": [SOURCE_TYPES[i] for i in dominant],
+            },
             "hotspots": [],
-            "area_sources": {},
+            "area_sources": {
+                source: int(counts[i]) for i, source in enumerate(SOURCE_TYPES)
+            },
             "boundary_analysis": {},
         }
 
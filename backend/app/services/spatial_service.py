@@ -1,5 +1,599 @@
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Dict
+from typing import Any, List, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Hierarchical cell keys behind the grid_cell DB columns, response cell ids and cache
+# keys. The finest level (CELL_LEVELS) is the 0.01 degree square of the per-cell
+# rollups, cell_y = floor(lat / 0.01) + 9000, cell_x = floor(lon / 0.01) + 18000; each
+# coarser level merges 2 x 2 cells. A key interleaves the bits of (cell_y, cell_x)
+# (Z-order, y bit first), truncated to the level, followed by a single 1 bit and zero
+# padding:
+#
+#     key = ((zorder(y, x) >> 2 * (CELL_LEVELS - level)) * 2 + 1) << 2 * (CELL_LEVELS - level)
+#
+# so the finest keys are odd, parent / children / level are bit operations, and all
+# finest keys inside a cell form the contiguous range ``cell_range(key)`` (bbox filters
+# become a few ``grid_cell BETWEEN lo AND hi``). Children are ordered SW, SE, NW, NE.
+# Same formula as core.grid_cell_key in database/migrations/006_*.
+GRID_CELL_DEGREES = 0.01
+CELL_LEVELS = 16
+_CELL_Y_OFFSET = 9000  # cells per 90 degrees of latitude
+_CELL_X_OFFSET = 18000  # cells per 180 degrees of longitude
+KM_PER_DEGREE = 111.32  # one degree of latitude (of longitude at the equator)
+# Neighbour steps (dy, dx) from north clockwise
+_NEIGHBOUR_STEPS = ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1))
+
+
+def _spread(v: np.ndarray) -> np.ndarray:
+    # 16 bits -> every other bit of 32
+    v = v & 0xFFFF
+    v = (v | (v << 8)) & 0x00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F
+    v = (v | (v << 2)) & 0x33333333
+    return (v | (v << 1)) & 0x55555555
+
+
+def _compact(v: np.ndarray) -> np.ndarray:
+    v = v & 0x55555555
+    v = (v | (v >> 1)) & 0x33333333
+    v = (v | (v >> 2)) & 0x0F0F0F0F
+    v = (v | (v >> 4)) & 0x00FF00FF
+    return (v | (v >> 8)) & 0xFFFF
+
+
+def _lsb(keys: np.ndarray) -> np.ndarray:
+    return keys & -keys
+
+
+def encode_cells(y: Any, x: Any, level: Any = CELL_LEVELS) -> np.ndarray:
+    """Keys of the cells with indices (y, x) counted at ``level`` (scalar or per cell)."""
+    y = np.asarray(y, dtype=np.int64)
+    x = np.asarray(x, dtype=np.int64)
+    shift = 2 * (CELL_LEVELS - np.asarray(level, dtype=np.int64))
+    return (((_spread(y) << 1) | _spread(x)) * 2 + 1) << shift
+
+
+def decode_cells(keys: Any) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(level, y, x) of cell keys, indices counted at the cell's own level."""
+    keys = np.asarray(keys, dtype=np.int64)
+    trailing = np.log2(_lsb(keys)).astype(np.int64)
+    zorder = keys >> (trailing + 1)
+    return CELL_LEVELS - trailing // 2, _compact(zorder >> 1), _compact(zorder)
+
+
+def cell_keys(lat: Any, lon: Any, level: int = CELL_LEVELS) -> np.ndarray:
+    """Keys of the level-``level`` cells containing points (int64, same shape)."""
+    y = np.floor(np.asarray(lat) / GRID_CELL_DEGREES).astype(np.int64) + _CELL_Y_OFFSET
+    x = np.floor(np.asarray(lon) / GRID_CELL_DEGREES).astype(np.int64) + _CELL_X_OFFSET
+    drop = CELL_LEVELS - level
+    return encode_cells(y >> drop, x >> drop, level)
+
+
+def cell_level(keys: Any) -> np.ndarray:
+    return CELL_LEVELS - np.log2(_lsb(np.asarray(keys, dtype=np.int64))).astype(np.int64) // 2
+
+
+def cell_parent(keys: Any, level: Optional[int] = None) -> np.ndarray:
+    """Ancestor at ``level`` (default: one level up); keys must be finer than it."""
+    keys = np.asarray(keys, dtype=np.int64)
+    if level is None:
+        new_lsb = _lsb(keys) << 2
+    else:
+        new_lsb = np.int64(1) << (2 * (CELL_LEVELS - level))
+    return (keys & -new_lsb) | new_lsb
+
+
+def cell_children(keys: Any) -> np.ndarray:
+    """(..., 4) children in SW, SE, NW, NE order; keys must be coarser than CELL_LEVELS."""
+    keys = np.asarray(keys, dtype=np.int64)[..., None]
+    lsb = _lsb(keys)
+    return keys - lsb + (lsb >> 2) * np.array([1, 3, 5, 7], dtype=np.int64)
+
+
+def cell_neighbours(keys: Any) -> np.ndarray:
+    """(..., 8) same-level neighbours from north clockwise (-1 beyond the keyspace)."""
+    level, y, x = decode_cells(keys)
+    side = np.int64(1) << level
+    out = []
+    for dy, dx in _NEIGHBOUR_STEPS:
+        ny, nx = y + dy, x + dx
+        inside = (ny >= 0) & (ny < side) & (nx >= 0) & (nx < side)
+        out.append(np.where(inside, encode_cells(ny, nx, level), -1))
+    return np.stack(out, axis=-1)
+
+
+def cell_range(keys: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """Inclusive (lo, hi) range of the finest keys inside each cell."""
+    keys = np.asarray(keys, dtype=np.int64)
+    lsb = _lsb(keys)
+    return keys - lsb + 1, keys + lsb - 1
+
+
+def cell_bounds(keys: Any) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """(min_lat, min_lon, max_lat, max_lon) of each cell."""
+    level, y, x = decode_cells(keys)
+    drop = CELL_LEVELS - level
+    size = np.int64(1) << drop
+    y0, x0 = (y << drop) - _CELL_Y_OFFSET, (x << drop) - _CELL_X_OFFSET
+    return (
+        y0 * GRID_CELL_DEGREES,
+        x0 * GRID_CELL_DEGREES,
+        (y0 + size) * GRID_CELL_DEGREES,
+        (x0 + size) * GRID_CELL_DEGREES,
+    )
+
+
+def cell_centres(keys: Any) -> Tuple[np.ndarray, np.ndarray]:
+    min_lat, min_lon, max_lat, max_lon = cell_bounds(keys)
+    return (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+
+
+def cell_polygons(keys: Any) -> np.ndarray:
+    """(..., 5, 2) closed [lon, lat] rings (GeoJSON order, counter-clockwise)."""
+    min_lat, min_lon, max_lat, max_lon = cell_bounds(keys)
+    lons = np.stack([min_lon, max_lon, max_lon, min_lon, min_lon], axis=-1)
+    lats = np.stack([min_lat, min_lat, max_lat, max_lat, min_lat], axis=-1)
+    return np.stack([lons, lats], axis=-1)
+
+
+def cover_bbox(
+    min_lat: float, max_lat: float, min_lon: float, max_lon: float, max_cells: int = 64
+) -> np.ndarray:
+    """Sorted cells of mixed levels covering a bounding box.
+
+    Descends from the whole keyspace, keeping cells inside the box and splitting those
+    on its edge; once splitting could exceed ``max_cells`` the edge cells are kept
+    whole, so the cover may overhang the box (filter on lat/lon as well).
+    """
+    y0, y1 = (math.floor(v / GRID_CELL_DEGREES) + _CELL_Y_OFFSET for v in (min_lat, max_lat))
+    x0, x1 = (math.floor(v / GRID_CELL_DEGREES) + _CELL_X_OFFSET for v in (min_lon, max_lon))
+    cover: List[np.ndarray] = []
+    edge = encode_cells([0], [0], 0)
+    for level in range(CELL_LEVELS + 1):
+        _, y, x = decode_cells(edge)
+        drop = CELL_LEVELS - level
+        lo_y, lo_x = y << drop, x << drop
+        hi_y, hi_x = lo_y + (1 << drop) - 1, lo_x + (1 << drop) - 1
+        hit = (hi_y >= y0) & (lo_y <= y1) & (hi_x >= x0) & (lo_x <= x1)
+        inside = (lo_y >= y0) & (hi_y <= y1) & (lo_x >= x0) & (hi_x <= x1)
+        cover.append(edge[hit & inside])
+        edge = edge[hit & ~inside]
+        if level == CELL_LEVELS or sum(map(len, cover)) + 4 * len(edge) > max_cells:
+            cover.append(edge)
+            break
+        edge = cell_children(edge).ravel()
+    return np.sort(np.concatenate(cover))
+
+
+def key_ranges(keys: Any) -> List[Tuple[int, int]]:
+    """Merged inclusive ranges of the finest keys inside sorted, disjoint cells."""
+    lo, hi = cell_range(keys)
+    if not len(lo):
+        return []
+    # Consecutive finest keys differ by 2 (they are all odd)
+    starts = np.flatnonzero(np.r_[True, lo[1:] != hi[:-1] + 2])
+    ends = np.r_[starts[1:], len(lo)] - 1
+    return [(int(lo[a]), int(hi[b])) for a, b in zip(starts, ends)]
+
+
+def grid_cell_id(lat: float, lon: float) -> int:
+    """Finest cell key of a point, as stored in the grid_cell columns."""
+    return int(cell_keys(lat, lon))
+
+
+def grid_cell_ids(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """Vectorized ``grid_cell_id`` for arrays of points (int64, same shape)."""
+    return cell_keys(lat, lon)
+
+
+def grid_cell_ranges_in_bbox(
+    min_lat: float, max_lat: float, min_lon: float, max_lon: float, max_ranges: int = 64
+) -> List[Tuple[int, int]]:
+    """grid_cell ranges covering a bounding box, for ``grid_cell BETWEEN lo AND hi`` filters."""
+    return key_ranges(cover_bbox(min_lat, max_lat, min_lon, max_lon, max_cells=max_ranges))
+
+
+@dataclass
+class SpatialGrid:
+    """Regular grid of cell centres as contiguous (rows, cols) arrays.
+
+    Rows run south to north and columns west to east. ``mask`` marks the cells to
+    evaluate (all of them unless the grid was clipped to its radius); ``cell_ids``
+    holds each centre's ``grid_cell_id``. Consumers work on ``points()``, the masked
+    cells flattened in row-major order, and can rebuild the raster with ``index``.
+    """
+
+    center_lat: float
+    center_lon: float
+    radius_km: float
+    resolution_km: float
+    lat: np.ndarray
+    lon: np.ndarray
+    mask: np.ndarray
+    cell_ids: np.ndarray
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.lat.shape
+
+    @property
+    def size(self) -> int:
+        """Number of evaluated (masked-in) cells."""
+        return int(np.count_nonzero(self.mask))
+
+    @property
+    def index(self) -> np.ndarray:
+        """Flat row-major raster index of each evaluated cell."""
+        return np.flatnonzero(self.mask)
+
+    def points(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(lat, lon) of the evaluated cells as 1-D arrays."""
+        return self.lat[self.mask], self.lon[self.mask]
+
+    def raster(self, values: np.ndarray, fill: float = np.nan) -> np.ndarray:
+        """Scatter per-cell ``values`` (last axis = evaluated cells) back onto the grid."""
+        values = np.asarray(values)
+        out = np.full(values.shape[:-1] + self.shape, fill, dtype=np.result_type(values, fill))
+        out.reshape(values.shape[:-1] + (-1,))[..., self.index] = values
+        return out
+
+
+# Spatial index layers and their bucket size; projection is centred on Delhi
+INDEX_LAYERS = ("stations", "users", "fires")
+INDEX_CELL_KM = float(os.getenv("SPATIAL_INDEX_CELL_KM", "2"))
+INDEX_REF_LAT = 28.6
+_KEY_OFFSET = 1 << 20
+_KEY_SPAN = 1 << 21
+_MAX_TABLE_BUCKETS = 1 << 22
+
+
+class SpatialIndex:
+    """In-memory proximity index over points, bucketed on a uniform km grid.
+
+    Points are projected once onto a local equirectangular plane (km) and bucketed
+    into ``cell_km`` squares. Buckets are held as a CSR layout (slots sorted by bucket
+    key), rebuilt lazily on the first query after inserts or removals, so queries for
+    many points at once run as whole-array operations over the buckets around each
+    query point. Ids are any hashable; inserting an existing id moves the point.
+    """
+
+    def __init__(self, cell_km: float = INDEX_CELL_KM, ref_lat: float = INDEX_REF_LAT, capacity: int = 256):
+        self.cell_km = cell_km
+        self._kx = KM_PER_DEGREE * math.cos(math.radians(ref_lat))
+        self._ids: List[Any] = []
+        self._slots: Dict[Any, int] = {}
+        self._x = np.empty(capacity)
+        self._y = np.empty(capacity)
+        self._stamp = np.empty(capacity)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._lock = threading.Lock()
+        self._dirty = True
+        self._sorted = np.empty(0, dtype=np.int64)
+        self._keys = np.empty(0, dtype=np.int64)
+        self._starts = np.empty(0, dtype=np.int64)
+        self._ends = np.empty(0, dtype=np.int64)
+        self._table: Optional[np.ndarray] = None
+        self._origin = (0, 0)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _project(self, lat: Any, lon: Any) -> Tuple[np.ndarray, np.ndarray]:
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        return lon * self._kx, lat * KM_PER_DEGREE
+
+    def _bucket_keys(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        bx = np.floor(x / self.cell_km).astype(np.int64) + _KEY_OFFSET
+        by = np.floor(y / self.cell_km).astype(np.int64) + _KEY_OFFSET
+        return by * _KEY_SPAN + bx
+
+    def _grow(self, needed: int) -> None:
+        capacity = max(needed, 2 * len(self._alive))
+        for name in ("_x", "_y", "_stamp", "_alive"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+
+    def insert(
+        self,
+        ids: Sequence[Any],
+        lat: Sequence[float],
+        lon: Sequence[float],
+        stamps: Optional[Sequence[float]] = None,
+    ) -> None:
+        """Add or move points; ``stamps`` (epoch seconds, default now) feed ``prune``."""
+        x, y = self._project(lat, lon)
+        stamp = np.full(len(ids), time.time()) if stamps is None else np.asarray(stamps, dtype=np.float64)
+        with self._lock:
+            slots = np.empty(len(ids), dtype=np.int64)
+            for i, key in enumerate(ids):
+                slot = self._slots.get(key)
+                if slot is None:
+                    slot = len(self._ids)
+                    self._ids.append(key)
+                    self._slots[key] = slot
+                slots[i] = slot
+            if len(self._ids) > len(self._alive):
+                self._grow(len(self._ids))
+            self._x[slots] = x
+            self._y[slots] = y
+            self._stamp[slots] = stamp
+            self._alive[slots] = True
+            self._dirty = True
+
+    def remove(self, ids: Iterable[Any]) -> int:
+        with self._lock:
+            removed = 0
+            for key in ids:
+                slot = self._slots.pop(key, None)
+                if slot is not None:
+                    self._alive[slot] = False
+                    removed += 1
+            if removed:
+                self._dirty = True
+                if len(self._ids) > 1024 and len(self._slots) < len(self._ids) // 2:
+                    self._compact()
+            return removed
+
+    def prune(self, older_than: float) -> int:
+        """Remove points stamped before ``older_than`` (epoch seconds)."""
+        n = len(self._ids)
+        stale = np.flatnonzero(self._alive[:n] & (self._stamp[:n] < older_than))
+        return self.remove([self._ids[s] for s in stale])
+
+    def _compact(self) -> None:
+        live = np.flatnonzero(self._alive[: len(self._ids)])
+        self._ids = [self._ids[s] for s in live]
+        self._slots = {key: i for i, key in enumerate(self._ids)}
+        for name in ("_x", "_y", "_stamp", "_alive"):
+            arr = getattr(self, name)
+            arr[: len(live)] = arr[live]
+            arr[len(live) :] = 0
+        self._alive[: len(live)] = True
+
+    def _rebuild(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            live = np.flatnonzero(self._alive[: len(self._ids)])
+            keys = self._bucket_keys(self._x[live], self._y[live])
+            order = np.argsort(keys, kind="stable")
+            self._sorted = live[order]
+            self._keys, self._starts = np.unique(keys[order], return_index=True)
+            self._ends = np.append(self._starts[1:], len(live))
+            # Dense bucket -> position table over the occupied extent, when it is small
+            self._table = None
+            if len(self._keys):
+                by, bx = np.divmod(self._keys, _KEY_SPAN)
+                self._origin = (int(by.min()), int(bx.min()))
+                shape = (int(by.max()) - self._origin[0] + 1, int(bx.max()) - self._origin[1] + 1)
+                if shape[0] * shape[1] <= _MAX_TABLE_BUCKETS:
+                    self._table = np.full(shape, -1, dtype=np.int64)
+                    self._table[by - self._origin[0], bx - self._origin[1]] = np.arange(len(self._keys))
+            self._dirty = False
+
+    def ids(self, slots: Iterable[int]) -> List[Any]:
+        return [self._ids[s] for s in slots]
+
+    def within_batch(
+        self, lat: Sequence[float], lon: Sequence[float], radius_km: float
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Points within ``radius_km`` of each query point, as CSR arrays.
+
+        Returns ``(offsets, slots, distances)``: the matches of query ``i`` are
+        ``slots[offsets[i]:offsets[i + 1]]`` (map with ``ids()``), unordered.
+        """
+        self._rebuild()
+        qx, qy = self._project(np.atleast_1d(lat), np.atleast_1d(lon))
+        m = len(qx)
+        reach = int(math.ceil(radius_km / self.cell_km))
+        if (2 * reach + 1) ** 2 >= len(self._keys):
+            q, slots = self._all_pairs(m)
+        else:
+            q, slots = self._bucket_pairs(qx, qy, reach)
+        dist = np.hypot(self._x[slots] - qx[q], self._y[slots] - qy[q])
+        keep = dist <= radius_km
+        q, slots, dist = q[keep], slots[keep], dist[keep]
+        offsets = np.zeros(m + 1, dtype=np.int64)
+        np.cumsum(np.bincount(q, minlength=m), out=offsets[1:])
+        return offsets, slots, dist
+
+    def _all_pairs(self, m: int) -> Tuple[np.ndarray, np.ndarray]:
+        # Radius spans (nearly) every occupied bucket: compare against all points
+        n = len(self._sorted)
+        return np.repeat(np.arange(m), n), np.tile(self._sorted, m)
+
+    def _bucket_pairs(self, qx: np.ndarray, qy: np.ndarray, reach: int) -> Tuple[np.ndarray, np.ndarray]:
+        # Candidates are gathered once per distinct query bucket (dense query sets such
+        # as grids put many points in each), then handed to every query in that bucket.
+        qb = self._bucket_keys(qx, qy)
+        ub, inverse = np.unique(qb, return_inverse=True)
+        steps = np.arange(-reach, reach + 1, dtype=np.int64)
+        if self._table is not None:
+            h, w = self._table.shape
+            by, bx = np.divmod(ub, _KEY_SPAN)
+            ny = (by - self._origin[0])[:, None, None] + steps[None, :, None]
+            nx = (bx - self._origin[1])[:, None, None] + steps[None, None, :]
+            ny, nx = np.broadcast_arrays(ny, nx)
+            ny, nx = ny.reshape(len(ub), -1), nx.reshape(len(ub), -1)
+            inside = (ny >= 0) & (ny < h) & (nx >= 0) & (nx < w)
+            pos = np.full(ny.shape, -1, dtype=np.int64)
+            pos[inside] = self._table[ny[inside], nx[inside]]
+            hit = pos >= 0
+        else:
+            around = (steps[:, None] * _KEY_SPAN + steps[None, :]).ravel()
+            wanted = ub[:, None] + around[None, :]
+            pos = np.searchsorted(self._keys, wanted)
+            pos[pos == len(self._keys)] = 0
+            hit = self._keys[pos] == wanted
+        bucket_owner = np.nonzero(hit)[0]
+        pos = pos[hit]
+        # Candidate positions per distinct query bucket (CSR)
+        counts = self._ends[pos] - self._starts[pos]
+        candidates = expand_ranges(self._starts[pos], counts)
+        per_bucket = np.bincount(bucket_owner, weights=counts, minlength=len(ub)).astype(np.int64)
+        bucket_start = np.cumsum(per_bucket) - per_bucket
+        # ... and per query
+        per_query = per_bucket[inverse]
+        picks = expand_ranges(bucket_start[inverse], per_query)
+        return np.repeat(np.arange(len(qx)), per_query), self._sorted[candidates[picks]]
+
+    def nearest_batch(
+        self, lat: Sequence[float], lon: Sequence[float], k: int = 1, max_km: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """The ``k`` nearest points to each query as (m, k) ``slots`` and ``distances``
+        arrays, nearest first; missing neighbours are slot -1 at distance inf."""
+        lat, lon = np.atleast_1d(lat), np.atleast_1d(lon)
+        m = len(lat)
+        slots = np.full((m, k), -1, dtype=np.int64)
+        dists = np.full((m, k), np.inf)
+        if m == 0 or len(self) == 0:
+            return slots, dists
+        self._rebuild()
+        qx, qy = self._project(lat, lon)
+        x, y = self._x[self._sorted], self._y[self._sorted]
+        # Beyond this every point is in range of every query
+        span = math.hypot(
+            max(x.max(), qx.max()) - min(x.min(), qx.min()),
+            max(y.max(), qy.max()) - min(y.min(), qy.min()),
+        )
+        limit = span if max_km is None else min(max_km, span)
+        pending = np.arange(m)
+        # Start from the radius expected to hold k points at the occupied-bucket density
+        density = len(self._sorted) / (len(self._keys) * self.cell_km**2)
+        radius = min(max(1.5 * math.sqrt(k / (math.pi * density)), self.cell_km / 2), limit)
+        while len(pending):
+            offsets, found, dist = self.within_batch(lat[pending], lon[pending], radius)
+            counts = np.diff(offsets)
+            done = (counts >= k) | (radius >= limit)
+            owner = np.repeat(np.arange(len(pending)), counts)
+            take = done[owner]
+            owner, found, dist = owner[take], found[take], dist[take]
+            # One sort by (owner, distance): distances scaled into [0, 0.5) per owner
+            order = np.argsort(owner + dist / (2 * limit + 1e-9))
+            owner, found, dist = owner[order], found[order], dist[order]
+            # Rank of each match within its (finished) query, nearest first
+            starts = np.zeros(len(pending) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(owner, minlength=len(pending)), out=starts[1:])
+            rank = np.arange(len(owner)) - starts[owner]
+            keep = rank < k
+            rows = pending[owner[keep]]
+            slots[rows, rank[keep]] = found[keep]
+            dists[rows, rank[keep]] = dist[keep]
+            pending = pending[~done]
+            radius = min(radius * 2, limit)
+        return slots, dists
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[Any, float]]:
+        """(id, distance_km) of the points within ``radius_km``, nearest first."""
+        offsets, slots, dist = self.within_batch([lat], [lon], radius_km)
+        order = np.argsort(dist)
+        return [(self._ids[s], float(d)) for s, d in zip(slots[order], dist[order])]
+
+    def nearest(self, lat: float, lon: float, k: int = 1, max_km: Optional[float] = None) -> List[Tuple[Any, float]]:
+        slots, dists = self.nearest_batch([lat], [lon], k, max_km)
+        return [(self._ids[s], float(d)) for s, d in zip(slots[0], dists[0]) if s >= 0 and d <= (max_km or np.inf)]
+
+
+def expand_ranges(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Concatenate ``arange(start, start + count)`` for every (start, count) pair."""
+    total = int(counts.sum())
+    return np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+
+
+_indexes: Dict[str, SpatialIndex] = {}
+
+
+def get_spatial_index(layer: str) -> SpatialIndex:
+    """Process-wide index for one of ``INDEX_LAYERS`` (stations, users, fires)."""
+    if layer not in INDEX_LAYERS:
+        raise ValueError(f"Unknown spatial index layer: {layer}")
+    if layer not in _indexes:
+        _indexes[layer] = SpatialIndex()
+    return _indexes[layer]
+
+
+# Spacing of densified route points and the sideways offset of placeholder detours
+ROUTE_SPACING_KM = float(os.getenv("ROUTE_SPACING_KM", "0.1"))
+DETOUR_OFFSET = 0.15
+
+
+@dataclass
+class RouteBatch:
+    """Densified polylines, concatenated: route ``i`` is ``slice(offsets[i], offsets[i + 1])``.
+
+    ``dist_km`` is the along-route distance of each point from its route's start.
+    """
+
+    offsets: np.ndarray
+    lat: np.ndarray
+    lon: np.ndarray
+    dist_km: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def route_ids(self) -> np.ndarray:
+        return np.repeat(np.arange(len(self)), np.diff(self.offsets))
+
+    @property
+    def lengths_km(self) -> np.ndarray:
+        return self.dist_km[self.offsets[1:] - 1]
+
+    def points(self, i: int) -> List[Dict[str, float]]:
+        part = slice(self.offsets[i], self.offsets[i + 1])
+        return [{"lat": float(a), "lon": float(b)} for a, b in zip(self.lat[part], self.lon[part])]
+
+
+def densify_routes(
+    routes: Sequence[Tuple[Sequence[float], Sequence[float]]], spacing_km: float = ROUTE_SPACING_KM
+) -> RouteBatch:
+    """Resample polylines given as (lats, lons) so no two points are more than
+    ``spacing_km`` apart. Every original vertex is kept; all routes are processed in
+    one pass over their concatenated segments."""
+    counts = np.array([len(r[0]) for r in routes], dtype=np.int64)
+    vlat = np.concatenate([np.asarray(r[0], dtype=np.float64) for r in routes])
+    vlon = np.concatenate([np.asarray(r[1], dtype=np.float64) for r in routes])
+    vroute = np.repeat(np.arange(len(routes)), counts)
+
+    a = np.flatnonzero(vroute[:-1] == vroute[1:])
+    b = a + 1
+    kx = KM_PER_DEGREE * np.cos(np.radians((vlat[a] + vlat[b]) / 2))
+    seg_km = np.hypot((vlon[b] - vlon[a]) * kx, (vlat[b] - vlat[a]) * KM_PER_DEGREE)
+    steps = np.maximum(np.ceil(seg_km / spacing_km), 1).astype(np.int64)
+    # Along-route distance at each segment start
+    seg_route = vroute[a]
+    seg_start = np.cumsum(seg_km) - seg_km
+    first_seg = np.searchsorted(seg_route, np.arange(len(routes)))
+    seg_start -= seg_start[first_seg[seg_route]]
+
+    # Segment points: start vertex plus steps - 1 interior points, end exclusive
+    seg = np.repeat(np.arange(len(a)), steps)
+    frac = (np.arange(len(seg)) - np.repeat(np.cumsum(steps) - steps, steps)) / steps[seg]
+    lat = vlat[a][seg] + frac * (vlat[b] - vlat[a])[seg]
+    lon = vlon[a][seg] + frac * (vlon[b] - vlon[a])[seg]
+    dist = seg_start[seg] + frac * seg_km[seg]
+
+    # Each route's last vertex closes it
+    last = np.cumsum(counts) - 1
+    totals = np.bincount(seg_route, weights=seg_km, minlength=len(routes))
+    route = np.concatenate([seg_route[seg], np.arange(len(routes))])
+    order = np.argsort(route, kind="stable")
+    return RouteBatch(
+        offsets=np.concatenate([[0], np.cumsum(np.bincount(route, minlength=len(routes)))]),
+        lat=np.concatenate([lat, vlat[last]])[order],
+        lon=np.concatenate([lon, vlon[last]])[order],
+        dist_km=np.concatenate([dist, totals])[order],
+    )
 
 
 class SpatialService:
@@ -12,22 +606,34 @@ class SpatialService:
         center_lon: float,
         radius_km: float,
         resolution_km: float,
-    ) -> List[List[Dict[str, float]]]:
-        # Simplified grid generator (not accounting for earth curvature for brevity)
-        steps = int((radius_km * 2) / resolution_km) + 1
-        grid = []
-        # Approx 1 degree latitude ~ 111 km, longitude varies by latitude (use ~111 km here)
-        delta_deg = resolution_km / 111.0
-        start_lat = center_lat - (steps // 2) * delta_deg
-        start_lon = center_lon - (steps // 2) * delta_deg
-        for i in range(steps):
-            row = []
-            for j in range(steps):
-                row.append(
-                    {"lat": start_lat + i * delta_deg, "lon": start_lon + j * delta_deg}
-                )
-            grid.append(row)
-        return grid
+        clip: bool = False,
+    ) -> SpatialGrid:
+        """Square grid of ``resolution_km`` cells covering ``radius_km`` around the centre.
+
+        Longitude spacing is scaled by cos(latitude) so cells are square on the ground
+        (at Delhi a degree of longitude is ~98 km, not 111). With ``clip`` only cells
+        whose centre lies within ``radius_km`` are evaluated.
+        """
+        half = int(radius_km / resolution_km)
+        offsets = np.arange(-half, half + 1, dtype=np.float64) * resolution_km
+        dlat = offsets / KM_PER_DEGREE
+        dlon = offsets / (KM_PER_DEGREE * max(math.cos(math.radians(center_lat)), 1e-6))
+        lat, lon = np.meshgrid(center_lat + dlat, center_lon + dlon, indexing="ij")
+        if clip:
+            # Offsets are ground distances on the grid's local projection
+            mask = np.hypot.outer(offsets, offsets) <= radius_km + 1e-9
+        else:
+            mask = np.ones(lat.shape, dtype=bool)
+        return SpatialGrid(
+            center_lat=center_lat,
+            center_lon=center_lon,
+            radius_km=radius_km,
+            resolution_km=resolution_km,
+            lat=lat,
+            lon=lon,
+            mask=mask,
+            cell_ids=grid_cell_ids(lat, lon),
+        )
 
     async def get_route_points(
         self,
@@ -36,10 +642,32 @@ class SpatialService:
         end_lat: float,
         end_lon: float,
         mode: str,
-    ):
-        # Placeholder: would call a routing API (Google Maps) and sample points
-        return [
-            {"lat": start_lat, "lon": start_lon},
-            {"lat": (start_lat + end_lat) / 2, "lon": (start_lon + end_lon) / 2},
-            {"lat": end_lat, "lon": end_lon},
+    ) -> List[Dict[str, float]]:
+        # Placeholder: would call a routing API (Google Maps); the straight line,
+        # densified to ROUTE_SPACING_KM
+        batch = densify_routes([([start_lat, end_lat], [start_lon, end_lon])])
+        return batch.points(0)
+
+    async def get_alternative_routes(
+        self,
+        start_lat: float,
+        start_lon: float,
+        end_lat: float,
+        end_lon: float,
+        mode: str,
+    ) -> List[List[Dict[str, float]]]:
+        # Placeholder: detours through a midpoint offset sideways by DETOUR_OFFSET of
+        # the trip length on either side, densified like get_route_points
+        mid_lat, mid_lon = (start_lat + end_lat) / 2, (start_lon + end_lon) / 2
+        coslat = max(math.cos(math.radians(mid_lat)), 1e-6)
+        # Perpendicular in the local plane: (dy, dx) -> (dx, -dy), back to degrees
+        dy, dx = end_lat - start_lat, (end_lon - start_lon) * coslat
+        routes = [
+            (
+                [start_lat, mid_lat + side * DETOUR_OFFSET * dx, end_lat],
+                [start_lon, mid_lon - side * DETOUR_OFFSET * dy / coslat, end_lon],
+            )
+            for side in (1, -1)
         ]
+        batch = densify_routes(routes)
+        return [batch.points(i) for i in range(len(batch))]
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.database import LatestReading
+from app.services.query_catalog import CATALOG
+
+# Columns copied from core.aqi_readings into core.latest_readings
+LATEST_COLUMNS = tuple(
+    c.name for c in LatestReading.__table__.columns if c.name not in ("reading_id", "updated_at")
+)
+
+# ``keys`` yields (station_id, ts) pairs; the matching rows are read back from the
+# hypertable (primary key lookups) so partial batches never leave a half-updated
+# latest row. Older readings never replace newer ones (late or backfilled batches).
+LATEST_UPSERT = """
+INSERT INTO core.latest_readings (reading_id, {cols}, updated_at)
+SELECT r.id, {r_cols}, now()
+FROM core.aqi_readings r
+JOIN ({keys}) k ON r.station_id = k.station_id AND r."timestamp" = k.ts
+ON CONFLICT (station_id) DO UPDATE SET reading_id = EXCLUDED.reading_id, {updates}, updated_at = now()
+WHERE core.latest_readings."timestamp" <= EXCLUDED."timestamp"
+"""
+
+# Keys for an explicit list of stations: each station's newest stored reading
+STATION_KEYS_SQL = (
+    'SELECT s.station_id, (SELECT max(a."timestamp") FROM core.aqi_readings a '
+    "WHERE a.station_id = s.station_id) AS ts "
+    "FROM unnest(CAST(:station_ids AS text[])) AS s(station_id)"
+)
+
+
+def _latest_upsert(keys_sql: str) -> str:
+    quoted = [f'"{c}"' for c in LATEST_COLUMNS]
+    return LATEST_UPSERT.format(
+        cols=", ".join(quoted),
+        r_cols=", ".join(f"r.{c}" for c in quoted),
+        keys=keys_sql,
+        updates=", ".join(f"{c} = EXCLUDED.{c}" for c in quoted if c != '"station_id"'),
+    )
+
+
+async def refresh_latest_readings(conn: AsyncConnection, keys_sql: str, **params: Any) -> int:
+    """Upsert core.latest_readings for the (station_id, ts) pairs selected by ``keys_sql``.
+
+    Runs on the caller's connection, i.e. inside the transaction that wrote the
+    readings, so the latest table commits (or rolls back) with them.
+    """
+    result = await conn.execute(text(_latest_upsert(keys_sql)), params)
+    return result.rowcount
+
+
+def _utc_iso(ts: datetime) -> str:
+    # TIMESTAMPTZ columns come back aware; naive values are already UTC
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc)
+    return ts.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _reading_dict(row: Any) -> Dict[str, Any]:
+    reading = {c: getattr(row, c) for c in LATEST_COLUMNS}
+    reading["timestamp"] = _utc_iso(row.timestamp)
+    return reading
+
+
+class StationService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_latest(self, station_id: str) -> Optional[Dict[str, Any]]:
+        """Latest reading for one station (primary key lookup)."""
+        row = await CATALOG.fetchrow(self.db, "latest_reading_by_station", station_id=station_id)
+        if row is None:
+            return None
+        reading = {c: row[c] for c in LATEST_COLUMNS}
+        reading["timestamp"] = _utc_iso(row["timestamp"])
+        return reading
+
+    async def get_latest_readings(
+        self,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        max_age_hours: Optional[float] = None,
+        now: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Latest reading of every station, optionally within ``(min_lat, max_lat,
+        min_lon, max_lon)`` and no older than ``max_age_hours``. Reads one row per
+        station, independent of how much history core.aqi_readings holds."""
+        query = select(LatestReading).order_by(LatestReading.station_id)
+        if bbox is not None:
+            min_lat, max_lat, min_lon, max_lon = bbox
+            query = query.where(
+                LatestReading.latitude.between(min_lat, max_lat),
+                LatestReading.longitude.between(min_lon, max_lon),
+            )
+        if max_age_hours is not None:
+            cutoff = (now or datetime.utcnow()) - timedelta(hours=max_age_hours)
+            query = query.where(LatestReading.timestamp >= cutoff)
+        rows = (await self.db.execute(query)).scalars().all()
+        return [_reading_dict(r) for r in rows]
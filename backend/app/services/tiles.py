@@ -0,0 +1,144 @@
+"""AQI heatmap map tiles (XYZ / slippy-map scheme, Web Mercator).
+
+A tile is TILE_SIZE x TILE_SIZE pixels. Pixel centres are projected back to lat/lon
+(longitude per column, latitude per row) and the hourly forecast raster
+(``SpaceTimeGrid``) is sampled bilinearly there, then coloured on the CPCB AQI scale:
+category colours at the category midpoints, blended in between, with TILE_ALPHA
+opacity. Pixels outside the raster are transparent, and tiles wholly outside it skip
+sampling. PNGs are 8-bit RGBA written with zlib directly (row filter "Sub", which
+suits smooth gradients), so no imaging library is needed.
+
+Rendered tiles are cached process-wide per (z, x, y, forecast hour, model version)
+with a strong ETag (hash of the PNG). The forecast hour is the absolute valid hour and
+the version names the forecast run, so a new run never serves stale tiles.
+
+Environment variables:
+  TILE_CACHE_SIZE=4096   -> Rendered tiles kept (oldest evicted first)
+  TILE_ALPHA=180         -> Heatmap opacity, 0-255
+"""
+
+import hashlib
+import os
+import struct
+import zlib
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from app.services.route_exposure import SpaceTimeGrid
+
+TILE_SIZE = 256
+MAX_ZOOM = 18
+TILE_CACHE_SIZE = int(os.getenv("TILE_CACHE_SIZE", "4096"))
+TILE_ALPHA = int(os.getenv("TILE_ALPHA", "180"))
+
+# CPCB category colours (Good, Satisfactory, Moderate, Poor, Very Poor, Severe) placed
+# at the middle of each category's AQI band
+_STOPS = np.array([25, 75, 150, 250, 350, 450], dtype=np.float64)
+_COLOURS = np.array(
+    [
+        (0, 176, 80),
+        (146, 208, 80),
+        (255, 255, 0),
+        (255, 153, 0),
+        (255, 0, 0),
+        (192, 0, 0),
+    ],
+    dtype=np.float64,
+)
+# Colour per integer AQI 0..500
+_LUT = np.stack(
+    [np.interp(np.arange(501), _STOPS, _COLOURS[:, c]) for c in range(3)], axis=-1
+).round().astype(np.uint8)
+
+_tiles: Dict[Any, "Tile"] = {}
+
+
+@dataclass
+class Tile:
+    png: bytes
+    etag: str
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """(min_lat, min_lon, max_lat, max_lon) of an XYZ tile."""
+    lat = _mercator_lat(np.array([y + 1, y], dtype=np.float64) / (1 << z))
+    lon = np.array([x, x + 1], dtype=np.float64) / (1 << z) * 360.0 - 180.0
+    return float(lat[0]), float(lon[0]), float(lat[1]), float(lon[1])
+
+
+def pixel_coordinates(z: int, x: int, y: int, size: int = TILE_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """Latitude of each pixel row (north first) and longitude of each pixel column."""
+    steps = (np.arange(size) + 0.5) / size
+    n = float(1 << z)
+    return _mercator_lat((y + steps) / n), (x + steps) / n * 360.0 - 180.0
+
+
+def _mercator_lat(v: np.ndarray) -> np.ndarray:
+    # v: 0 at the north edge of the map, 1 at the south edge
+    return np.degrees(np.arctan(np.sinh(np.pi * (1.0 - 2.0 * v))))
+
+
+def aqi_colours(aqi: np.ndarray) -> np.ndarray:
+    """(..., 4) RGBA pixels for AQI values; NaN is transparent."""
+    aqi = np.asarray(aqi, dtype=np.float64)
+    valid = ~np.isnan(aqi)
+    rgba = np.zeros(aqi.shape + (4,), dtype=np.uint8)
+    rgba[..., :3] = _LUT[np.clip(np.where(valid, aqi, 0), 0, 500).round().astype(np.int64)]
+    rgba[..., 3] = np.where(valid, TILE_ALPHA, 0)
+    return rgba
+
+
+def encode_png(rgba: np.ndarray, level: int = 6) -> bytes:
+    """PNG bytes of an (h, w, 4) uint8 image."""
+    h, w, _ = rgba.shape
+    rows = rgba.reshape(h, w * 4)
+    # Filter type 1 (Sub): each byte minus the same channel of the pixel to its left
+    filtered = np.empty((h, w * 4 + 1), dtype=np.uint8)
+    filtered[:, 0] = 1
+    filtered[:, 1:5] = rows[:, :4]
+    np.subtract(rows[:, 4:], rows[:, :-4], out=filtered[:, 5:])
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    return b"".join(
+        [
+            b"\x89PNG\r\n\x1a\n",
+            chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 6, 0, 0, 0)),
+            chunk(b"IDAT", zlib.compress(filtered.tobytes(), level)),
+            chunk(b"IEND", b""),
+        ]
+    )
+
+
+def render_tile(field: SpaceTimeGrid, hour: int, z: int, x: int, y: int) -> np.ndarray:
+    """(TILE_SIZE, TILE_SIZE, 4) RGBA heatmap of ``field`` row ``hour`` over a tile."""
+    depth, rows, cols = field.values.shape
+    south, north = field.lat0, field.lat0 + (rows - 1) * field.dlat
+    west, east = field.lon0, field.lon0 + (cols - 1) * field.dlon
+    min_lat, min_lon, max_lat, max_lon = tile_bounds(z, x, y)
+    if min_lat > north or max_lat < south or min_lon > east or max_lon < west:
+        return np.zeros((TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8)
+
+    lat, lon = pixel_coordinates(z, x, y)
+    inside = ((lat >= south) & (lat <= north))[:, None] & ((lon >= west) & (lon <= east))[None, :]
+    plat, plon = np.broadcast_arrays(lat[:, None], lon[None, :])
+    hours = np.full(plat.shape, float(min(hour, depth - 1)))
+    aqi = np.where(inside, field.sample(plat, plon, hours), np.nan)
+    return aqi_colours(aqi)
+
+
+def get_tile(field: SpaceTimeGrid, version: str, hour: int, z: int, x: int, y: int) -> Tile:
+    """Cached PNG tile for row ``hour`` of ``field`` (forecast run ``version``)."""
+    key = (z, x, y, field.start + timedelta(hours=hour), version)
+    tile = _tiles.get(key)
+    if tile is None:
+        png = encode_png(render_tile(field, hour, z, x, y))
+        tile = Tile(png=png, etag='"%s"' % hashlib.blake2b(png, digest_size=12).hexdigest())
+        if len(_tiles) >= TILE_CACHE_SIZE:
+            _tiles.pop(next(iter(_tiles)))
+        _tiles[key] = tile
+    return tile
@@ -1,6 +1,10 @@
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any
 
+from app.database import User
+from app.services.spatial_service import SpatialIndex
+
 
 class UserService:
     def __init__(self, db: AsyncSession):
@@ -17,3 +21,27 @@ class UserService:
 
     async def get_user_with_locations(self, user_id: str, days: int) -> Dict[str, Any]:
         return {"user": await self.get_user_profile(user_id), "locations": []}
+
+    async def index_locations(self, index: SpatialIndex) -> int:
+        """Load active users' home and work points into ``index`` as
+        ``(user_id, "home" | "work")``; returns the number of points indexed."""
+        rows = (
+            await self.db.execute(
+                select(
+                    User.id,
+                    User.home_latitude,
+                    User.home_longitude,
+                    User.work_latitude,
+                    User.work_longitude,
+                ).where(User.is_active.is_(True))
+            )
+        ).all()
+        ids, lats, lons = [], [], []
+        for user_id, home_lat, home_lon, work_lat, work_lon in rows:
+            for kind, lat, lon in (("home", home_lat, home_lon), ("work", work_lat, work_lon)):
+                if lat is not None and lon is not None:
+                    ids.append((str(user_id), kind))
+                    lats.append(lat)
+                    lons.append(lon)
+        index.insert(ids, lats, lons)
+        return len(ids)
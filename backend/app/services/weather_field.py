@@ -0,0 +1,152 @@
+"""Hourly weather on forecast grids, interpolated from a sparse set of fetched nodes.
+
+The weather source fetches the Open-Meteo hourly forecast for a lattice of nodes
+around Delhi in one request (``weather_nodes``), and each ingestion cycle replaces the
+process-wide ``WeatherField``. Open-Meteo snaps every node to its model grid, so the
+nodes are treated as scattered points: values reach a point by inverse distance
+weighting over its WEATHER_IDW_K nearest nodes (``Interpolator``). The (points, k)
+weights are computed once per point set, then every variable and hour is one
+gather-multiply-sum over a (variables x hours, points, k) block.
+
+Wind direction is circular. It is taken from the interpolated (u, v) components (a
+speed-weighted circular mean, so 350 and 10 degrees give north, not south), while wind
+speed is interpolated as a scalar so that opposing winds do not cancel into a calm.
+
+Values keep Open-Meteo's units (deg C, %, km/h, degrees, hPa), as the model was
+trained on them. Interpolated fields are cached on the field per point set, i.e. per
+ingestion cycle.
+
+Environment variables:
+  WEATHER_NODE_RADIUS_KM=75     -> Half-width of the node lattice around Delhi
+  WEATHER_NODE_SPACING_KM=25    -> Node spacing
+  WEATHER_IDW_K=4               -> Nodes per interpolated point
+  WEATHER_GRID_CACHE_SIZE=8     -> Interpolated point sets kept per cycle
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.dispersion import wind_components, wind_from_components
+from app.services.interpolation import Interpolator
+from app.services.spatial_service import KM_PER_DEGREE
+
+NODE_CENTER = (28.6139, 77.2090)
+NODE_RADIUS_KM = float(os.getenv("WEATHER_NODE_RADIUS_KM", "75"))
+NODE_SPACING_KM = float(os.getenv("WEATHER_NODE_SPACING_KM", "25"))
+IDW_K = int(os.getenv("WEATHER_IDW_K", "4"))
+GRID_CACHE_SIZE = int(os.getenv("WEATHER_GRID_CACHE_SIZE", "8"))
+
+# Model feature -> Open-Meteo hourly variable
+VARIABLES = {
+    "temp": "temperature_2m",
+    "humidity": "relative_humidity_2m",
+    "wind_speed": "wind_speed_10m",
+    "wind_dir": "wind_direction_10m",
+    "pressure": "surface_pressure",
+}
+# Used where no node has a value (and before the first ingestion cycle)
+DEFAULTS = {"temp": 25.0, "humidity": 40.0, "wind_speed": 2.5, "wind_dir": 90.0, "pressure": 1008.0}
+
+
+def weather_nodes() -> Tuple[np.ndarray, np.ndarray]:
+    """Lattice of nodes to fetch: NODE_SPACING_KM apart, NODE_RADIUS_KM around Delhi."""
+    steps = np.arange(-NODE_RADIUS_KM, NODE_RADIUS_KM + 1e-9, NODE_SPACING_KM)
+    coslat = np.cos(np.radians(NODE_CENTER[0]))
+    lat = NODE_CENTER[0] + steps / KM_PER_DEGREE
+    lon = NODE_CENTER[1] + steps / (KM_PER_DEGREE * coslat)
+    lat, lon = np.meshgrid(np.round(lat, 4), np.round(lon, 4), indexing="ij")
+    return lat.ravel(), lon.ravel()
+
+
+@dataclass
+class WeatherField:
+    """Hourly weather at nodes: ``values[name]`` is (hours, nodes), NaN where missing,
+    hour ``h`` at ``start + h`` hours (UTC)."""
+
+    lat: np.ndarray
+    lon: np.ndarray
+    start: datetime
+    values: Dict[str, np.ndarray]
+    _grids: Dict[bytes, Dict[str, np.ndarray]] = field(default_factory=dict, init=False, repr=False)
+
+    @classmethod
+    def from_open_meteo(cls, payload: Any) -> "WeatherField":
+        """From an Open-Meteo forecast response: one object, or a list of them for a
+        multi-location request (which share one time axis)."""
+        points: List[Dict[str, Any]] = payload if isinstance(payload, list) else [payload]
+        times = points[0]["hourly"]["time"]
+        values = {}
+        for name, key in VARIABLES.items():
+            # None (missing hours) becomes NaN
+            series = [p["hourly"].get(key) or [None] * len(times) for p in points]
+            values[name] = np.array(series, dtype=np.float64).T
+        return cls(
+            lat=np.array([p["latitude"] for p in points], dtype=np.float64),
+            lon=np.array([p["longitude"] for p in points], dtype=np.float64),
+            start=datetime.fromisoformat(times[0]),
+            values=values,
+        )
+
+    @property
+    def hours(self) -> int:
+        return len(next(iter(self.values.values())))
+
+    def interpolate(self, lat: np.ndarray, lon: np.ndarray) -> Dict[str, np.ndarray]:
+        """Every variable and hour on the points: (hours, points) float32 per variable."""
+        lat = np.ascontiguousarray(lat, dtype=np.float64)
+        lon = np.ascontiguousarray(lon, dtype=np.float64)
+        key = hashlib.blake2b(lat.tobytes() + lon.tobytes(), digest_size=16).digest()
+        cached = self._grids.get(key)
+        if cached is not None:
+            return cached
+
+        u, v = wind_components(self.values["wind_speed"], self.values["wind_dir"])
+        names = ["temp", "humidity", "wind_speed", "pressure"]
+        stacked = np.concatenate([self.values[n] for n in names] + [u, v])
+        surface = Interpolator(self.lat, self.lon, method="idw", k=IDW_K).interpolate(stacked, lat, lon)
+        surface = surface.reshape(len(names) + 2, self.hours, lat.size)
+        out = {n: surface[i].astype(np.float32) for i, n in enumerate(names)}
+        out["wind_dir"] = wind_from_components(surface[-2], surface[-1])[1].astype(np.float32)
+        for name, default in DEFAULTS.items():
+            out[name][np.isnan(out[name])] = default
+
+        # Single points (current / hourly forecasts) are cheap and would only evict grids
+        if lat.size > 1:
+            if len(self._grids) >= GRID_CACHE_SIZE:
+                self._grids.pop(next(iter(self._grids)))
+            self._grids[key] = out
+        return out
+
+    def at(self, lat: np.ndarray, lon: np.ndarray, times: Sequence[datetime]) -> Dict[str, np.ndarray]:
+        """(len(times), points) per variable, each time taking its nearest fetched hour
+        (clamped to the fetched range)."""
+        offsets = np.array([(t - self.start) / timedelta(hours=1) for t in times])
+        rows = np.clip(np.round(offsets).astype(np.int64), 0, self.hours - 1)
+        return {name: grid[rows] for name, grid in self.interpolate(lat, lon).items()}
+
+
+_field: Optional[WeatherField] = None
+
+
+def get_weather_field() -> Optional[WeatherField]:
+    """Field of the latest weather ingestion cycle (None before the first)."""
+    return _field
+
+
+def set_weather_field(weather: Optional[WeatherField]) -> None:
+    global _field
+    _field = weather
+
+
+def point_weather(lat: np.ndarray, lon: np.ndarray, times: Sequence[datetime]) -> Dict[str, Any]:
+    """Model weather features for points at times: (len(times), points) arrays from the
+    current field, or the scalar DEFAULTS before the first ingestion cycle."""
+    weather = get_weather_field()
+    if weather is None:
+        return dict(DEFAULTS)
+    return weather.at(lat, lon, times)
@@ -0,0 +1,106 @@
+"""Station-to-grid interpolation throughput: IDW vs ordinary kriging.
+
+    python benchmarks/bench_interpolation.py                       # 40 stations, ~40k cells, 72 h
+    python benchmarks/bench_interpolation.py --stations 120 --neighbours 12 --json
+
+Stations are scattered around Delhi and sample a smooth synthetic AQI field plus
+noise; the grid is the unclipped /forecast/surface grid for --radius-km and
+--resolution-km. Reports wall time per method (best of --repeat, weights rebuilt every
+run) and RMSE against the noise-free field on the inner part of the grid, away from
+the edge where both methods extrapolate.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.services.interpolation import METHODS, Interpolator, fit_variogram  # noqa: E402
+from app.services.spatial_service import SpatialService  # noqa: E402
+
+CENTER_LAT, CENTER_LON = 28.6139, 77.2090
+
+
+def _field(lat: np.ndarray, lon: np.ndarray, hour: int) -> np.ndarray:
+    return (
+        150
+        + 60 * np.sin((lat - CENTER_LAT) * 20 + hour / 10)
+        + 40 * np.cos((lon - CENTER_LON) * 15 - hour / 17)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", type=int, default=40)
+    parser.add_argument("--hours", type=int, default=72)
+    parser.add_argument("--radius-km", type=float, default=28.0)
+    parser.add_argument("--resolution-km", type=float, default=0.28)
+    parser.add_argument("--neighbours", type=int, default=8)
+    parser.add_argument("--missing-rate", type=float, default=0.0, help="Share of station-hours dropped")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    half_lat = 0.9 * args.radius_km / 111.32
+    half_lon = half_lat / np.cos(np.radians(CENTER_LAT))
+    slat = CENTER_LAT + rng.uniform(-half_lat, half_lat, args.stations)
+    slon = CENTER_LON + rng.uniform(-half_lon, half_lon, args.stations)
+    values = np.stack([_field(slat, slon, h) for h in range(args.hours)])
+    values += rng.normal(0, 5, values.shape)
+    values[rng.random(values.shape) < args.missing_rate] = np.nan
+
+    grid = SpatialService(None).generate_grid(CENTER_LAT, CENTER_LON, args.radius_km, args.resolution_km)
+    lat, lon = grid.points()
+    truth = np.stack([_field(lat, lon, h) for h in range(args.hours)])
+    inner = (np.abs(lat - CENTER_LAT) < 0.7 * half_lat) & (np.abs(lon - CENTER_LON) < 0.7 * half_lon)
+
+    started = time.perf_counter()
+    variogram = fit_variogram(slat, slon, values)
+    fit_seconds = time.perf_counter() - started
+
+    result = {
+        "stations": args.stations,
+        "cells": int(lat.size),
+        "hours": args.hours,
+        "neighbours": args.neighbours,
+        "variogram": {
+            "nugget": round(variogram.nugget, 2),
+            "psill": round(variogram.psill, 2),
+            "range_km": round(variogram.range_km, 2),
+            "fit_ms": round(fit_seconds * 1000, 1),
+        },
+    }
+    for method in METHODS:
+        timings = []
+        for _ in range(args.repeat):
+            interpolator = Interpolator(slat, slon, method=method, k=args.neighbours, variogram=variogram)
+            started = time.perf_counter()
+            surface = interpolator.interpolate(values, lat, lon)
+            timings.append(time.perf_counter() - started)
+        error = surface[:, inner] - truth[:, inner]
+        result[method] = {
+            "seconds": round(min(timings), 3),
+            "cell_hours_per_second": int(lat.size * args.hours / min(timings)),
+            "rmse": round(float(np.sqrt(np.nanmean(error**2))), 2),
+        }
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(
+        f"{result['stations']} stations -> {result['cells']} cells x {result['hours']} h, "
+        f"k={result['neighbours']}; variogram fit {result['variogram']['fit_ms']} ms"
+    )
+    for method in METHODS:
+        r = result[method]
+        print(f"  {method:8s} {r['seconds']:7.3f} s  {r['cell_hours_per_second']:>12,d} cell-h/s  rmse {r['rmse']}")
+
+
+if __name__ == "__main__":
+    main()
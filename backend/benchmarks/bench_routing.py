@@ -0,0 +1,137 @@
+"""Pollution-weighted route search latency on an NCR-sized road graph.
+
+    python benchmarks/bench_routing.py                          # synthetic 60 x 60 km street grid
+    python benchmarks/bench_routing.py --graph delhi.osm.npz --queries 50 --json
+
+Without --graph the network is a jittered street grid at --spacing-m (arterials every
+tenth street, residential streets randomly broken), roughly the node density of
+central Delhi. Random origin/destination pairs --min-km to --max-km apart are routed
+at exposure weights 0 (fastest) and each PRIORITY_WEIGHTS value over a smooth hourly
+AQI raster; reported are per-query latency percentiles and nodes expanded. The
+graph's cached edge -> cell map and mode costs are built before timing.
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.services.road_graph import RoadGraph, build_graph, parse_osm  # noqa: E402
+from app.services.route_exposure import SpaceTimeGrid  # noqa: E402
+from app.services.routing import PRIORITY_WEIGHTS, cell_weights, shortest_path  # noqa: E402
+from app.services.spatial_service import KM_PER_DEGREE, SpatialService  # noqa: E402
+
+CENTER_LAT, CENTER_LON = 28.6139, 77.2090
+
+
+def street_grid(side_km: float, spacing_m: float, rng: np.random.Generator) -> RoadGraph:
+    n = int(side_km * 1000 / spacing_m)
+    d = spacing_m / 1000 / KM_PER_DEGREE
+    steps = np.arange(n) - n / 2
+    lat = CENTER_LAT + steps[:, None] * d + rng.normal(0, 0.15 * d, (n, n))
+    lon = CENTER_LON + steps[None, :] * d / np.cos(np.radians(CENTER_LAT)) + rng.normal(0, 0.15 * d, (n, n))
+    idx = np.arange(n * n).reshape(n, n)
+    ways = []
+    for lines in (idx, idx.T):
+        for i, line in enumerate(lines):
+            if i % 10 == 0:
+                ways.append((line, "primary", "no"))
+                continue
+            for piece in np.split(line, np.flatnonzero(rng.random(n - 1) < 0.05) + 1):
+                ways.append((piece, "residential", "no"))
+    return build_graph(lat.ravel(), lon.ravel(), ways)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--graph", help="OSM extract or compiled .npz (default: synthetic grid)")
+    parser.add_argument("--side-km", type=float, default=60.0)
+    parser.add_argument("--spacing-m", type=float, default=120.0)
+    parser.add_argument("--mode", default="walking", choices=("walking", "cycling", "driving"))
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--min-km", type=float, default=3.0)
+    parser.add_argument("--max-km", type=float, default=15.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    started = time.perf_counter()
+    if args.graph:
+        graph = RoadGraph.load(args.graph) if args.graph.endswith(".npz") else parse_osm(args.graph)
+    else:
+        graph = street_grid(args.side_km, args.spacing_m, rng)
+    load_seconds = time.perf_counter() - started
+
+    grid = SpatialService(None).generate_grid(
+        float(graph.lat.mean()), float(graph.lon.mean()), args.side_km / 2 + 5, 1.0
+    )
+    lat, lon = grid.points()
+    values = np.stack(
+        [
+            180 + 60 * np.sin((lat - CENTER_LAT) * 25 + h / 4) + 40 * np.cos((lon - CENTER_LON) * 18 - h / 6)
+            for h in range(12)
+        ]
+    )
+    field = SpaceTimeGrid.from_grid(grid, datetime(2025, 11, 1), values)
+    costs = graph.mode_costs(args.mode)
+    cells = graph.edge_cells(field.lat0, field.lon0, field.dlat, field.dlon, *field.values.shape[1:])
+
+    # Origin/destination pairs at the requested straight-line distances
+    pairs = []
+    while len(pairs) < args.queries:
+        a, b = rng.integers(graph.nodes, size=2)
+        km = np.hypot(
+            (graph.lat[a] - graph.lat[b]) * KM_PER_DEGREE,
+            (graph.lon[a] - graph.lon[b]) * KM_PER_DEGREE * np.cos(np.radians(graph.lat[a])),
+        )
+        if args.min_km <= km <= args.max_km:
+            pairs.append((int(a), int(b)))
+
+    result = {
+        "nodes": graph.nodes,
+        "edges": graph.edges,
+        "load_seconds": round(load_seconds, 2),
+        "mode": args.mode,
+        "queries": args.queries,
+        "weights": {},
+    }
+    for name, weight in (("fastest", 0.0), *PRIORITY_WEIGHTS.items()):
+        weights = cell_weights(field, weight)
+        ms, expanded, found = [], [], 0
+        for a, b in pairs:
+            started = time.perf_counter()
+            path = shortest_path(graph, a, b, costs, cells, weights, start_hour=1.0)
+            ms.append((time.perf_counter() - started) * 1000)
+            if path is not None:
+                found += 1
+                expanded.append(path.expanded)
+        result["weights"][name] = {
+            "weight": weight,
+            "found": found,
+            "p50_ms": round(float(np.percentile(ms, 50)), 1),
+            "p95_ms": round(float(np.percentile(ms, 95)), 1),
+            "max_ms": round(float(np.max(ms)), 1),
+            "mean_expanded": int(np.mean(expanded)) if expanded else 0,
+        }
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(
+        f"graph: {result['nodes']:,d} nodes  {result['edges']:,d} edges  (built in {result['load_seconds']} s)\n"
+        f"{args.queries} {args.mode} queries, {args.min_km:g}-{args.max_km:g} km apart"
+    )
+    for name, row in result["weights"].items():
+        print(
+            f"{name:>8} (w={row['weight']:g}): p50 {row['p50_ms']:6.1f} ms  p95 {row['p95_ms']:6.1f} ms  "
+            f"max {row['max_ms']:6.1f} ms  expanded {row['mean_expanded']:,d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
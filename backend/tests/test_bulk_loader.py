@@ -0,0 +1,99 @@
+import os
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT / "backend") not in sys.path:
+    sys.path.append(str(ROOT / "backend"))
+
+# app.database builds its engine at import time; no connection is made until used
+for key, value in {"DB_USER": "test", "DB_PASSWORD": "test", "DB_NAME": "test"}.items():
+    os.environ.setdefault(key, value)
+
+from app import database  # noqa: E402
+from app.services.batch_writer import insert_rows  # noqa: E402
+from app.services.bulk_loader import BULK_MODELS, NATURAL_KEYS, stage_records, upsert_sql  # noqa: E402
+from app.services.spatial_service import grid_cell_id  # noqa: E402
+from app.services.station_service import STATION_KEYS_SQL, _latest_upsert  # noqa: E402
+
+T0 = datetime(2025, 11, 1)
+READINGS = BULK_MODELS["aqi_readings"].__table__
+
+
+def test_sparse_rows_stage_on_the_union_of_their_columns():
+    rows = [
+        {"station_id": "a", "timestamp": T0, "latitude": 28.6, "longitude": 77.2, "pm2_5": 10.0},
+        {"station_id": "b", "timestamp": T0, "latitude": 28.7, "longitude": 77.1, "o3": 5.0, "grid_cell": 7},
+    ]
+    names, records = stage_records(READINGS, rows)
+    assert {"id", "pm2_5", "o3", "grid_cell"} <= set(names) and "pm10" not in names
+    first, second = (dict(zip(names, r)) for r in records)
+    assert first["o3"] is None and second["pm2_5"] is None
+    assert first["grid_cell"] == grid_cell_id(28.6, 77.2) and second["grid_cell"] == 7
+    assert first["id"] != second["id"]
+    # Columns with scalar ORM defaults are filled in
+    defaults = {c.name: c.default.arg for c in READINGS.columns if c.default is not None and c.default.is_scalar}
+    assert all(first[name] == value for name, value in defaults.items())
+
+
+def test_upsert_keeps_stored_values_for_columns_a_row_lacked():
+    row = {"station_id": "a", "timestamp": T0, "latitude": 28.6, "longitude": 77.2, "o3": 1.0}
+    names, _ = stage_records(READINGS, [row])
+    sql = upsert_sql(READINGS, names, NATURAL_KEYS["aqi_readings"])
+    assert sql.startswith('INSERT INTO "core"."aqi_readings" AS t (')
+    assert 'SELECT DISTINCT ON ("station_id", "timestamp")' in sql and 'FROM "_stage_aqi_readings"' in sql
+    assert 'ON CONFLICT ("station_id", "timestamp") DO UPDATE SET ' in sql
+    updates = re.split(r', (?=")', sql.split("DO UPDATE SET ", 1)[1])
+    assert '"o3" = COALESCE(EXCLUDED."o3", t."o3")' in updates
+    assert all("COALESCE(EXCLUDED." in u for u in updates)
+    # Neither the natural key nor the surrogate id is ever rewritten
+    assert not any(u.startswith(('"station_id"', '"timestamp"', '"id"')) for u in updates)
+
+    fires = BULK_MODELS["fire_hotspots"].__table__
+    fire_names, _ = stage_records(
+        fires, [{"timestamp": T0, "latitude": 28.6, "longitude": 77.2, "satellite": "N"}]
+    )
+    fire_sql = upsert_sql(fires, fire_names, NATURAL_KEYS["fire_hotspots"])
+    assert 'ON CONFLICT ("timestamp", "latitude", "longitude", "satellite")' in fire_sql
+
+
+def test_latest_upsert_only_moves_forward_per_station():
+    sql = _latest_upsert(STATION_KEYS_SQL)
+    assert "ON CONFLICT (station_id) DO UPDATE SET reading_id = EXCLUDED.reading_id" in sql
+    assert 'WHERE core.latest_readings."timestamp" <= EXCLUDED."timestamp"' in sql
+    assert '"station_id" = EXCLUDED' not in sql
+    assert f"JOIN ({STATION_KEYS_SQL}) k" in sql
+
+
+@pytest.mark.asyncio
+async def test_insert_sink_gives_every_row_the_same_columns(monkeypatch):
+    executed = []
+
+    class FakeSession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, statement, params):
+            executed.append(params)
+
+        async def commit(self):
+            pass
+
+    monkeypatch.setattr(database, "AsyncSessionLocal", FakeSession)
+    await insert_rows(
+        "fire_hotspots",
+        [
+            {"timestamp": T0, "latitude": 28.6, "longitude": 77.2},
+            {"timestamp": T0, "latitude": 28.7, "longitude": 77.1, "satellite": "N", "fire_radiative_power": 9.5},
+        ],
+    )
+    (params,) = executed
+    assert params[0].keys() == params[1].keys()
+    assert params[0]["fire_radiative_power"] is None and params[1]["fire_radiative_power"] == 9.5
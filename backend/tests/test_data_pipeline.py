@@ -0,0 +1,194 @@
+import asyncio
+import pytest
+from prometheus_client import REGISTRY
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT / "backend") not in sys.path:
+    sys.path.append(str(ROOT / "backend"))
+
+from app.services.batch_writer import Batch, BatchWriter  # noqa: E402
+from app.services.data_pipeline import (  # noqa: E402
+    DataPipelineService,
+    IngestionSource,
+    parse_openaq,
+)
+
+
+@pytest.mark.asyncio
+async def test_run_once_retries_until_success():
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise RuntimeError("upstream 503")
+        return {"ok": True}
+
+    service = DataPipelineService(register_defaults=False)
+    source = IngestionSource("flaky", flaky, interval_seconds=60, backoff_seconds=0.001)
+    assert await service.run_once(source) is True
+    assert len(calls) == 3
+    assert source.last_success is not None
+    assert service.manifest["flaky"]["status"] == "ok"
+    assert service.manifest["flaky"]["stages"]["fetch"]["retries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_run_once_gives_up_after_timeouts():
+    async def hangs():
+        await asyncio.sleep(10)
+
+    service = DataPipelineService(register_defaults=False)
+    source = IngestionSource(
+        "hangs", hangs, interval_seconds=60, timeout_seconds=0.01,
+        max_retries=1, backoff_seconds=0.001,
+    )
+    assert await service.run_once(source) is False
+    assert source.last_success is None
+
+
+@pytest.mark.asyncio
+async def test_parse_failure_is_a_failed_run_and_the_source_keeps_its_schedule():
+    fetches = []
+
+    async def fetch():
+        fetches.append(1)
+        return "acq_date\nnot-a-date"
+
+    def parse(result):
+        raise ValueError("time data 'not-a-date' does not match format")
+
+    service = DataPipelineService(register_defaults=False)
+    source = IngestionSource("broken", fetch, interval_seconds=0.01, parse=parse)
+    assert await service.run_once(source) is False
+    assert source.last_success is None
+    assert service.manifest["broken"]["status"] == "error"
+    assert "does not match" in service.manifest["broken"]["message"]
+
+    service.register_source(source)
+    await service.start()
+    await asyncio.sleep(0.1)
+    await service.stop()
+    assert len(fetches) >= 4
+
+
+@pytest.mark.asyncio
+async def test_slow_source_does_not_delay_others():
+    fast_runs = []
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def fast():
+        fast_runs.append(1)
+
+    service = DataPipelineService(register_defaults=False)
+    service.register_source(IngestionSource("slow", slow, interval_seconds=60, timeout_seconds=30))
+    service.register_source(IngestionSource("fast", fast, interval_seconds=0.01))
+    await service.start()
+    await asyncio.sleep(0.1)
+    await service.stop()
+    assert len(fast_runs) >= 3
+
+
+@pytest.mark.asyncio
+async def test_writer_coalesces_batches_per_table():
+    flushed = []
+
+    async def sink(table, rows):
+        flushed.append((table, len(rows)))
+
+    writer = BatchWriter(sink, flush_rows=4, flush_interval=10)
+    await writer.start()
+    for _ in range(2):
+        await writer.put(Batch("aqi_readings", [{"i": 1}, {"i": 2}]))
+    await writer.put(Batch("fire_hotspots", [{"i": 3}]))
+    await asyncio.sleep(0.01)
+    assert flushed == [("aqi_readings", 4)]
+    await writer.stop()
+    assert flushed == [("aqi_readings", 4), ("fire_hotspots", 1)]
+
+
+@pytest.mark.asyncio
+async def test_writer_backpressure_blocks_producers():
+    release = asyncio.Event()
+
+    async def slow_sink(table, rows):
+        await release.wait()
+
+    writer = BatchWriter(slow_sink, max_queue=1, flush_rows=1)
+    await writer.start()
+    await writer.put(Batch("aqi_readings", [{}]))  # consumed, sink now blocked
+    await asyncio.sleep(0.01)
+    await writer.put(Batch("aqi_readings", [{}]))  # fills the queue
+    blocked = asyncio.create_task(writer.put(Batch("aqi_readings", [{}])))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+    release.set()
+    await asyncio.wait_for(blocked, 1)
+    await writer.stop()
+
+
+
+@pytest.mark.asyncio
+async def test_failed_flushes_retry_while_producers_wait():
+    attempts = []
+
+    async def flaky_sink(table, rows):
+        attempts.append(len(rows))
+        if len(attempts) < 3:
+            raise ConnectionError("database unavailable")
+
+    writer = BatchWriter(flaky_sink, max_queue=1, flush_rows=2, retry_delay=0.05)
+    await writer.start()
+    await writer.put(Batch("aqi_readings", [{"i": 1}, {"i": 2}]))  # consumed, flush failing
+    await asyncio.sleep(0.01)
+    await writer.put(Batch("aqi_readings", [{"i": 3}]))  # fills the queue
+    blocked = asyncio.create_task(writer.put(Batch("aqi_readings", [{"i": 4}])))
+    await asyncio.sleep(0.02)
+    assert not blocked.done()
+    await asyncio.wait_for(blocked, 1)
+    await writer.stop()
+    # The same rows were retried until written, nothing was lost
+    assert attempts == [2, 2, 2, 2]
+
+
+@pytest.mark.asyncio
+async def test_rows_are_dropped_only_past_retries_and_the_pending_limit():
+    async def down(table, rows):
+        raise ConnectionError("database unavailable")
+
+    def dropped():
+        return REGISTRY.get_sample_value("pipeline_writer_dropped_rows_total", {"table": "fire_hotspots"}) or 0
+
+    before = dropped()
+    writer = BatchWriter(down, flush_rows=2, max_retries=1, retry_delay=0.001, max_pending_rows=3)
+    for i in range(2):
+        writer._coalesce(Batch("fire_hotspots", [{"i": 2 * i}, {"i": 2 * i + 1}]))
+        await writer.flush()
+    # Retries spent: the newest rows are kept up to the limit, the oldest dropped
+    assert writer._pending["fire_hotspots"] == [{"i": 1}, {"i": 2}, {"i": 3}]
+    assert dropped() - before == 1
+    # Shutdown makes one last attempt, then counts what it could not write
+    await writer.start()
+    await writer.stop()
+    assert dropped() - before == 4 and not writer._pending
+
+def test_parse_openaq_pivots_parameters_into_rows():
+    columns = {
+        "datetime": ["2025-01-01T00:00:00+00:00"] * 2,
+        "location_id": [42, 42],
+        "location": ["ITO", "ITO"],
+        "parameter": ["pm25", "pm10"],
+        "value": [80.0, 150.0],
+        "latitude": [28.6, 28.6],
+        "longitude": [77.2, 77.2],
+    }
+    (batch,) = parse_openaq({"columns": columns})
+    assert batch.table == "aqi_readings"
+    assert len(batch.rows) == 1
+    assert batch.rows[0]["station_id"] == "42"
+    assert (batch.rows[0]["pm2_5"], batch.rows[0]["pm10"]) == (80.0, 150.0)
@@ -0,0 +1,44 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT / "backend") not in sys.path:
+    sys.path.append(str(ROOT / "backend"))
+
+# app.database builds its engine at import time; no connection is made until used
+for key, value in {"DB_USER": "test", "DB_PASSWORD": "test", "DB_NAME": "test"}.items():
+    os.environ.setdefault(key, value)
+
+from app.database import LazySession  # noqa: E402
+
+
+class FakeSession:
+    closed = False
+
+    async def execute(self, statement):
+        return statement
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_lazy_session_only_created_on_use():
+    created = []
+
+    def factory():
+        created.append(FakeSession())
+        return created[-1]
+
+    unused = LazySession(factory)
+    await unused.close()
+    assert not unused.started and created == []
+
+    used = LazySession(factory)
+    assert await used.execute("SELECT 1") == "SELECT 1"
+    assert used.started and len(created) == 1
+    await used.close()
+    assert created[0].closed
@@ -0,0 +1,45 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT / "backend") not in sys.path:
+    sys.path.append(str(ROOT / "backend"))
+
+from app.db_replica import ReplicaLagMonitor  # noqa: E402
+
+
+@pytest.mark.asyncio
+async def test_lag_monitor_falls_back_and_caches():
+    lags = [1.0, 120.0]
+    calls = []
+
+    async def probe():
+        calls.append(1)
+        lag = lags.pop(0) if lags else None
+        if lag is None:
+            raise ConnectionError("replica down")
+        return lag
+
+    monitor = ReplicaLagMonitor(probe, max_lag_seconds=30, check_interval=0.05)
+    assert await monitor.healthy()
+    assert await monitor.healthy() and len(calls) == 1  # cached within the interval
+
+    await asyncio.sleep(0.06)
+    assert not await monitor.healthy()  # lagging -> primary
+
+    await asyncio.sleep(0.06)
+    assert not await monitor.healthy()  # probe failed -> primary
+    assert monitor.lag_seconds is None and len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_lag_monitor_times_out_slow_probe():
+    async def hung():
+        await asyncio.sleep(10)
+        return 0.0
+
+    monitor = ReplicaLagMonitor(hung, probe_timeout=0.05)
+    assert not await monitor.healthy()
@@ -0,0 +1,65 @@
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT / "backend") not in sys.path:
+    sys.path.append(str(ROOT / "backend"))
+
+from app.services.dispersion import (  # noqa: E402
+    EmissionSources,
+    plume_concentration,
+    sigma_y,
+    sigma_z,
+    stability_class,
+    wind_components,
+    wind_from_components,
+)
+from app.services.spatial_service import KM_PER_DEGREE, SpatialService  # noqa: E402
+
+GRID = SpatialService(None).generate_grid(28.6, 77.2, 10, 0.5)
+LAT, LON = GRID.points()
+
+
+def _source(**overrides):
+    record = {"latitude": 28.6, "longitude": 77.2, "rate_gs": 100.0, "height_m": 20.0, **overrides}
+    return EmissionSources.from_records([record])
+
+
+def test_plume_is_downwind_and_matches_the_centreline_formula():
+    # Wind from the north: the plume runs due south along the grid's centre column
+    conc = plume_concentration(_source(), LAT, LON, np.full(LAT.size, 4.0), np.zeros(LAT.size))
+    assert conc[LAT >= 28.6].max() == 0.0 and conc[LAT < 28.6].max() > 0.0
+
+    below = np.flatnonzero((LAT < 28.6) & np.isclose(LON, 77.2))
+    x = (28.6 - LAT[below]) * KM_PER_DEGREE * 1000
+    cls = stability_class(4.0)
+    sy, sz = sigma_y(x, cls), sigma_z(x, cls)
+    expected = 100.0 / (math.pi * 4.0 * sy * sz) * np.exp(-0.5 * 20.0**2 / sz**2) * 1e6
+    assert np.allclose(conc[below], expected)
+
+
+def test_cutoff_and_hourly_winds():
+    wind = np.stack([np.zeros(LAT.size), np.full(LAT.size, 180.0)])
+    conc = plume_concentration(_source(), LAT, LON, np.full((2, LAT.size), 3.0), wind, cutoff_km=4)
+    # Hour 0 blows south, hour 1 north; nothing beyond the cutoff radius
+    assert conc[0][LAT > 28.6].sum() == 0 and conc[1][LAT < 28.6].sum() == 0
+    far = np.abs(LAT - 28.6) * KM_PER_DEGREE > 4.01
+    assert conc[:, far].sum() == 0
+
+
+def test_area_sources_spread_wider_than_points():
+    speed, direction = np.full(LAT.size, 3.0), np.zeros(LAT.size)
+    point = plume_concentration(_source(), LAT, LON, speed, direction)
+    area = plume_concentration(_source(width_m=2000.0), LAT, LON, speed, direction)
+    assert np.count_nonzero(area) > np.count_nonzero(point)
+    assert area.max() < point.max()
+
+
+def test_wind_components_round_trip_across_north():
+    u, v = wind_components(np.array([2.0, 2.0]), np.array([350.0, 10.0]))
+    speed, direction = wind_from_components(u.mean(), v.mean())
+    assert math.isclose(direction, 0.0, abs_tol=1e-9) or math.isclose(direction, 360.0)
+    assert 1.9 < speed < 2.0
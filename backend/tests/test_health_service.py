@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT / "backend") not in sys.path:
+    sys.path.append(str(ROOT / "backend"))
+
+from app.services.health_service import compare_routes  # noqa: E402
+
+
+def _route(name, minutes):
+    return {"name": name, "duration_min": minutes}
+
+
+def test_routes_are_compared_against_the_fastest_or_direct_route():
+    # The healthiest route is listed first but still compared with the fastest
+    routes = [_route("healthiest", 30.0), _route("fastest", 24.0)]
+    analysis = compare_routes(routes, [60.0, 80.0])
+    assert analysis == {
+        "lowest_exposure_route": "healthiest",
+        "baseline_route": "fastest",
+        "exposure_saving_pct": 25.0,
+        "extra_minutes": 6.0,
+    }
+    detours = [_route("detour_1", 20.0), _route("direct", 15.0)]
+    assert compare_routes(detours, [30.0, 40.0])["baseline_route"] == "direct"
+
+    # A zero-length trip has no exposure to save
+    still = compare_routes([_route("direct", 0.0), _route("detour_1", 0.0)], [0.0, 0.0])
+    assert still["exposure_saving_pct"] == 0.0 and still["extra_minutes"] == 0.0
+
+    # Only the healthiest search found a path: nothing to compare it with
+    alone = compare_routes([_route("healthiest", 30.0)], [60.0])
+    assert alone["baseline_route"] is None
+    assert alone["exposure_saving_pct"] == 0.0 and alone["extra_minutes"] == 0.0
@@ -0,0 +1,95 @@
+import json
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT / "backend") not in sys.path:
+    sys.path.append(str(ROOT / "backend"))
+
+import pytest  # noqa: E402
+
+from app.services import historical_service  # noqa: E402
+from app.services.historical_service import (  # noqa: E402
+    choose_resolution,
+    encode_csv,
+    encode_ndjson,
+    parse_cursor,
+    stream_readings,
+    summarize_trend,
+)
+
+
+def test_choose_resolution_by_range():
+    start = datetime(2025, 1, 1)
+    assert choose_resolution(start, start + timedelta(hours=36)) == "raw"
+    assert choose_resolution(start, start + timedelta(days=30)) == "hourly"
+    assert choose_resolution(start, start + timedelta(days=365)) == "daily"
+
+
+def test_summarize_trend_direction():
+    def point(day, aqi):
+        return {"timestamp": datetime(2025, 1, day), "aqi": {"avg": aqi}}
+
+    summary = summarize_trend([point(1, 200.0), point(2, None), point(3, 260.0), point(4, 150.0)])
+    assert summary["direction"] == "improving"
+    assert summary["change"] == -50.0
+    assert summary["peak"]["aqi"] == 260.0
+    assert summarize_trend([point(1, 100.0), point(2, 103.0)])["direction"] == "stable"
+    assert summarize_trend([])["direction"] == "unknown"
+
+
+def test_cursor_round_trip_and_encodings():
+    row_id = uuid.uuid4()
+    ts, parsed_id = parse_cursor(f"2025-01-01T05:30:00+05:30,{row_id}")
+    assert ts == datetime(2025, 1, 1, 0, 0) and parsed_id == row_id
+    with pytest.raises(ValueError):
+        parse_cursor("not-a-cursor")
+
+    row = (datetime(2025, 1, 1, tzinfo=timezone.utc), row_id, "s1", 28.6, 77.2, 180)
+    line = json.loads(encode_ndjson([row]))
+    assert line["id"] == str(row_id) and line["aqi"] == 180
+    header, body = encode_csv([row], header=True).splitlines()
+    assert header.startswith("timestamp,id,station_id")
+    assert body.split(",")[1] == str(row_id)
+
+
+@pytest.mark.asyncio
+async def test_later_pages_are_bounded_by_the_last_timestamp(monkeypatch):
+    t0 = datetime(2025, 1, 1)
+    table = [(t0 + timedelta(minutes=i), uuid.uuid4(), "s1", 28.6, 77.2, 100 + i) for i in range(5)]
+    pages = []
+
+    class Result:
+        def __init__(self, rows):
+            self.rows = rows
+
+        async def partitions(self, size):
+            for i in range(0, len(self.rows), size):
+                yield self.rows[i : i + size]
+
+    class Session:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        def begin(self):
+            return self
+
+        async def stream(self, stmt, params):
+            pages.append((str(stmt), params))
+            after = (params["after_ts"], params["after_id"]) if "after_ts" in params else None
+            rows = [r for r in table if after is None or (r[0], r[1]) > after]
+            return Result(rows[: params["page_rows"]])
+
+    monkeypatch.setattr(historical_service, "STREAM_PAGE_ROWS", 3)
+    chunks = [c async for c in stream_readings(28.6, 77.2, t0, t0 + timedelta(hours=1), session_factory=Session)]
+    assert [json.loads(line)["aqi"] for c in chunks for line in c.splitlines()] == [100, 101, 102, 103, 104]
+
+    (first_sql, _), (second_sql, second_params) = pages
+    assert ":after_ts" not in first_sql
+    assert '"timestamp" >= :after_ts AND ("timestamp", id) > (:after_ts, :after_id)' in second_sql
+    assert second_params["after_ts"] == table[2][0] and second_params["after_id"] == table[2][1]
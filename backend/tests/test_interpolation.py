@@ -0,0 +1,54 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT / "backend") not in sys.path:
+    sys.path.append(str(ROOT / "backend"))
+
+from app.services.interpolation import Interpolator, fit_variogram  # noqa: E402
+
+RNG = np.random.default_rng(7)
+S_LAT = 28.6 + RNG.uniform(-0.2, 0.2, 25)
+S_LON = 77.2 + RNG.uniform(-0.2, 0.2, 25)
+P_LAT = 28.6 + RNG.uniform(-0.15, 0.15, 400)
+P_LON = 77.2 + RNG.uniform(-0.15, 0.15, 400)
+
+
+def _field(lat, lon):
+    return 150 + 60 * np.sin((lat - 28.6) * 20) + 40 * np.cos((lon - 77.2) * 15)
+
+
+def test_both_methods_honour_stations_and_constant_fields():
+    values = _field(S_LAT, S_LON)
+    variogram = fit_variogram(S_LAT, S_LON, values)
+    assert variogram.range_km > 0 and variogram.psill > 0
+    for method in ("idw", "kriging"):
+        interpolator = Interpolator(S_LAT, S_LON, method=method, variogram=variogram)
+        at_stations = interpolator.interpolate(values, S_LAT, S_LON)
+        assert np.allclose(at_stations[0], values, atol=1e-3)
+        flat = Interpolator(S_LAT, S_LON, method=method, variogram=variogram)
+        assert np.allclose(flat.interpolate(np.full(25, 42.0), P_LAT, P_LON), 42.0)
+
+
+def test_kriging_beats_idw_on_a_smooth_field():
+    values = _field(S_LAT, S_LON)
+    truth = _field(P_LAT, P_LON)
+    rmse = {}
+    for method in ("idw", "kriging"):
+        surface = Interpolator(S_LAT, S_LON, method=method).interpolate(values, P_LAT, P_LON)[0]
+        rmse[method] = np.sqrt(np.mean((surface - truth) ** 2))
+    assert rmse["kriging"] < rmse["idw"]
+
+
+def test_missing_station_hours_only_use_reporting_stations():
+    values = np.tile(_field(S_LAT, S_LON), (3, 1))
+    values[1, :5] = np.nan
+    values[2, :] = np.nan
+    surface = Interpolator(S_LAT, S_LON, method="kriging").interpolate(values, P_LAT, P_LON)
+    assert np.isfinite(surface[:2]).all() and np.isnan(surface[2]).all()
+
+    expected = Interpolator(S_LAT[5:], S_LON[5:], method="kriging", variogram=fit_variogram(S_LAT, S_LON, values))
+    assert np.allclose(surface[1], expected.interpolate(values[1, 5:], P_LAT, P_LON)[0])
+
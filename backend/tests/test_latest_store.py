@@ -0,0 +1,64 @@
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT / "backend") not in sys.path:
+    sys.path.append(str(ROOT / "backend"))
+
+from app.services.latest_store import LatestReadingsStore  # noqa: E402
+
+T0 = datetime(2025, 11, 1)
+
+
+def reading(station, hour, **values):
+    lat = 28.60 + 0.01 * int(station[1:])
+    return {"station_id": station, "timestamp": T0 + timedelta(hours=hour), "latitude": lat, "longitude": 77.2, **values}
+
+
+def test_ring_buffer_wraps_and_merges_partial_rows():
+    store = LatestReadingsStore(hours=4, capacity=1)
+    store.ingest([reading("s1", h, aqi=100 + h) for h in range(6)])  # wraps twice
+    store.ingest([reading("s1", 5, pm2_5=42.0), reading("s1", 0, aqi=999)])  # merge; too old
+
+    latest = store.latest("s1")
+    assert latest["timestamp"] == T0 + timedelta(hours=5)
+    assert latest["aqi"] == 105 and latest["pm2_5"] == 42.0
+    history = store.history("s1")
+    assert list(history["aqi"]) == [102, 103, 104, 105]
+    assert history["timestamp"][0] == T0 + timedelta(hours=2)
+
+    store.ingest([reading("s2", 5, aqi=50), reading("s3", 1, aqi=70)])  # grows capacity
+    assert store.capacity >= 3 and store.latest("s1")["aqi"] == 105
+
+
+def test_bbox_nearest_and_snapshot_round_trip(tmp_path):
+    store = LatestReadingsStore(hours=24)
+    store.ingest([reading(f"s{i}", 10, aqi=100 + i) for i in range(10)])
+    store.ingest([reading("s9", 1, aqi=1)])
+
+    inside = store.latest_in_bbox(28.615, 28.645, 77.0, 77.5)
+    assert sorted(r["station_id"] for r in inside) == ["s2", "s3", "s4"]
+    now = T0 + timedelta(hours=11)
+    assert store.nearest(28.632, 77.2, max_km=2, now=now)["station_id"] == "s3"
+    assert store.nearest(28.632, 77.2, max_km=2, max_age_hours=1, now=now + timedelta(hours=3)) is None
+
+    path = store.snapshot(str(tmp_path / "latest.npz"))
+    restored = LatestReadingsStore(hours=24)
+    restored.restore(path)
+    assert restored.station_ids == store.station_ids
+    assert restored.latest("s9") == store.latest("s9")
+    np.testing.assert_array_equal(restored.history("s3")["aqi"], store.history("s3")["aqi"])
+
+
+def test_history_matrix_is_hours_by_stations_with_gaps():
+    store = LatestReadingsStore(hours=6, capacity=4)
+    store.ingest([reading("S1", 0, aqi=100), reading("S1", 2, aqi=120), reading("S2", 2, aqi=80)])
+    store.ingest([{"station_id": "S3", "timestamp": T0 + timedelta(hours=2), "aqi": 90}])
+    times, ids, lat, lon, values = store.history_matrix("aqi", 3, now=T0 + timedelta(hours=2, minutes=30))
+    assert times == [T0 + timedelta(hours=h) for h in range(3)]
+    # S3 never reported a position
+    assert ids == ["S1", "S2"] and np.allclose(lat, [28.61, 28.62])
+    assert np.array_equal(values, [[100, np.nan], [np.nan, np.nan], [120, 80]], equal_nan=True)
@@ -0,0 +1,59 @@
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT / "data-pipeline") not in sys.path:
+    sys.path.append(str(ROOT / "data-pipeline"))
+
+from manifest_diff import diff_manifests, main  # noqa: E402
+
+
+def _entry(status, rows, fetch_seconds, retries=0):
+    return {
+        "status": status,
+        "rows": rows,
+        "stages": {"fetch": {"seconds": fetch_seconds, "rows_out": rows, "bytes": 1000, "retries": retries}},
+    }
+
+
+OLD = {
+    "openaq": _entry("ok", 1000, 2.0),
+    "firms": _entry("ok", 50, 1.0),
+    "weather": _entry("ok", 72, 0.5),
+    "_run": {"started_at": "2025-11-01T00:00:00+00:00", "seconds": 4.0},
+}
+NEW = {
+    "openaq": _entry("synthetic", 24, 2.1),
+    "firms": _entry("ok", 48, 3.0, retries=2),
+    "weather": _entry("ok", 72, 0.55),
+    "_run": {"started_at": "2025-11-02T00:00:00+00:00", "seconds": 9.0},
+}
+
+
+def test_diff_flags_status_row_and_stage_regressions():
+    report = diff_manifests(OLD, NEW, threshold=0.25)
+    # Run metadata is not a source
+    assert list(report["sources"]) == ["firms", "openaq", "weather"]
+    assert report["sources"]["openaq"]["status"] == ["ok", "synthetic"]
+    assert report["regressions"] == [
+        "firms: fetch.seconds 1.0 -> 3.0",
+        "firms: fetch.retries 0 -> 2",
+        "openaq: status ok -> synthetic",
+        "openaq: rows 1000 -> 24",
+    ]
+    # Changes within the threshold are reported but not flagged
+    old_seconds, new_seconds, change = report["sources"]["weather"]["stages"]["fetch"]["seconds"]
+    assert (old_seconds, new_seconds) == (0.5, 0.55) and abs(change - 0.1) < 1e-9
+    assert not report["sources"]["weather"]["regressions"]
+
+
+def test_cli_exit_code_follows_regressions(tmp_path, capsys):
+    old, new = tmp_path / "old.json", tmp_path / "new.json"
+    old.write_text(json.dumps(OLD))
+    new.write_text(json.dumps(NEW))
+    assert main([str(old), str(new)]) == 0
+    assert main([str(old), str(new), "--fail-on-regression"]) == 1
+    assert main([str(old), str(old), "--fail-on-regression"]) == 0
+    out = capsys.readouterr().out
+    assert "openaq: status ok -> synthetic, rows 1000 -> 24" in out and "No regressions." in out
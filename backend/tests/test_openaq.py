@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT / "data-pipeline") not in sys.path:
+    sys.path.append(str(ROOT / "data-pipeline"))
+
+from ingestors import openaq  # noqa: E402
+from runner import synthetic_openaq  # noqa: E402
+from utils.validate import count_rows, validate  # noqa: E402
+
+
+def test_gone_endpoint_returns_an_empty_columnar_batch(monkeypatch):
+    monkeypatch.setattr(openaq, "_fetch_page", lambda params, page: (SimpleNamespace(status_code=410), 0.1))
+    batch = openaq.fetch_measurements(hours=6)
+    assert set(batch) == {"meta", "columns", "page_timings"}
+    assert batch["meta"]["status_code"] == 410 and batch["meta"]["requested"]["hours"] == 6
+    assert batch["meta"]["rows"] == 0 and list(batch["columns"]) == openaq.COLUMNS
+    assert count_rows(batch) == 0
+
+
+def test_synthetic_fallback_has_the_fetched_batch_shape():
+    batch = synthetic_openaq(hours=24)
+    assert set(batch) == {"meta", "columns", "page_timings"} and list(batch["columns"]) == openaq.COLUMNS
+    # One row per hour: none are dropped as duplicates of each other
+    assert batch["meta"]["rows"] == 24 and batch["meta"]["duplicates"] == 0
+    assert len(set(batch["columns"]["datetime"])) == 24
+    assert validate(batch) == (24, [])
+
+
+def test_truncation_follows_the_reported_total(monkeypatch):
+    def serve(found):
+        def fetch_page(params, page):
+            rows = [
+                {"locationId": page, "parameter": "pm25", "date": {"utc": f"2025-11-01T0{i}:00Z"}} for i in range(2)
+            ]
+            body = {"meta": {"found": found}, "results": rows}
+            return SimpleNamespace(status_code=200, raise_for_status=lambda: None, json=lambda: body), 0.01
+
+        monkeypatch.setattr(openaq, "_fetch_page", fetch_page)
+        return openaq.fetch_measurements(limit=2, max_pages=2)["meta"]
+
+    # Exactly max_pages full pages: every row was fetched
+    exact = serve(4)
+    assert exact["pages"] == 2 and exact["rows"] == 4 and not exact["truncated"]
+    assert serve(5)["truncated"]
@@ -0,0 +1,73 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT / "backend") not in sys.path:
+    sys.path.append(str(ROOT / "backend"))
+
+from app.services.quadtree import decode_structure, refine  # noqa: E402
+from app.services.spatial_service import SpatialService  # noqa: E402
+
+
+def _field(lat, lon):
+    hotspot = 200 * np.exp(-(((lat - 28.55) / 0.02) ** 2 + ((lon - 77.25) / 0.03) ** 2))
+    base = 120 + 20 * np.sin((lat - 28.6) * 5) + 15 * np.cos((lon - 77.2) * 5)
+    return {"aqi": np.stack([base + hotspot, base + 0.5 * hotspot])}
+
+
+def test_zero_threshold_reproduces_the_uniform_grid():
+    grid = SpatialService(None).generate_grid(28.6, 77.2, 10, 0.5)
+    tree = refine(grid, _field, threshold=0)
+    assert tree.leaves == grid.size and (tree.leaf_size == 1).all()
+    assert np.array_equal(tree.raster("aqi")[:, grid.mask], _field(*grid.points())["aqi"])
+
+
+def test_smooth_areas_stay_coarse_and_the_encoding_round_trips():
+    grid = SpatialService(None).generate_grid(28.6, 77.2, 30, 0.5, clip=True)
+    uniform = _field(*grid.points())["aqi"]
+    tree = refine(grid, _field, threshold=5)
+    assert tree.evaluated < grid.size / 4
+    # Refinement reaches full resolution around the hotspot only
+    assert (tree.leaf_size == 1).any() and tree.leaf_size.max() == 16
+    assert np.abs(tree.raster("aqi")[:, grid.mask] - uniform).max() < 15
+
+    row, col, size = decode_structure(tree.structure(), tree.roots, tree.root_cells, len(tree.codes))
+    assert np.array_equal(row, tree.leaf_row) and np.array_equal(col, tree.leaf_col)
+    assert np.array_equal(size, tree.leaf_size)
+    # Every clipped-in cell is covered by exactly one leaf
+    covered = np.zeros((tree.roots[0] * tree.root_cells,) * 2, dtype=int)
+    for r, c, s in zip(row, col, size):
+        covered[r : r + s, c : c + s] += 1
+    assert (covered[: grid.shape[0], : grid.shape[1]][grid.mask] == 1).all()
+
+
+def test_focus_points_refine_a_flat_field():
+    grid = SpatialService(None).generate_grid(28.6, 77.2, 20, 0.5, clip=True)
+
+    def flat(lat, lon):
+        return {"aqi": np.full((1, lat.size), 100)}
+
+    assert refine(grid, flat, threshold=5).leaf_size.min() == 16
+    tree = refine(grid, flat, threshold=5, focus=(np.array([28.63]), np.array([77.15])), focus_km=1.0)
+    lat, lon = tree.leaf_centres()
+    fine = tree.leaf_size == 1
+    # The 5 x 5 cells within 1 km (two cells) of the point, rounded out to the 2 x 2
+    # blocks they overlap
+    assert 25 <= fine.sum() <= 36
+    assert np.abs(lat[fine] - 28.63).max() < 0.016 and np.abs(lon[fine] - 77.15).max() < 0.018
+
+
+def test_uniform_cost_is_estimated_from_the_per_cell_model_time():
+    grid = SpatialService(None).generate_grid(28.6, 77.2, 30, 0.5, clip=True)
+
+    def slow(lat, lon):
+        time.sleep(1e-3 + 2e-5 * lat.size)
+        return _field(lat, lon)
+
+    tree = refine(grid, slow, threshold=5)
+    # At least the model's per-point cost for every cell, and more than the adaptive run
+    assert tree.uniform_estimate_seconds >= 2e-5 * grid.size
+    assert tree.uniform_estimate_seconds > tree.elapsed_seconds
@@ -0,0 +1,32 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT / "backend") not in sys.path:
+    sys.path.append(str(ROOT / "backend"))
+
+for key, value in {"DB_USER": "test", "DB_PASSWORD": "test", "DB_NAME": "test"}.items():
+    os.environ.setdefault(key, value)
+
+from app.services.query_catalog import CATALOG  # noqa: E402
+
+
+def test_hot_queries_are_precompiled_to_positional_sql():
+    for name in ("latest_reading_by_station", "forecasts_by_cell", "alerts_by_user"):
+        query = CATALOG[name]
+        assert query.sql and "$1" in query.sql
+        assert query.compile_seconds > 0
+
+
+def test_args_follow_placeholder_order():
+    latest = CATALOG["latest_reading_by_station"]
+    assert latest.args({"station_id": "DL001"}) == ["DL001"]
+
+    forecasts = CATALOG["forecasts_by_cell"]
+    assert forecasts.args({"end": 3, "start": 2, "grid_cell": 1}) == [1, 2, 3]
+
+    with pytest.raises(TypeError):
+        CATALOG["alerts_by_user"].args({"limit": 5})
@@ -0,0 +1,77 @@
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import requests
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT / "data-pipeline") not in sys.path:
+    sys.path.append(str(ROOT / "data-pipeline"))
+
+from utils import replay  # noqa: E402
+from utils.replay import FixtureStore, ReplayConfig, StandinServer, fixture_key, scale_payload  # noqa: E402
+
+PAGE = {
+    "meta": {"found": 250, "limit": 100, "page": 2},
+    "results": [{"locationId": 7, "parameter": "pm25", "value": 80.0}, {"locationId": 9, "parameter": "o3", "value": 20.0}],
+}
+
+
+def test_scaled_pages_grow_but_keep_the_recorded_page_count():
+    body = scale_payload(json.dumps(PAGE).encode(), "application/json; charset=utf-8", 3)
+    data = json.loads(body)
+    assert data["meta"] == PAGE["meta"]
+    assert len(data["results"]) == 6
+    assert sorted(r["locationId"] for r in data["results"]) == [7, 9, 1_000_007, 1_000_009, 2_000_007, 2_000_009]
+
+    csv = b"latitude,longitude,acq_date\n28.6,77.2,2025-11-01\n28.7,77.1,2025-11-01\n"
+    assert scale_payload(csv, "text/csv", 2).decode().splitlines()[1:] == csv.decode().splitlines()[1:] * 2
+    hourly = json.dumps({"hourly": {"time": ["2025-11-01T00:00"]}}).encode()
+    assert scale_payload(hourly, "application/json", 4) == json.dumps({"hourly": {"time": ["2025-11-01T00:00"]}}).encode()
+    assert scale_payload(hourly, "application/json", 1) is hourly
+
+
+def test_fixture_key_ignores_volatile_params_and_order_but_not_pages():
+    key = fixture_key("/openaq/measurements", "limit=100&page=2&date_from=2025-11-01&city=Delhi")
+    assert key == fixture_key("/openaq/measurements", "city=Delhi&date_from=2025-11-09&page=2&limit=100")
+    assert key != fixture_key("/openaq/measurements", "city=Delhi&page=3&limit=100")
+    assert key != fixture_key("/firms/measurements", "city=Delhi&page=2&limit=100")
+
+
+def test_recorded_responses_replay_scaled(tmp_path, monkeypatch):
+    upstream = []
+
+    class Upstream:
+        status_code = 200
+        headers = {"Content-Type": "application/json"}
+        content = json.dumps(PAGE).encode()
+
+        def __init__(self, url, params):
+            self.url = url + "?" + "&".join(f"{k}={v}" for k, v in params)
+
+    def fake_get(url, params=None, timeout=None):
+        upstream.append(url)
+        return Upstream(url, params)
+
+    monkeypatch.setattr(replay, "requests", SimpleNamespace(get=fake_get))
+    store = FixtureStore(tmp_path)
+    recorder = StandinServer("record", store=store).start()
+    path = "/openaq/measurements?city=Delhi&page=2&date_from=2025-11-01"
+    try:
+        assert recorder.handle(path) == (200, "application/json", json.dumps(PAGE).encode())
+    finally:
+        recorder.stop()
+    assert upstream == ["https://api.openaq.org/v2/measurements"]
+
+    server = StandinServer("replay", store=store, config=ReplayConfig(payload_scale=2)).start()
+    try:
+        # A later run with a different relative window hits the same fixture
+        r = requests.get(server.base_url + "/openaq/measurements?date_from=2025-11-08&page=2&city=Delhi")
+        assert r.status_code == 200 and len(r.json()["results"]) == 4 and r.json()["meta"]["found"] == 250
+        missing = requests.get(server.base_url + "/openaq/measurements?city=Delhi&page=3")
+        assert missing.status_code == 404
+        assert server.stats.as_dict()["misses"] == 1
+    finally:
+        server.stop()
+    assert len(upstream) == 1
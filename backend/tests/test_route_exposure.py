@@ -0,0 +1,95 @@
+import os
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT / "backend") not in sys.path:
+    sys.path.append(str(ROOT / "backend"))
+
+# app.database builds its engine at import time; no connection is made until used
+for key, value in {"DB_USER": "test", "DB_PASSWORD": "test", "DB_NAME": "test"}.items():
+    os.environ.setdefault(key, value)
+
+from app.services.forecasting_service import ROUTE_HORIZON_HOURS, ForecastingService  # noqa: E402
+from app.services.route_exposure import SpaceTimeGrid, route_exposure  # noqa: E402
+from app.services.spatial_service import SpatialService, densify_routes  # noqa: E402
+
+T0 = datetime(2025, 11, 1)
+GRID = SpatialService(None).generate_grid(28.6, 77.2, 15, 1)
+LAT, LON = GRID.points()
+
+
+def test_densified_routes_keep_vertices_and_spacing():
+    routes = [
+        ([28.60, 28.62, 28.62], [77.20, 77.20, 77.24]),
+        ([28.55], [77.10]),
+        ([28.70, 28.71], [77.00, 77.01]),
+    ]
+    batch = densify_routes(routes, spacing_km=0.25)
+    assert len(batch) == 3 and batch.offsets[2] - batch.offsets[1] == 1
+    first = slice(batch.offsets[0], batch.offsets[1])
+    assert np.diff(batch.dist_km[first]).max() <= 0.25 + 1e-9
+    # Original vertices survive, in order, at their cumulative distances
+    for lat, lon in zip(*routes[0]):
+        assert np.any(np.isclose(batch.lat[first], lat) & np.isclose(batch.lon[first], lon))
+    assert np.isclose(batch.lengths_km[0], 0.02 * 111.32 + 0.04 * 111.32 * np.cos(np.radians(28.62)), rtol=1e-6)
+    assert batch.lengths_km[1] == 0 and batch.dist_km[batch.offsets[2]] == 0
+
+
+def test_trilinear_sampling_is_exact_on_linear_fields():
+    values = np.stack([100 + 800 * (LAT - 28.6) - 300 * (LON - 77.2) + 12 * h for h in range(4)])
+    field = SpaceTimeGrid.from_grid(GRID, T0, values)
+    rng = np.random.default_rng(3)
+    lat, lon, hours = 28.6 + rng.uniform(-0.1, 0.1, 200), 77.2 + rng.uniform(-0.1, 0.1, 200), rng.uniform(0, 3, 200)
+    expected = 100 + 800 * (lat - 28.6) - 300 * (lon - 77.2) + 12 * hours
+    assert np.allclose(field.sample(lat, lon, hours), expected)
+
+
+def test_exposure_integrates_aqi_over_travel_time():
+    # AQI rises 60 per hour everywhere: a 1 h walk from T0 + 1 h averages 90 + 30
+    values = np.stack([np.full(LAT.size, 30.0 + 60 * h) for h in range(4)])
+    field = SpaceTimeGrid.from_grid(GRID, T0, values)
+    east = 5.0 / (111.32 * np.cos(np.radians(28.6)))
+    batch = densify_routes([([28.6, 28.6], [77.2, 77.2 + east]), ([28.6, 28.6], [77.2, 77.2 + east / 2])])
+    result = route_exposure(batch, field, speed_kmh=5.0, depart=T0 + timedelta(hours=1))
+    assert np.allclose(result["duration_hours"], [1.0, 0.5])
+    assert np.isclose(result["mean_aqi"][0], 120.0) and np.isclose(result["exposure"][0], 120.0)
+    assert np.isclose(result["exposure"][1], 0.5 * 105.0) and np.isclose(result["max_aqi"][0], 150.0)
+
+    # Evaluating routes together matches evaluating them one by one
+    alone = route_exposure(
+        densify_routes([([28.6, 28.6], [77.2, 77.2 + east / 2])]), field, 5.0, T0 + timedelta(hours=1)
+    )
+    assert np.isclose(alone["exposure"][0], result["exposure"][1])
+
+
+@pytest.mark.asyncio
+async def test_later_departures_sample_their_own_hours(monkeypatch):
+    requested = []
+
+    async def fake_grid(self, lat, lon, hours):
+        requested.append(hours)
+        # AQI equal to the hour offset from the start of the current hour
+        start = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        values = np.stack([np.full(GRID.size, float(h)) for h in range(hours)])
+        return SpaceTimeGrid.from_grid(GRID, start, values)
+
+    monkeypatch.setattr(ForecastingService, "get_space_time_grid", fake_grid)
+    service = ForecastingService(None)
+    # About 3 km, a little over half an hour on foot
+    walk = [{"lat": 28.60, "lon": 77.20}, {"lat": 28.627, "lon": 77.20}]
+    depart = datetime.utcnow().replace(minute=0, second=0, microsecond=0) + timedelta(hours=30)
+    result = await service.calculate_route_exposure(walk, "walking", depart_at=depart)
+    assert requested == [32]
+    assert 30 < result["mean_aqi"] < 31 and result["points"][0]["aqi"] == 30.0
+
+    # Far ahead the raster stops at the horizon
+    await service.calculate_route_exposure(walk, "walking", depart_at=depart + timedelta(hours=41))
+    assert requested[-1] == ROUTE_HORIZON_HOURS
+    for outside in (timedelta(hours=-72), timedelta(hours=ROUTE_HORIZON_HOURS + 1)):
+        with pytest.raises(ValueError):
+            await service.calculate_route_exposure(walk, "walking", depart_at=datetime.utcnow() + outside)
@@ -0,0 +1,155 @@
+import asyncio
+import heapq
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT / "backend") not in sys.path:
+    sys.path.append(str(ROOT / "backend"))
+
+from app.services import road_graph  # noqa: E402
+from app.services.road_graph import build_graph, get_road_graph, load_road_graph, parse_osm  # noqa: E402
+from app.services.route_exposure import SpaceTimeGrid  # noqa: E402
+from app.services.routing import cell_weights, shortest_path  # noqa: E402
+from app.services.spatial_service import SpatialService  # noqa: E402
+
+OSM = """<?xml version='1.0' encoding='UTF-8'?>
+<osm version="0.6">
+  <node id="1" lat="28.600" lon="77.200"/>
+  <node id="2" lat="28.601" lon="77.200"/>
+  <node id="3" lat="28.602" lon="77.200"/>
+  <node id="4" lat="28.602" lon="77.201"/>
+  <node id="5" lat="28.600" lon="77.201"/>
+  <node id="6" lat="28.700" lon="77.300"/>
+  <way id="10"><nd ref="1"/><nd ref="2"/><nd ref="3"/><tag k="highway" v="primary"/><tag k="oneway" v="yes"/></way>
+  <way id="11"><nd ref="3"/><nd ref="4"/><tag k="highway" v="footway"/></way>
+  <way id="12"><nd ref="1"/><nd ref="5"/><nd ref="99"/><nd ref="4"/><tag k="highway" v="motorway"/></way>
+  <way id="13"><nd ref="5"/><nd ref="6"/><tag k="building" v="yes"/></way>
+  <way id="14"><nd ref="2"/><nd ref="5"/><tag k="highway" v="service"/><tag k="access" v="private"/></way>
+</osm>
+"""
+
+
+def _grid_graph(n=30, spacing_km=0.2, seed=0):
+    rng = np.random.default_rng(seed)
+    d = spacing_km / 111.32
+    lat = 28.6 + np.arange(n)[:, None] * d + rng.normal(0, d * 0.1, (n, n))
+    lon = 77.2 + np.arange(n)[None, :] * d / np.cos(np.radians(28.6)) + rng.normal(0, d * 0.1, (n, n))
+    idx = np.arange(n * n).reshape(n, n)
+    ways = [(idx[r], "primary" if r % 5 == 0 else "residential", "no") for r in range(n)]
+    ways += [(idx[:, c], "residential", "yes" if c % 3 == 0 else "no") for c in range(n)]
+    return build_graph(lat.ravel(), lon.ravel(), ways)
+
+
+def _field(values):
+    grid = SpatialService(None).generate_grid(28.63, 77.23, 6, 0.5)
+    lat, lon = grid.points()
+    return SpaceTimeGrid.from_grid(grid, datetime(2025, 11, 1), values(lat, lon)), lat, lon
+
+
+def _dijkstra(graph, source, seconds, cost):
+    best = {source: 0.0}
+    heap = [(0.0, source)]
+    while heap:
+        g, u = heapq.heappop(heap)
+        if g > best[u]:
+            continue
+        for e in range(graph.indptr[u], graph.indptr[u + 1]):
+            if np.isfinite(seconds[e]):
+                v, c = int(graph.indices[e]), g + float(cost[e])
+                if c < best.get(v, np.inf):
+                    best[v] = c
+                    heapq.heappush(heap, (c, v))
+    return best
+
+
+def test_osm_extract_becomes_a_mode_aware_csr_graph(tmp_path):
+    path = tmp_path / "ncr.osm"
+    path.write_text(OSM)
+    graph = parse_osm(str(path))
+    # Node 6 is only on a non-road way; the motorway is split at the missing node 99
+    assert graph.nodes == 5 and graph.edges == 2 * (2 + 1 + 1)
+    tails = graph.tails()
+    assert graph.indptr[-1] == graph.edges and (np.diff(tails) >= 0).all()
+    pairs = {(int(t), int(h)): int(m) for t, h, m in zip(tails, graph.indices, graph.modes)}
+    # ids 1..5 map to 0..4; oneway primary: driving forward only, walking both ways
+    assert pairs[(0, 1)] & 4 and not pairs[(1, 0)] & 4 and pairs[(1, 0)] & 1
+    assert pairs[(2, 3)] == pairs[(3, 2)] == 1 and pairs[(0, 4)] == 4
+    assert np.isclose(graph.length_m[list(pairs).index((0, 1))], 111.32, rtol=1e-3)
+
+    compiled = tmp_path / "ncr.npz"
+    graph.save(str(compiled))
+    loaded = type(graph).load(str(compiled))
+    assert np.array_equal(loaded.indices, graph.indices) and np.array_equal(loaded.modes, graph.modes)
+
+
+
+@pytest.mark.asyncio
+async def test_graph_loads_once_off_the_event_loop(tmp_path, monkeypatch):
+    path = tmp_path / "ncr.osm"
+    path.write_text(OSM)
+    parsed = []
+
+    def counting_parse(p):
+        parsed.append(p)
+        return parse_osm(p)
+
+    monkeypatch.setattr(road_graph, "_graph", None)
+    monkeypatch.setattr(road_graph, "_graph_lock", asyncio.Lock())
+    monkeypatch.setattr(road_graph, "parse_osm", counting_parse)
+    assert get_road_graph() is None
+    first, second = await asyncio.gather(load_road_graph(str(path)), load_road_graph(str(path)))
+    assert first is second is get_road_graph() and first.nodes == 5
+    assert parsed == [str(path)] and (tmp_path / "ncr.osm.npz").exists()
+
+def test_search_matches_dijkstra_on_static_costs():
+    graph = _grid_graph()
+    field, lat, lon = _field(lambda lat, lon: (150 + 900 * (lat - 28.6) + 400 * np.sin(lon * 300))[None])
+    cells = graph.edge_cells(field.lat0, field.lon0, field.dlat, field.dlon, *field.values.shape[1:])
+    rng = np.random.default_rng(1)
+    for mode in ("walking", "driving"):
+        costs = graph.mode_costs(mode)
+        for weight in (0.0, 2.0):
+            weights = cell_weights(field, weight)
+            cost = costs.seconds * weights[0, cells]
+            source = int(rng.integers(graph.nodes))
+            reference = _dijkstra(graph, source, costs.seconds, cost)
+            for target in rng.integers(graph.nodes, size=5):
+                path = shortest_path(graph, source, int(target), costs, cells, weights)
+                assert np.isclose(path.cost, reference[int(target)], rtol=1e-5)
+                # The returned node sequence follows open edges and adds up to the cost
+                total = 0.0
+                for u, v in zip(path.nodes[:-1], path.nodes[1:]):
+                    out = range(graph.indptr[u], graph.indptr[u + 1])
+                    total += min(cost[e] for e in out if graph.indices[e] == v and np.isfinite(cost[e]))
+                assert np.isclose(total, path.cost, rtol=1e-5)
+
+
+def test_exposure_weight_detours_around_a_hotspot_while_it_lasts():
+    graph = _grid_graph(n=30, spacing_km=0.2)
+    centre = (float(graph.lat.mean()), float(graph.lon.mean()))
+
+    def hotspot(lat, lon):
+        plume = 400 * np.exp(-(((lat - centre[0]) / 0.006) ** 2 + ((lon - centre[1]) / 0.006) ** 2))
+        # Gone from the second hour on
+        return np.stack([100 + plume, np.full(lat.shape, 100.0), np.full(lat.shape, 100.0)])
+
+    field, _, _ = _field(hotspot)
+    cells = graph.edge_cells(field.lat0, field.lon0, field.dlat, field.dlon, *field.values.shape[1:])
+    costs = graph.mode_costs("walking")
+    west, east = 15 * 30, 15 * 30 + 29
+    fastest = shortest_path(graph, west, east, costs, cells, cell_weights(field, 0.0))
+    healthiest = shortest_path(graph, west, east, costs, cells, cell_weights(field, 3.0))
+    later = shortest_path(graph, west, east, costs, cells, cell_weights(field, 3.0), start_hour=1.0)
+
+    def closest_approach(path):
+        return np.hypot(graph.lat[path.nodes] - centre[0], graph.lon[path.nodes] - centre[1]).min()
+
+    assert healthiest.seconds > fastest.seconds
+    assert closest_approach(fastest) < 0.003 and closest_approach(healthiest) > 0.006
+    # Departing once the hotspot has cleared, the walk goes straight through again
+    assert np.isclose(later.seconds, fastest.seconds)
@@ -0,0 +1,165 @@
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT / "backend") not in sys.path:
+    sys.path.append(str(ROOT / "backend"))
+
+from app.services.spatial_service import (  # noqa: E402
+    INDEX_REF_LAT,
+    KM_PER_DEGREE,
+    SpatialIndex,
+    SpatialService,
+    cell_bounds,
+    cell_children,
+    cell_keys,
+    cell_level,
+    cell_neighbours,
+    cell_parent,
+    cell_polygons,
+    cell_range,
+    cover_bbox,
+    decode_cells,
+    encode_cells,
+    grid_cell_id,
+    grid_cell_ranges_in_bbox,
+    key_ranges,
+)
+
+
+def test_grid_cells_are_square_on_the_ground():
+    grid = SpatialService(None).generate_grid(28.6139, 77.2090, 5, 1)
+    assert grid.shape == (11, 11) and grid.size == 121
+    assert grid.lat.flags["C_CONTIGUOUS"]
+    dy = (grid.lat[1, 0] - grid.lat[0, 0]) * KM_PER_DEGREE
+    dx = (grid.lon[0, 1] - grid.lon[0, 0]) * KM_PER_DEGREE * math.cos(math.radians(28.6139))
+    assert math.isclose(dx, 1.0, rel_tol=1e-6) and math.isclose(dy, 1.0, rel_tol=1e-6)
+    assert grid.lat[5, 5] == 28.6139 and grid.lon[5, 5] == 77.2090
+    assert grid.cell_ids[2, 7] == grid_cell_id(grid.lat[2, 7], grid.lon[2, 7])
+
+
+def test_clipped_grid_keeps_cells_within_radius():
+    grid = SpatialService(None).generate_grid(28.6139, 77.2090, 5, 1, clip=True)
+    assert grid.size == 81  # lattice points with x^2 + y^2 <= 25
+    assert not grid.mask[0, 0] and grid.mask[0, 5]
+    lat, lon = grid.points()
+    assert lat.shape == (81,)
+
+    raster = grid.raster(np.arange(grid.size, dtype=float))
+    assert raster.shape == (11, 11) and np.isnan(raster[0, 0])
+    assert raster.flat[grid.index[-1]] == grid.size - 1
+
+
+def test_cell_keys_nest_across_levels():
+    rng = np.random.default_rng(5)
+    lat = rng.uniform(8, 37, 500)
+    lon = rng.uniform(68, 97, 500)
+    fine = cell_keys(lat, lon)
+    assert (fine % 2 == 1).all() and (cell_level(fine) == 16).all()
+    for level in (0, 5, 12, 15):
+        keys = cell_keys(lat, lon, level)
+        lv, y, x = decode_cells(keys)
+        assert (lv == level).all() and np.array_equal(encode_cells(y, x, level), keys)
+        assert np.array_equal(cell_parent(fine, level), keys)
+        lo, hi = cell_range(keys)
+        assert ((lo <= fine) & (fine <= hi)).all()
+        min_lat, min_lon, max_lat, max_lon = cell_bounds(keys)
+        assert ((min_lat <= lat) & (lat < max_lat) & (min_lon <= lon) & (lon < max_lon)).all()
+        if level < 16:
+            children = cell_children(keys)
+            assert (cell_parent(children) == keys[:, None]).all()
+            assert (children == cell_keys(lat, lon, level + 1)[:, None]).any(axis=1).all()
+
+    # Children are SW, SE, NW, NE and their ranges tile the parent's
+    parent = cell_keys(28.6139, 77.2090, 12)
+    children = cell_children(parent)
+    c_lat, c_lon = cell_bounds(children)[:2]
+    assert c_lat[0] == c_lat[1] < c_lat[2] == c_lat[3] and c_lon[0] == c_lon[2] < c_lon[1] == c_lon[3]
+    lo, hi = cell_range(children)
+    assert lo[0] == cell_range(parent)[0] and hi[-1] == cell_range(parent)[1]
+    assert (lo[1:] == hi[:-1] + 2).all()
+
+    ring = cell_polygons(fine[0])
+    assert ring.shape == (5, 2) and (ring[0] == ring[-1]).all()
+    assert np.isclose(ring[2, 0] - ring[0, 0], 0.01) and np.isclose(ring[2, 1] - ring[0, 1], 0.01)
+
+
+def test_cell_neighbours_are_adjacent_same_level_cells():
+    key = cell_keys(28.6139, 77.2090, 14)
+    around = cell_neighbours(key)
+    _, y, x = decode_cells(key)
+    _, ny, nx = decode_cells(around)
+    assert (cell_level(around) == 14).all()
+    assert sorted(zip((ny - y).tolist(), (nx - x).tolist())) == sorted(
+        (dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dy or dx
+    )
+    assert (ny[0], nx[0]) == (y + 1, x)  # north first
+    corner = cell_neighbours(encode_cells(0, 0, 3))
+    assert (corner == -1).sum() == 5
+
+
+def test_bbox_cover_ranges_contain_every_cell_in_the_box():
+    box = (28.403, 28.887, 76.842, 77.348)
+    y = np.arange(math.floor(box[0] / 0.01), math.floor(box[1] / 0.01) + 1) * 0.01 + 0.005
+    x = np.arange(math.floor(box[2] / 0.01), math.floor(box[3] / 0.01) + 1) * 0.01 + 0.005
+    inside = cell_keys(*np.meshgrid(y, x, indexing="ij")).ravel()
+    for cap in (4, 64, 10_000):
+        cover = cover_bbox(*box, max_cells=cap)
+        assert len(cover) <= max(cap, 4)
+        ranges = key_ranges(cover)
+        lo = np.array([r[0] for r in ranges])
+        hi = np.array([r[1] for r in ranges])
+        assert (lo[1:] > hi[:-1] + 2).all()  # merged and sorted
+        slot = np.searchsorted(lo, inside, side="right") - 1
+        assert (slot >= 0).all() and (inside <= hi[slot]).all()
+    # Uncapped, the cover is exact: nothing outside the box
+    exact = grid_cell_ranges_in_bbox(*box, max_ranges=10_000)
+    covered = sum((hi - lo) // 2 + 1 for lo, hi in exact)
+    assert covered == inside.size
+    assert grid_cell_id(28.6139, 77.2090) == int(cell_keys(28.6139, 77.2090))
+
+
+def _random_index(n=400, seed=3):
+    rng = np.random.default_rng(seed)
+    lat = 28.6 + rng.uniform(-0.3, 0.3, n)
+    lon = 77.2 + rng.uniform(-0.35, 0.35, n)
+    index = SpatialIndex(cell_km=2.0)
+    index.insert(list(range(n)), lat, lon)
+    q_lat = 28.6 + rng.uniform(-0.4, 0.4, 300)
+    q_lon = 77.2 + rng.uniform(-0.45, 0.45, 300)
+    kx = KM_PER_DEGREE * math.cos(math.radians(INDEX_REF_LAT))
+    brute = np.hypot(
+        (lon[None, :] - q_lon[:, None]) * kx, (lat[None, :] - q_lat[:, None]) * KM_PER_DEGREE
+    )
+    return index, q_lat, q_lon, brute
+
+
+def test_index_batch_queries_match_brute_force():
+    index, q_lat, q_lon, brute = _random_index()
+    for radius in (0.5, 4.0, 80.0):
+        offsets, slots, _ = index.within_batch(q_lat, q_lon, radius)
+        for i in range(len(q_lat)):
+            got = sorted(slots[offsets[i] : offsets[i + 1]].tolist())
+            assert got == np.flatnonzero(brute[i] <= radius).tolist()
+
+    slots, dists = index.nearest_batch(q_lat, q_lon, k=6)
+    assert np.allclose(dists, np.sort(brute, axis=1)[:, :6])
+    assert (slots >= 0).all()
+
+
+def test_index_inserts_move_remove_and_prune():
+    index = SpatialIndex()
+    index.insert(["a", "b"], [28.60, 28.70], [77.20, 77.20], stamps=[100.0, 200.0])
+    index.insert(["a"], [28.70], [77.21], stamps=[300.0])  # moved
+    assert len(index) == 2
+    assert {key for key, _ in index.within(28.70, 77.205, 1.0)} == {"a", "b"}
+    assert index.within(28.60, 77.20, 1.0) == []
+
+    assert index.prune(older_than=250.0) == 1
+    assert [key for key, _ in index.nearest(28.70, 77.20, k=3)] == ["a"]
+    assert index.remove(["a", "missing"]) == 1 and len(index) == 0
+    slots, dists = index.nearest_batch([28.6], [77.2], k=2)
+    assert (slots == -1).all() and np.isinf(dists).all()
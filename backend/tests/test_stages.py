@@ -0,0 +1,60 @@
+import contextvars
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT / "data-pipeline") not in sys.path:
+    sys.path.append(str(ROOT / "data-pipeline"))
+
+from utils import http  # noqa: E402
+from utils.stages import StageRecorder, current_stage  # noqa: E402
+
+
+def test_stages_record_rows_time_and_errors():
+    recorder = StageRecorder(track_memory=True)
+    with recorder.stage("parse", rows_in=3) as stage:
+        stage.rows_out = 2
+        buffer = bytearray(1 << 20)
+        assert current_stage() is stage
+    del buffer
+    with pytest.raises(ValueError):
+        with recorder.stage("validate", rows_in=2):
+            raise ValueError("bad row")
+    assert current_stage() is None
+
+    stages = recorder.as_dict()
+    assert list(stages) == ["parse", "validate"]
+    assert stages["parse"]["rows_in"] == 3 and stages["parse"]["rows_out"] == 2
+    assert stages["parse"]["status"] == "ok" and stages["parse"]["peak_memory_bytes"] >= 1 << 20
+    assert stages["validate"]["status"] == "error" and stages["validate"]["error"] == "bad row"
+    assert recorder.total_seconds() == pytest.approx(sum(s["seconds"] for s in stages.values()), abs=1e-3)
+
+
+def test_http_retries_are_charged_to_the_stage_and_can_be_switched_off(monkeypatch):
+    calls = []
+
+    def flaky_get(url, **kwargs):
+        # Every first request to a URL gets a 503
+        calls.append(url)
+        return SimpleNamespace(status_code=503 if calls.count(url) == 1 else 200, content=b"x" * 10)
+
+    monkeypatch.setattr(http.requests, "get", flaky_get)
+    monkeypatch.setattr(http, "HTTP_BACKOFF_SECONDS", 0)
+    recorder = StageRecorder(track_memory=False)
+    with recorder.stage("fetch"):
+        assert http.get("https://example.test/a").status_code == 200
+    assert recorder.as_dict()["fetch"]["retries"] == 1 and recorder.as_dict()["fetch"]["bytes"] == 20
+
+    # Inside retries_off the 503 is returned as is, also in threads run in a copy of the context
+    results = []
+    with http.retries_off():
+        context = contextvars.copy_context()
+        worker = threading.Thread(target=lambda: results.append(context.run(http.get, "https://example.test/b")))
+        worker.start()
+        worker.join()
+    assert [r.status_code for r in results] == [503] and calls.count("https://example.test/b") == 1
+    assert http.get("https://example.test/c").status_code == 200
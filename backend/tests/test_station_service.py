@@ -0,0 +1,43 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT / "backend") not in sys.path:
+    sys.path.append(str(ROOT / "backend"))
+
+# app.database builds its engine at import time; no connection is made until used
+for key, value in {"DB_USER": "test", "DB_PASSWORD": "test", "DB_NAME": "test"}.items():
+    os.environ.setdefault(key, value)
+
+from app.services import station_service  # noqa: E402
+from app.services.station_service import LATEST_COLUMNS, StationService, _reading_dict  # noqa: E402
+
+# 15:30 in Delhi, as asyncpg returns TIMESTAMPTZ values
+IST = timezone(timedelta(hours=5, minutes=30))
+AWARE = datetime(2026, 10, 19, 15, 30, tzinfo=IST)
+
+
+def _row(ts):
+    return {c: None for c in LATEST_COLUMNS} | {"station_id": "s1", "timestamp": ts}
+
+
+def test_reading_timestamps_are_utc_with_a_single_zone_suffix():
+    assert _reading_dict(SimpleNamespace(**_row(AWARE)))["timestamp"] == "2026-10-19T10:00:00Z"
+    naive = datetime(2026, 10, 19, 10, 0)
+    assert _reading_dict(SimpleNamespace(**_row(naive)))["timestamp"] == "2026-10-19T10:00:00Z"
+
+
+@pytest.mark.asyncio
+async def test_station_lookup_formats_aware_timestamps(monkeypatch):
+    async def fetchrow(db, name, **params):
+        return _row(AWARE) if params["station_id"] == "s1" else None
+
+    monkeypatch.setattr(station_service, "CATALOG", SimpleNamespace(fetchrow=fetchrow))
+    service = StationService(None)
+    assert (await service.get_latest("s1"))["timestamp"] == "2026-10-19T10:00:00Z"
+    assert await service.get_latest("missing") is None
@@ -0,0 +1,113 @@
+import asyncio
+import os
+import struct
+import sys
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT / "backend") not in sys.path:
+    sys.path.append(str(ROOT / "backend"))
+
+# app.database builds its engine at import time; no connection is made until used
+for key, value in {"DB_USER": "test", "DB_PASSWORD": "test", "DB_NAME": "test"}.items():
+    os.environ.setdefault(key, value)
+
+from app.services import forecasting_service  # noqa: E402
+from app.services.forecasting_service import TILE_HOURS, ForecastingService  # noqa: E402
+from app.services.route_exposure import SpaceTimeGrid  # noqa: E402
+from app.services.spatial_service import SpatialService  # noqa: E402
+from app.services.tiles import (  # noqa: E402
+    TILE_ALPHA,
+    aqi_colours,
+    encode_png,
+    get_tile,
+    pixel_coordinates,
+    render_tile,
+    tile_bounds,
+)
+
+
+def _decode_png(data):
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    pos, chunks = 8, {}
+    while pos < len(data):
+        (length,) = struct.unpack(">I", data[pos : pos + 4])
+        kind, body = data[pos + 4 : pos + 8], data[pos + 8 : pos + 8 + length]
+        assert struct.unpack(">I", data[pos + 8 + length : pos + 12 + length])[0] == zlib.crc32(kind + body)
+        chunks[kind] = chunks.get(kind, b"") + body
+        pos += 12 + length
+    w, h = struct.unpack(">II", chunks[b"IHDR"][:8])
+    raw = np.frombuffer(zlib.decompress(chunks[b"IDAT"]), dtype=np.uint8).reshape(h, w * 4 + 1)
+    assert (raw[:, 0] == 1).all()
+    # Undo the Sub filter per channel
+    rows = np.cumsum(raw[:, 1:].reshape(h, w, 4).astype(np.int64), axis=1) % 256
+    return rows.astype(np.uint8)
+
+
+def _field(hours=3):
+    grid = SpatialService(None).generate_grid(28.6139, 77.2090, 30, 1)
+    lat, lon = grid.points()
+    values = np.stack([50 + 300 * (lat - lat.min()) / (lat.max() - lat.min()) + 40 * h for h in range(hours)])
+    return SpaceTimeGrid.from_grid(grid, datetime(2025, 11, 1, 6), values)
+
+
+def test_tile_geometry_follows_the_xyz_scheme():
+    assert np.allclose(tile_bounds(0, 0, 0), (-85.0511288, -180, 85.0511288, 180))
+    min_lat, min_lon, max_lat, max_lon = tile_bounds(11, 1463, 853)
+    assert min_lat < 28.6139 < max_lat and min_lon < 77.2090 < max_lon
+    lat, lon = pixel_coordinates(11, 1463, 853)
+    assert (np.diff(lat) < 0).all() and (np.diff(lon) > 0).all()
+    assert max_lat > lat[0] and lat[-1] > min_lat and min_lon < lon[0] and lon[-1] < max_lon
+
+
+def test_png_round_trips_and_colours_follow_the_aqi_scale():
+    rgba = aqi_colours(np.array([[0, 25, 150], [450, 999, np.nan]]))
+    assert tuple(rgba[0, 1, :3]) == (0, 176, 80) and tuple(rgba[0, 2, :3]) == (255, 255, 0)
+    assert tuple(rgba[1, 0]) == tuple(rgba[1, 1]) == (192, 0, 0, TILE_ALPHA)
+    assert rgba[1, 2, 3] == 0
+    image = np.random.default_rng(0).integers(0, 256, (7, 5, 4), dtype=np.uint8)
+    assert np.array_equal(_decode_png(encode_png(image)), image)
+
+
+def test_tiles_render_the_hour_and_are_cached_per_run():
+    field = _field()
+    pixels = render_tile(field, 0, 11, 1463, 853)
+    assert pixels.shape == (256, 256, 4) and (pixels[..., 3] == TILE_ALPHA).all()
+    # The raster ends inside this tile: pixels beyond it are transparent
+    edge = render_tile(field, 0, 8, 182, 106)
+    assert (edge[..., 3] == 0).any() and (edge[..., 3] > 0).any()
+    assert not render_tile(field, 0, 10, 0, 0).any()
+    # AQI rises northwards and with the hour
+    assert pixels[0, 128, 1] < pixels[-1, 128, 1]
+    assert not np.array_equal(render_tile(field, 2, 11, 1463, 853), pixels)
+
+    tile = get_tile(field, "run-a", 1, 11, 1463, 853)
+    assert np.array_equal(_decode_png(tile.png), render_tile(field, 1, 11, 1463, 853))
+    assert get_tile(field, "run-a", 1, 11, 1463, 853) is tile
+    assert get_tile(field, "run-a", 0, 11, 1463, 853).etag != tile.etag
+    other = SpaceTimeGrid(field.lat0, field.lon0, field.dlat, field.dlon, field.start, field.values + 100)
+    assert get_tile(other, "run-b", 1, 11, 1463, 853).etag != tile.etag
+
+
+@pytest.mark.asyncio
+async def test_cold_tile_field_is_built_once_off_the_event_loop(monkeypatch):
+    builds = []
+
+    def forecast_points(self, lat, lon, times):
+        builds.append(threading.get_ident())
+        return {"aqi": np.full((len(times), lat.size), 120.0)}
+
+    monkeypatch.setattr(forecasting_service, "_tile_field", {})
+    monkeypatch.setattr(forecasting_service, "_tile_lock", asyncio.Lock())
+    monkeypatch.setattr(ForecastingService, "forecast_points", forecast_points)
+    service = ForecastingService(None)
+    (first, run), (second, _) = await asyncio.gather(service.get_tile_field(), service.get_tile_field())
+    assert first is second and first.values.shape[0] == TILE_HOURS
+    assert run.startswith(service.model_version)
+    assert len(builds) == 1 and builds[0] != threading.get_ident()
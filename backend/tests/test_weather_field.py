@@ -0,0 +1,78 @@
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT / "backend") not in sys.path:
+    sys.path.append(str(ROOT / "backend"))
+
+from app.services import weather_field  # noqa: E402
+from app.services.weather_field import DEFAULTS, WeatherField, point_weather, weather_nodes  # noqa: E402
+
+T0 = datetime(2025, 11, 1)
+
+
+def _payload(lat, lon, hours, **series):
+    times = [(T0 + timedelta(hours=h)).strftime("%Y-%m-%dT%H:%M") for h in range(hours)]
+    hourly = {"time": times}
+    for key, values in series.items():
+        hourly[key] = list(values)
+    return {"latitude": lat, "longitude": lon, "hourly": hourly}
+
+
+def _field():
+    # Two nodes 20 km apart east-west; wind from 350 and 10 degrees, the east node
+    # warming by 1 degree per hour and missing its last pressure value
+    west = _payload(
+        28.6, 77.1, 3,
+        temperature_2m=[20, 20, 20], relative_humidity_2m=[50, 50, 50],
+        wind_speed_10m=[10, 10, 10], wind_direction_10m=[350, 350, 350],
+        surface_pressure=[1000, 1000, 1000],
+    )
+    east = _payload(
+        28.6, 77.3, 3,
+        temperature_2m=[30, 31, 32], relative_humidity_2m=[70, 70, 70],
+        wind_speed_10m=[10, 10, 10], wind_direction_10m=[10, 10, 10],
+        surface_pressure=[1010, 1010, None],
+    )
+    return WeatherField.from_open_meteo([west, east])
+
+
+def test_nodes_interpolate_per_point_and_hour_with_circular_wind():
+    field = _field()
+    assert field.hours == 3 and field.start == T0 and field.values["temp"].shape == (3, 2)
+    assert np.isnan(field.values["pressure"][2, 1])
+
+    lat = np.array([28.6, 28.6, 28.6])
+    lon = np.array([77.1, 77.2, 77.3])
+    grid = field.interpolate(lat, lon)
+    assert grid["temp"].shape == (3, 3) and grid["temp"].dtype == np.float32
+    # Nodes keep their own values, the midpoint averages them
+    assert np.allclose(grid["temp"][:, 0], 20) and np.allclose(grid["temp"][:, 2], [30, 31, 32])
+    assert np.allclose(grid["temp"][:, 1], [25, 25.5, 26])
+    # 350 and 10 degrees average to north, at the full speed
+    assert np.isclose(min(grid["wind_dir"][0, 1], 360 - grid["wind_dir"][0, 1]), 0, atol=1e-3)
+    assert np.allclose(grid["wind_speed"], 10)
+    # The hour without an east value falls back to the west node alone
+    assert np.allclose(grid["pressure"][:2, 1], 1005) and np.allclose(grid["pressure"][2], 1000)
+    assert field.interpolate(lat, lon) is grid
+
+    # Requested times take the nearest fetched hour, clamped to the range
+    at = field.at(lat, lon, [T0 + timedelta(minutes=80), T0 - timedelta(hours=5), T0 + timedelta(hours=9)])
+    assert np.allclose(at["temp"][:, 2], [31, 30, 32])
+
+
+def test_point_weather_follows_the_ingestion_cycle():
+    lat, lon = weather_nodes()
+    assert lat.size == 49 and np.isclose(lat.mean(), 28.6139) and np.isclose(lon.mean(), 77.2090)
+
+    weather_field.set_weather_field(None)
+    try:
+        assert point_weather(np.array([28.6]), np.array([77.2]), [T0]) == DEFAULTS
+        weather_field.set_weather_field(_field())
+        weather = point_weather(np.array([28.6, 28.6]), np.array([77.1, 77.3]), [T0, T0 + timedelta(hours=2)])
+        assert np.allclose(weather["temp"], [[20, 30], [20, 32]])
+    finally:
+        weather_field.set_weather_field(None)
@@ -0,0 +1,105 @@
+"""End-to-end runner throughput against the replay stand-in (no network access).
+
+Fixtures must be recorded first (see replay_server.py). Example:
+    python bench_runner.py --iterations 20 --latency-ms 50 --error-rate 0.02 --payload-scale 4
+
+Outputs are written to a temporary directory so real pipeline outputs are untouched.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from utils.replay import ReplayConfig, StandinServer, standin_env
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload-scale", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args()
+
+    config = ReplayConfig(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        payload_scale=args.payload_scale,
+        seed=args.seed,
+    )
+    server = StandinServer("replay", config=config).start()
+    out_dir = tempfile.mkdtemp(prefix="pipeline-bench-")
+    # Ingestors read their base URLs at import time, so set env before importing runner
+    os.environ.update(standin_env(server.base_url))
+    os.environ["PIPELINE_OUTPUT_DIR"] = out_dir
+    import runner  # noqa: E402
+    from utils.io import OUTPUT_DIR  # noqa: E402
+
+    durations = []
+    rows = 0
+    statuses = {}
+    try:
+        for i in range(args.warmup + args.iterations):
+            if i == args.warmup:
+                server.stats = type(server.stats)()
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                runner.main()
+            elapsed = time.perf_counter() - started
+            if i < args.warmup:
+                continue
+            durations.append(elapsed)
+            with open(OUTPUT_DIR / "run_manifest.json", encoding="utf-8") as f:
+                manifest = json.load(f)
+            for name, entry in manifest.items():
+                # Keys starting with "_" describe the run, not a source
+                if name.startswith("_"):
+                    continue
+                statuses.setdefault(name, {}).setdefault(entry.get("status"), 0)
+                statuses[name][entry.get("status")] += 1
+                rows += entry.get("rows") or 0
+    finally:
+        server.stop()
+
+    total = sum(durations)
+    stats = server.stats.as_dict()
+    result = {
+        "iterations": len(durations),
+        "config": vars(config),
+        "run_seconds": {
+            "mean": round(statistics.mean(durations), 4),
+            "p50": round(statistics.median(durations), 4),
+            "p95": round(sorted(durations)[max(0, int(len(durations) * 0.95) - 1)], 4),
+            "max": round(max(durations), 4),
+        },
+        "runs_per_second": round(len(durations) / total, 3),
+        "requests_per_second": round(stats["requests"] / total, 2),
+        "rows_per_second": round(rows / total, 1),
+        "mb_per_second": round(stats["bytes_sent"] / total / 1e6, 3),
+        "standin": stats,
+        "source_status": statuses,
+    }
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"[bench] {result['iterations']} runs, {result['runs_per_second']} runs/s, "
+          f"p50 {result['run_seconds']['p50']}s, p95 {result['run_seconds']['p95']}s")
+    print(f"[bench] {result['requests_per_second']} req/s, {result['rows_per_second']} rows/s, "
+          f"{result['mb_per_second']} MB/s")
+    print(f"[bench] stand-in: {stats}")
+    if stats["misses"]:
+        print("[bench] WARNING: some requests had no fixture; record fixtures first (replay_server.py --mode record)")
+    print(f"[bench] source status: {statuses}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,20 @@
-import requests
-from typing import Dict, Any
+import os
+from typing import Any, Dict, List, Sequence, Union
 
-OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+from utils.http import get as http_get
 
+OPEN_METEO_BASE = os.getenv("OPEN_METEO_BASE", "https://api.open-meteo.com/v1")
+OPEN_METEO_URL = f"{OPEN_METEO_BASE}/forecast"
 
-def fetch_hourly_weather(lat: float, lon: float) -> Dict[str, Any]:
+
+def fetch_hourly_weather(
+    lat: Union[float, Sequence[float]], lon: Union[float, Sequence[float]]
+) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+    """Hourly weather for one point, or for many in one request when ``lat`` and
+    ``lon`` are sequences (the response is then a list with one object per point)."""
+    if not isinstance(lat, (int, float)):
+        lat = ",".join(f"{v:.4f}" for v in lat)
+        lon = ",".join(f"{v:.4f}" for v in lon)
     params = {
         "latitude": lat,
         "longitude": lon,
@@ -18,6 +28,6 @@ def fetch_hourly_weather(lat: float, lon: float) -> Dict[str, Any]:
         "forecast_days": 3,
         "timezone": "UTC",
     }
-    r = requests.get(OPEN_METEO_URL, params=params, timeout=30)
+    r = http_get(OPEN_METEO_URL, params=params, timeout=30)
     r.raise_for_status()
     return r.json()
@@ -1,7 +1,10 @@
-import requests
+import os
 from typing import Dict, Any
 
-OPEN_METEO_AIR_URL = "https://air-quality-api.open-meteo.com/v1/air-quality"
+from utils.http import get as http_get
+
+OPEN_METEO_AIR_BASE = os.getenv("OPEN_METEO_AIR_BASE", "https://air-quality-api.open-meteo.com/v1")
+OPEN_METEO_AIR_URL = f"{OPEN_METEO_AIR_BASE}/air-quality"
 
 
 def fetch_hourly_air_quality(lat: float, lon: float) -> Dict[str, Any]:
@@ -19,6 +22,6 @@ def fetch_hourly_air_quality(lat: float, lon: float) -> Dict[str, Any]:
         "forecast_days": 3,
         "timezone": "UTC",
     }
-    r = requests.get(OPEN_METEO_AIR_URL, params=params, timeout=30)
+    r = http_get(OPEN_METEO_AIR_URL, params=params, timeout=30)
     r.raise_for_status()
     return r.json()
@@ -1,7 +1,10 @@
-import requests
+import os
 from typing import Dict, Any
 
-AIR_QUALITY_URL = "https://air-quality-api.open-meteo.com/v1/air-quality"
+from utils.http import get as http_get
+
+OPEN_METEO_AIR_BASE = os.getenv("OPEN_METEO_AIR_BASE", "https://air-quality-api.open-meteo.com/v1")
+AIR_QUALITY_URL = f"{OPEN_METEO_AIR_BASE}/air-quality"
 
 
 def fetch_air_quality(lat: float, lon: float, hours: int = 72) -> Dict[str, Any]:
@@ -14,7 +17,7 @@ def fetch_air_quality(lat: float, lon: float, hours: int = 72) -> Dict[str, Any]
         "hourly": "pm2_5,pm10,carbon_monoxide,nitrogen_dioxide,ozone,sulphur_dioxide,ammonia",  # add more if needed
         "timezone": "UTC",
     }
-    r = requests.get(AIR_QUALITY_URL, params=params, timeout=30)
+    r = http_get(AIR_QUALITY_URL, params=params, timeout=30)
     r.raise_for_status()
     data = r.json()
     # Optionally trim hours if requested < default
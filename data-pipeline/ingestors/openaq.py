@@ -1,27 +1,122 @@
+import contextvars
 import os
-from typing import Dict, Any, List, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 import requests
 from datetime import datetime, timedelta, timezone
 
+from utils.http import get as http_get
+
 # Allow overriding the base URL or disabling OpenAQ ingestion via environment vars.
 OPENAQ_BASE = os.getenv("OPENAQ_BASE", "https://api.openaq.org/v2")
 OPENAQ_ENABLED = os.getenv("OPENAQ_ENABLED", "true").lower() not in {"0", "false", "no"}
 
+# Pagination controls: pages after the first are fetched concurrently, never more than
+# OPENAQ_PAGE_CONCURRENCY at once, and never beyond OPENAQ_MAX_PAGES in total.
+OPENAQ_PAGE_CONCURRENCY = int(os.getenv("OPENAQ_PAGE_CONCURRENCY", "4"))
+OPENAQ_MAX_PAGES = int(os.getenv("OPENAQ_MAX_PAGES", "20"))
+
 # Delhi bounding box (approx): [min_lon, min_lat, max_lon, max_lat]
 DELHI_BBOX = [76.84, 27.60, 77.58, 28.90]
 
 DEFAULT_PARAMETERS = ["pm25", "pm10", "no2", "so2", "o3", "co"]
 
+# Column order of the merged measurement batch
+COLUMNS = [
+    "datetime",
+    "location_id",
+    "location",
+    "parameter",
+    "value",
+    "unit",
+    "latitude",
+    "longitude",
+    "city",
+    "country",
+]
+
 
 class OpenAQDisabled(Exception):
     pass
 
 
+def _fetch_page(params: Dict[str, Any], page: int) -> Tuple[requests.Response, float]:
+    started = time.perf_counter()
+    r = http_get(
+        f"{OPENAQ_BASE}/measurements",
+        params={**params, "page": page},
+        timeout=30,
+        headers={"Accept": "application/json"},
+    )
+    return r, time.perf_counter() - started
+
+
+def _total_pages(meta: Dict[str, Any], limit: int, max_pages: int) -> Optional[int]:
+    """Page count implied by ``meta.found``; None when OpenAQ only reports a lower bound (e.g. ">10000")."""
+    found = meta.get("found")
+    if isinstance(found, int):
+        return max(1, min(max_pages, -(-found // limit)))
+    return None
+
+
+def _merge_columnar(pages: List[List[Dict[str, Any]]]) -> Tuple[Dict[str, List[Any]], int]:
+    """Flatten result rows from all pages into columns, dropping duplicate measurements.
+
+    Pages can overlap when new measurements arrive between page requests, so rows are
+    keyed on (location, parameter, UTC timestamp).
+    """
+    columns: Dict[str, List[Any]] = {c: [] for c in COLUMNS}
+    seen = set()
+    duplicates = 0
+    for rows in pages:
+        for row in rows:
+            ts = (row.get("date") or {}).get("utc")
+            location_id = row.get("locationId")
+            key = (location_id if location_id is not None else row.get("location"), row.get("parameter"), ts)
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            coords = row.get("coordinates") or {}
+            columns["datetime"].append(ts)
+            columns["location_id"].append(location_id)
+            columns["location"].append(row.get("location"))
+            columns["parameter"].append(row.get("parameter"))
+            columns["value"].append(row.get("value"))
+            columns["unit"].append(row.get("unit"))
+            columns["latitude"].append(coords.get("latitude"))
+            columns["longitude"].append(coords.get("longitude"))
+            columns["city"].append(row.get("city"))
+            columns["country"].append(row.get("country"))
+    return columns, duplicates
+
+
+def columnar_batch(pages: List[List[Dict[str, Any]]], page_timings: Optional[List[Dict[str, Any]]] = None,
+                   **meta: Any) -> Dict[str, Any]:
+    """Columnar batch of result pages, as returned by ``fetch_measurements``; ``meta``
+    entries are added to the batch's own (pages, rows, duplicates) counts."""
+    columns, duplicates = _merge_columnar(pages)
+    return {
+        "meta": {**meta, "pages": len(pages), "rows": len(columns["datetime"]), "duplicates": duplicates},
+        "columns": columns,
+        "page_timings": page_timings or [],
+    }
+
+
 def fetch_measurements(limit: int = 1000, hours: int = 24, bbox: Optional[List[float]] = None,
-                       parameters: Optional[List[str]] = None) -> Dict[str, Any]:
+                       parameters: Optional[List[str]] = None, max_pages: Optional[int] = None,
+                       concurrency: Optional[int] = None) -> Dict[str, Any]:
     """Fetch recent measurements for a bounding box (fallback for CPCB).
 
-    Returns JSON dict on success. Raises for network/HTTP errors (except 410 which is rephrased).
+    The first page is fetched alone to discover the total count (``meta.found``); the
+    remaining pages are then fetched concurrently, at most ``concurrency`` at a time.
+    When OpenAQ only reports a lower bound for the count, pages are fetched in waves of
+    ``concurrency`` until a short page is returned or ``max_pages`` is reached.
+
+    Returns a columnar batch: ``{"meta": ..., "columns": {name: [...]}, "page_timings": [...]}``.
+    Raises for network/HTTP errors (except 410, which returns an empty batch with
+    ``meta.status_code`` 410).
     If OPENAQ_ENABLED is false, raises OpenAQDisabled.
     """
     if not OPENAQ_ENABLED:
@@ -31,14 +126,14 @@ def fetch_measurements(limit: int = 1000, hours: int = 24, bbox: Optional[List[f
         bbox = DELHI_BBOX
     if parameters is None:
         parameters = DEFAULT_PARAMETERS
+    max_pages = max_pages or OPENAQ_MAX_PAGES
+    concurrency = max(1, concurrency or OPENAQ_PAGE_CONCURRENCY)
 
     date_to = datetime.now(timezone.utc)
     date_from = date_to - timedelta(hours=hours)
 
     params = {
         "limit": limit,
-        "page": 1,
-        "offset": 0,
         "sort": "desc",
         "order_by": "datetime",
         "date_from": date_from.replace(microsecond=0).isoformat(),
@@ -47,21 +142,59 @@ def fetch_measurements(limit: int = 1000, hours: int = 24, bbox: Optional[List[f
         "bbox": ",".join(map(str, bbox)),
     }
     try:
-        r = requests.get(f"{OPENAQ_BASE}/measurements", params=params, timeout=30, headers={"Accept": "application/json"})
+        r, elapsed = _fetch_page(params, 1)
         if r.status_code == 410:
-            # Provide a structured stub so caller can decide to synthesize.
-            return {
-                "results": [],
-                "warning": "OpenAQ measurements endpoint responded 410 (Gone) - API version or parameters may have changed.",
-                "status_code": 410,
-                "requested": {
+            # Provide an empty batch so caller can decide to synthesize.
+            return columnar_batch(
+                [],
+                warning=(
+                    "OpenAQ measurements endpoint responded 410 (Gone) - "
+                    "API version or parameters may have changed."
+                ),
+                status_code=410,
+                requested={
                     "hours": hours,
                     "bbox": bbox,
                     "parameters": parameters
-                }
-            }
+                },
+            )
         r.raise_for_status()
-        return r.json()
+        first = r.json()
+        meta = first.get("meta") or {}
+        pages: List[List[Dict[str, Any]]] = [first.get("results") or []]
+        page_timings = [{"page": 1, "seconds": round(elapsed, 4), "rows": len(pages[0])}]
+
+        def fetch_rows(page: int) -> List[Dict[str, Any]]:
+            resp, secs = _fetch_page(params, page)
+            resp.raise_for_status()
+            rows = resp.json().get("results") or []
+            page_timings.append({"page": page, "seconds": round(secs, 4), "rows": len(rows)})
+            return rows
+
+        def fetch_many(pool: ThreadPoolExecutor, page_numbers: range) -> List[List[Dict[str, Any]]]:
+            # Run each page in a copy of this context so stage accounting follows the threads
+            contexts = [contextvars.copy_context() for _ in page_numbers]
+            return list(pool.map(lambda ctx, page: ctx.run(fetch_rows, page), contexts, page_numbers))
+
+        total = _total_pages(meta, limit, max_pages)
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            if total is not None:
+                pages.extend(fetch_many(pool, range(2, total + 1)))
+            else:
+                next_page = 2
+                while len(pages[-1]) >= limit and next_page <= max_pages:
+                    wave = range(next_page, min(next_page + concurrency, max_pages + 1))
+                    pages.extend(fetch_many(pool, wave))
+                    next_page = wave.stop
+
+        page_timings.sort(key=lambda t: t["page"])
+        found = meta.get("found")
+        if isinstance(found, int):
+            truncated = found > len(pages) * limit
+        else:
+            # Only a lower bound: the page cap was hit while pages were still full
+            truncated = len(pages) >= max_pages and len(pages[-1]) >= limit
+        return columnar_batch(pages, page_timings, found=found, limit=limit, truncated=truncated)
     except requests.RequestException as e:
         # Re-raise so runner can capture and log uniformly.
         raise
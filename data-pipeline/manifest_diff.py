@@ -0,0 +1,109 @@
+"""Compare two run manifests and flag ingestion regressions.
+
+    python manifest_diff.py old_run_manifest.json output/run_manifest.json --threshold 0.25
+
+A source regresses when its status degrades, its row count drops, or a stage's wall
+time / peak memory grows by more than ``--threshold`` (relative). Exit code is 1 when
+``--fail-on-regression`` is set and any regression was found.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+STATUS_RANK = {"ok": 0, "synthetic": 1, "gone": 2, "error": 3}
+STAGE_FIELDS = ["seconds", "rows_out", "bytes", "retries", "peak_memory_bytes"]
+# Fields where an increase is bad (rows_out is bad when it decreases)
+GROWTH_IS_BAD = {"seconds", "retries", "peak_memory_bytes"}
+
+
+def _rel(old: Optional[float], new: Optional[float]) -> Optional[float]:
+    if old is None or new is None:
+        return None
+    if old == 0:
+        return None if new == 0 else float("inf")
+    return (new - old) / old
+
+
+def _fmt(value: Any) -> str:
+    return "-" if value is None else str(value)
+
+
+def diff_manifests(old: Dict[str, Any], new: Dict[str, Any], threshold: float) -> Dict[str, Any]:
+    sources = sorted(k for k in set(old) | set(new) if not k.startswith("_"))
+    report: Dict[str, Any] = {"sources": {}, "regressions": []}
+    for name in sources:
+        a, b = old.get(name) or {}, new.get(name) or {}
+        entry: Dict[str, Any] = {
+            "status": [a.get("status"), b.get("status")],
+            "rows": [a.get("rows"), b.get("rows")],
+            "stages": {},
+        }
+        regressions: List[str] = []
+        if STATUS_RANK.get(b.get("status"), 3) > STATUS_RANK.get(a.get("status"), 3):
+            regressions.append(f"status {a.get('status')} -> {b.get('status')}")
+        rows_change = _rel(a.get("rows"), b.get("rows"))
+        if rows_change is not None and rows_change < -threshold:
+            regressions.append(f"rows {a.get('rows')} -> {b.get('rows')}")
+        stages_a, stages_b = a.get("stages") or {}, b.get("stages") or {}
+        for stage in sorted(set(stages_a) | set(stages_b)):
+            sa, sb = stages_a.get(stage) or {}, stages_b.get(stage) or {}
+            fields = {}
+            for field in STAGE_FIELDS:
+                change = _rel(sa.get(field), sb.get(field))
+                fields[field] = [sa.get(field), sb.get(field), change]
+                if change is None:
+                    continue
+                if field in GROWTH_IS_BAD and change > threshold and (field != "retries" or sb.get(field)):
+                    regressions.append(f"{stage}.{field} {_fmt(sa.get(field))} -> {_fmt(sb.get(field))}")
+            entry["stages"][stage] = fields
+        entry["regressions"] = regressions
+        report["sources"][name] = entry
+        report["regressions"].extend(f"{name}: {r}" for r in regressions)
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    for name, entry in report["sources"].items():
+        status = " -> ".join(_fmt(s) for s in entry["status"])
+        rows = " -> ".join(_fmt(r) for r in entry["rows"])
+        print(f"{name}: status {status}, rows {rows}")
+        for stage, fields in entry["stages"].items():
+            parts = []
+            for field, (a, b, change) in fields.items():
+                if a is None and b is None:
+                    continue
+                pct = "" if change is None else f" ({change:+.0%})" if change != float("inf") else " (new)"
+                parts.append(f"{field} {_fmt(a)} -> {_fmt(b)}{pct}")
+            print(f"  {stage:<9} " + "; ".join(parts))
+    if report["regressions"]:
+        print("\nRegressions:")
+        for r in report["regressions"]:
+            print(f"  - {r}")
+    else:
+        print("\nNo regressions.")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative change treated as a regression")
+    parser.add_argument("--json", action="store_true", help="Print the diff as JSON")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    with open(args.old, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    report = diff_manifests(old, new, args.threshold)
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        print_report(report)
+    return 1 if args.fail_on_regression and report["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
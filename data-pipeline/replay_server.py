@@ -0,0 +1,47 @@
+"""Run the upstream stand-in on its own.
+
+Record fixtures from the live APIs (runs the normal runner through the stand-in):
+    python replay_server.py --mode record --port 8765 &
+    OPENAQ_BASE=http://127.0.0.1:8765/openaq ... python runner.py
+
+Replay them with injected latency / errors:
+    python replay_server.py --mode replay --port 8765 --latency-ms 80 --error-rate 0.05
+"""
+import argparse
+
+from utils.replay import ReplayConfig, StandinServer, standin_env
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["record", "replay"], default="replay")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload-scale", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = ReplayConfig(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        payload_scale=args.payload_scale,
+        seed=args.seed,
+    )
+    server = StandinServer(args.mode, args.host, args.port, config=config)
+    print(f"[standin] {args.mode} mode on {server.base_url}")
+    for key, value in standin_env(server.base_url).items():
+        print(f"  {key}={value}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"[standin] stats: {server.stats.as_dict()}")
+
+
+if __name__ == "__main__":
+    main()
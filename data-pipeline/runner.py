@@ -1,36 +1,80 @@
 import os
 from dotenv import load_dotenv
-from ingestors.openaq import fetch_measurements
+from ingestors.openaq import columnar_batch, fetch_measurements
 from ingestors.firms import fetch_fires_24h
 from ingestors.open_meteo import fetch_hourly_weather
 from ingestors.open_meteo_air_quality import fetch_air_quality
 from utils.io import write_json, write_csv, OUTPUT_DIR
+from utils.stages import StageRecorder
+from utils.validate import count_rows, validate
 import traceback
 import json
-from datetime import datetime, timezone
+import time
+from datetime import datetime, timedelta, timezone
 
 # Load root .env if present
 load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
 
 
+def synthetic_openaq(hours: int = 24):
+    """Surrogate OpenAQ batch (hourly PM2.5 at one Delhi station) in the columnar shape
+    of fetch_measurements, so training still has input when OpenAQ is unavailable."""
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    rows = [
+        {
+            "date": {"utc": (now - timedelta(hours=h)).isoformat()},
+            "parameter": "pm25",
+            "value": 90.0,
+            "unit": "µg/m³",
+            "location": "synthetic_station",
+            "city": "Delhi",
+            "country": "IN",
+            "coordinates": {"latitude": 28.61, "longitude": 77.21}
+        }
+        for h in range(hours)
+    ]
+    return columnar_batch([rows], synthetic=True)
+
+
 def main():
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
     artifacts = {}
+    run_started = time.perf_counter()
+    started_at = datetime.now(timezone.utc).isoformat()
 
-    # Helper to wrap fetches
+    # Helper to wrap fetches; every stage (fetch, parse, validate, write) is timed and
+    # accounted for in the manifest entry of the source
     def attempt(name, func, writer, filename):
         print(f"[START] {name}")
+        recorder = StageRecorder()
         try:
-            data = func()
+            with recorder.stage("fetch"):
+                data = func()
             # Special handling: OpenAQ may return structured 410 stub (empty results but not exception)
-            if name == "openaq" and isinstance(data, dict) and data.get("status_code") == 410:
+            meta = data.get("meta", {}) if isinstance(data, dict) else {}
+            if name == "openaq" and meta.get("status_code") == 410:
                 print("[WARN] OpenAQ returned 410 (Gone); will synthesize surrogate dataset.")
-                artifacts[name] = {"status": "gone", "message": data.get("warning", "410 Gone"), "file": None}
+                artifacts[name] = {"status": "gone", "message": meta.get("warning", "410 Gone"), "file": None}
             else:
-                path = writer(data, filename)
+                with recorder.stage("parse") as st:
+                    st.rows_out = count_rows(data)
+                with recorder.stage("validate", rows_in=st.rows_out) as st:
+                    st.rows_out, issues = validate(data)
+                with recorder.stage("write", rows_in=count_rows(data)) as st:
+                    path = writer(data, filename)
+                    st.rows_out = st.rows_in
+                    st.bytes = os.path.getsize(path)
                 print(f"[OK] {name} -> {path}")
                 artifacts[name] = {"status": "ok", "file": path}
+                if issues:
+                    artifacts[name]["issues"] = issues
+                # Paginated ingestors (OpenAQ) report per-page timings alongside the merged batch
+                if isinstance(data, dict) and "page_timings" in data:
+                    artifacts[name]["pages"] = data["page_timings"]
+                    artifacts[name]["rows"] = data.get("meta", {}).get("rows")
+                else:
+                    artifacts[name]["rows"] = count_rows(data)
         except Exception as e:
             print(f"[FAIL] {name}: {e}")
             traceback.print_exc()
@@ -38,6 +82,8 @@ def main():
             stub = {"error": str(e), "name": name, "timestamp": datetime.now(timezone.utc).isoformat()}
             path = write_json(stub, f"failed_{filename.replace('.json','')}.json") if filename.endswith('.json') else write_csv(str(stub), f"failed_{filename}")
             artifacts[name] = {"status": "error", "file": path, "message": str(e)}
+        artifacts[name]["stages"] = recorder.as_dict()
+        artifacts[name]["seconds"] = round(recorder.total_seconds(), 4)
 
     # OpenAQ (fallback; if fails we will synthesize minimal dataset for training)
     def fetch_openaq():
@@ -62,26 +108,18 @@ def main():
     # If OpenAQ failed, synthesize a simple surrogate dataset compatible with training script
     if artifacts.get("openaq", {}).get("status") in {"gone", "error"}:
         print("[INFO] Generating synthetic OpenAQ-like dataset for continuity…")
-        synthetic = {
-            "results": [
-                {
-                    "date": {"utc": datetime.now(timezone.utc).isoformat()},
-                    "parameter": "pm25",
-                    "value": 90.0,
-                    "unit": "µg/m³",
-                    "location": "synthetic_station",
-                    "city": "Delhi",
-                    "country": "IN",
-                    "coordinates": {"latitude": 28.61, "longitude": 77.21}
-                }
-                for _ in range(24)
-            ]
-        }
+        synthetic = synthetic_openaq(hours=24)
         synth_path = write_json(synthetic, "openaq_delhi_24h.json")
-        artifacts["openaq"] = {"status": "synthetic", "file": synth_path}
+        artifacts["openaq"] = {
+            **artifacts["openaq"], "status": "synthetic", "file": synth_path, "rows": synthetic["meta"]["rows"]
+        }
         print(f"[OK] Synthetic OpenAQ dataset -> {synth_path}")
 
-    # Summary manifest
+    # Summary manifest; keys starting with "_" describe the run rather than a source
+    artifacts["_run"] = {
+        "started_at": started_at,
+        "seconds": round(time.perf_counter() - run_started, 4),
+    }
     manifest_path = write_json(artifacts, "run_manifest.json")
     print(f"Run manifest: {manifest_path}")
     print("Done.")
@@ -0,0 +1,54 @@
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+import requests
+
+from utils.stages import current_stage
+
+# Transient upstream failures (connection errors, 429/5xx) are retried with
+# exponential backoff before the error reaches the caller. Callers that retry whole
+# fetches themselves (the backend scheduler) switch this off with ``retries_off``.
+HTTP_RETRIES = int(os.getenv("PIPELINE_HTTP_RETRIES", "2"))
+HTTP_BACKOFF_SECONDS = float(os.getenv("PIPELINE_HTTP_BACKOFF_SECONDS", "1"))
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+_retries: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("http_retries", default=None)
+
+
+@contextmanager
+def retries_off() -> Iterator[None]:
+    """Make ``get`` try once within this context (and threads run in copies of it)."""
+    token = _retries.set(0)
+    try:
+        yield
+    finally:
+        _retries.reset(token)
+
+
+def get(url: str, retries: Optional[int] = None, **kwargs: Any) -> requests.Response:
+    """``requests.get`` with retries; bytes and retries are charged to the active stage.
+
+    ``retries`` defaults to HTTP_RETRIES, or 0 inside ``retries_off``.
+    """
+    if retries is None:
+        override = _retries.get()
+        retries = HTTP_RETRIES if override is None else override
+    stage = current_stage()
+    for attempt in range(retries + 1):
+        try:
+            r = requests.get(url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == retries:
+                raise
+        else:
+            if stage is not None:
+                stage.add_bytes(len(r.content))
+            if r.status_code not in RETRY_STATUS or attempt == retries:
+                return r
+        if stage is not None:
+            stage.add_retry()
+        time.sleep(HTTP_BACKOFF_SECONDS * 2**attempt)
+    raise AssertionError("unreachable")
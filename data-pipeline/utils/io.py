@@ -1,9 +1,10 @@
 import csv
 import json
+import os
 from pathlib import Path
 from typing import Any, Dict
 
-OUTPUT_DIR = Path(__file__).resolve().parents[1] / "output"
+OUTPUT_DIR = Path(os.getenv("PIPELINE_OUTPUT_DIR") or Path(__file__).resolve().parents[1] / "output")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 
@@ -0,0 +1,234 @@
+"""Record/replay stand-in for the upstream APIs used by the ingestors.
+
+Each upstream is mounted under a path prefix (``/openaq/...``, ``/firms/...``, ...).
+In ``record`` mode requests are forwarded to the real API and the responses saved as
+fixtures; in ``replay`` mode the fixtures are served back with configurable latency,
+error rate and payload scaling so the pipeline can be benchmarked offline.
+
+Point the ingestors at a running stand-in with the env vars from ``standin_env``.
+"""
+import base64
+import copy
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit, urlencode
+
+import requests
+
+FIXTURES_DIR = Path(os.getenv("PIPELINE_FIXTURES_DIR") or Path(__file__).resolve().parents[1] / "fixtures")
+
+# Path prefix -> (real upstream base URL, env var the ingestors read it from)
+UPSTREAMS = {
+    "openaq": ("https://api.openaq.org/v2", "OPENAQ_BASE"),
+    "firms": ("https://firms.modaps.eosdis.nasa.gov/api", "FIRMS_BASE"),
+    "open-meteo": ("https://api.open-meteo.com/v1", "OPEN_METEO_BASE"),
+    "air-quality": ("https://air-quality-api.open-meteo.com/v1", "OPEN_METEO_AIR_BASE"),
+}
+
+# Query parameters that change on every run (relative time windows) and must not
+# take part in fixture matching.
+VOLATILE_PARAMS = {"date_from", "date_to"}
+
+
+def standin_env(base_url: str) -> Dict[str, str]:
+    """Environment overrides that route every ingestor through the stand-in."""
+    return {env: f"{base_url.rstrip('/')}/{prefix}" for prefix, (_, env) in UPSTREAMS.items()}
+
+
+def fixture_key(path: str, query: str) -> str:
+    params = sorted((k, v) for k, v in parse_qsl(query, keep_blank_values=True) if k not in VOLATILE_PARAMS)
+    digest = hashlib.sha1(f"{path}?{urlencode(params)}".encode("utf-8")).hexdigest()[:16]
+    return digest
+
+
+@dataclass
+class ReplayConfig:
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    payload_scale: int = 1
+    seed: int = 0
+
+
+@dataclass
+class StandinStats:
+    requests: int = 0
+    errors: int = 0
+    misses: int = 0
+    bytes_sent: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, sent: int, error: bool = False, miss: bool = False) -> None:
+        with self.lock:
+            self.requests += 1
+            self.bytes_sent += sent
+            self.errors += int(error)
+            self.misses += int(miss)
+
+    def as_dict(self) -> Dict[str, int]:
+        return {"requests": self.requests, "errors": self.errors, "misses": self.misses, "bytes_sent": self.bytes_sent}
+
+
+class FixtureStore:
+    def __init__(self, root: Path = FIXTURES_DIR) -> None:
+        self.root = root
+
+    def _path(self, prefix: str, key: str) -> Path:
+        return self.root / prefix / f"{key}.json"
+
+    def save(self, prefix: str, key: str, url: str, status: int, content_type: str, body: bytes) -> Path:
+        path = self._path(prefix, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        record = {
+            "url": url,
+            "status": status,
+            "content_type": content_type,
+            "body_b64": base64.b64encode(body).decode("ascii"),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+        return path
+
+    def load(self, prefix: str, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(prefix, key)
+        if not path.exists():
+            return None
+        with open(path, encoding="utf-8") as f:
+            record = json.load(f)
+        record["body"] = base64.b64decode(record.pop("body_b64"))
+        return record
+
+
+def scale_payload(body: bytes, content_type: str, scale: int) -> bytes:
+    """Enlarge a recorded payload ``scale`` times while keeping it parseable.
+
+    JSON ``results`` lists are repeated with shifted ``locationId`` so the copies are
+    not deduplicated away; each recorded page grows, the page count does not. CSV
+    bodies repeat their data rows. Other payloads (fixed-length hourly series) are
+    returned unchanged.
+    """
+    if scale <= 1:
+        return body
+    if "json" in content_type:
+        data = json.loads(body)
+        rows = data.get("results") if isinstance(data, dict) else None
+        if not isinstance(rows, list):
+            return body
+        scaled = []
+        for k in range(scale):
+            for row in rows:
+                row = copy.deepcopy(row)
+                if isinstance(row.get("locationId"), int):
+                    row["locationId"] += k * 1_000_000
+                scaled.append(row)
+        # meta.found stays as recorded: paginating clients derive their page count from
+        # it, and pages beyond the recorded ones have no fixtures
+        data["results"] = scaled
+        return json.dumps(data).encode("utf-8")
+    if "csv" in content_type or "text" in content_type:
+        lines = body.decode("utf-8").splitlines()
+        if len(lines) < 2 or "," not in lines[0]:
+            return body
+        return ("\n".join([lines[0]] + lines[1:] * scale) + "\n").encode("utf-8")
+    return body
+
+
+class StandinServer:
+    """Threaded HTTP stand-in; ``mode`` is ``record`` or ``replay``."""
+
+    def __init__(
+        self,
+        mode: str = "replay",
+        host: str = "127.0.0.1",
+        port: int = 0,
+        store: Optional[FixtureStore] = None,
+        config: Optional[ReplayConfig] = None,
+    ) -> None:
+        if mode not in {"record", "replay"}:
+            raise ValueError(f"Unknown stand-in mode: {mode}")
+        self.mode = mode
+        self.store = store or FixtureStore()
+        self.config = config or ReplayConfig()
+        self.stats = StandinStats()
+        self._rng = random.Random(self.config.seed)
+        self._rng_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandinServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _roll(self) -> Tuple[float, bool]:
+        cfg = self.config
+        with self._rng_lock:
+            delay = cfg.latency_ms + self._rng.uniform(0, cfg.latency_jitter_ms)
+            fail = self._rng.random() < cfg.error_rate
+        return delay / 1000.0, fail
+
+    def handle(self, raw_path: str) -> Tuple[int, str, bytes]:
+        parts = urlsplit(raw_path)
+        prefix, _, rest = parts.path.lstrip("/").partition("/")
+        if prefix not in UPSTREAMS:
+            return 404, "text/plain", f"Unknown upstream prefix: {prefix}".encode("utf-8")
+        key = fixture_key(parts.path, parts.query)
+
+        if self.mode == "record":
+            upstream = f"{UPSTREAMS[prefix][0]}/{rest}"
+            r = requests.get(upstream, params=parse_qsl(parts.query, keep_blank_values=True), timeout=60)
+            content_type = r.headers.get("Content-Type", "application/octet-stream")
+            self.store.save(prefix, key, r.url, r.status_code, content_type, r.content)
+            return r.status_code, content_type, r.content
+
+        delay, fail = self._roll()
+        if delay:
+            time.sleep(delay)
+        if fail:
+            return 503, "text/plain", b"Injected stand-in failure"
+        record = self.store.load(prefix, key)
+        if record is None:
+            return 404, "text/plain", f"No fixture for {parts.path} ({key})".encode("utf-8")
+        body = scale_payload(record["body"], record["content_type"], self.config.payload_scale)
+        return record["status"], record["content_type"], body
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 (http.server naming)
+                try:
+                    status, content_type, body = server.handle(self.path)
+                except Exception as e:  # Broad by design: report upstream/fixture errors as 502
+                    status, content_type, body = 502, "text/plain", str(e).encode("utf-8")
+                server.stats.add(len(body), error=status >= 500, miss=status == 404)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
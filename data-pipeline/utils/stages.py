@@ -0,0 +1,115 @@
+"""Per-stage accounting (fetch / parse / validate / write) for pipeline runs.
+
+Each stage records wall time, rows in/out, bytes transferred, retries and the traced
+peak memory while it ran. HTTP helpers in ``utils.http`` attribute bytes and retries
+to the active stage through a context variable, so worker threads must run inside a
+copy of the caller's context (``contextvars.copy_context().run``).
+
+Peak memory uses ``tracemalloc`` and is process-wide: concurrent stages see each
+other's allocations. Tracing is only switched on while a stage with
+``track_memory=True`` is running.
+"""
+import contextvars
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+STAGES = ("fetch", "parse", "validate", "write")
+
+_current: contextvars.ContextVar[Optional["StageStats"]] = contextvars.ContextVar("pipeline_stage", default=None)
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+
+
+@dataclass
+class StageStats:
+    name: str
+    seconds: float = 0.0
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    bytes: int = 0
+    retries: int = 0
+    peak_memory_bytes: Optional[int] = None
+    status: str = "ok"
+    error: Optional[str] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add_bytes(self, n: int) -> None:
+        with self._lock:
+            self.bytes += n
+
+    def add_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "seconds": round(self.seconds, 4),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "bytes": self.bytes,
+            "retries": self.retries,
+            "peak_memory_bytes": self.peak_memory_bytes,
+            "status": self.status,
+            **({"error": self.error} if self.error else {}),
+        }
+
+
+def current_stage() -> Optional[StageStats]:
+    return _current.get()
+
+
+def _start_tracing() -> None:
+    global _tracing_users
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracing_users += 1
+        tracemalloc.reset_peak()
+
+
+def _stop_tracing() -> int:
+    global _tracing_users
+    with _tracing_lock:
+        peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+        _tracing_users -= 1
+        if _tracing_users == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+    return peak
+
+
+class StageRecorder:
+    """Collects StageStats for one source run."""
+
+    def __init__(self, track_memory: bool = True) -> None:
+        self.track_memory = track_memory
+        self.stages: List[StageStats] = []
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None) -> Iterator[StageStats]:
+        stats = StageStats(name, rows_in=rows_in)
+        self.stages.append(stats)
+        token = _current.set(stats)
+        if self.track_memory:
+            _start_tracing()
+        started = time.perf_counter()
+        try:
+            yield stats
+        except BaseException as e:
+            stats.status = "error"
+            stats.error = str(e) or e.__class__.__name__
+            raise
+        finally:
+            stats.seconds = time.perf_counter() - started
+            if self.track_memory:
+                stats.peak_memory_bytes = _stop_tracing()
+            _current.reset(token)
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {s.name: s.as_dict() for s in self.stages}
+
+    def total_seconds(self) -> float:
+        return sum(s.seconds for s in self.stages)
@@ -0,0 +1,65 @@
+import os
+from typing import Any, List, Tuple
+
+# Hourly variables with more missing values than this fraction are reported as issues
+MAX_NULL_FRACTION = float(os.getenv("PIPELINE_MAX_NULL_FRACTION", "0.5"))
+
+
+def _csv_lines(text: str) -> List[str]:
+    lines = [line for line in text.splitlines() if line.strip()]
+    # Error pages (e.g. FIRMS "Invalid API call.") have no CSV header
+    return lines if lines and "," in lines[0] else []
+
+
+def count_rows(data: Any) -> int:
+    """Number of records in a raw ingestor payload (columnar batch, hourly series or CSV)."""
+    if isinstance(data, str):
+        return max(0, len(_csv_lines(data)) - 1)
+    if isinstance(data, list):
+        # Multi-location response
+        return sum(count_rows(d) for d in data)
+    if isinstance(data, dict):
+        if "columns" in data:
+            return len(data["columns"].get("datetime") or [])
+        if "hourly" in data:
+            return len(data["hourly"].get("time") or [])
+        if "results" in data:
+            return len(data["results"])
+    return 0
+
+
+def validate(data: Any) -> Tuple[int, List[str]]:
+    """Return (number of usable rows, list of quality issues) for a raw payload."""
+    issues: List[str] = []
+    if isinstance(data, str):
+        lines = _csv_lines(data)
+        if not lines:
+            return 0, ["payload is not CSV"]
+        width = lines[0].count(",")
+        valid = sum(1 for line in lines[1:] if line.count(",") == width)
+        if valid < len(lines) - 1:
+            issues.append(f"{len(lines) - 1 - valid} malformed CSV rows")
+    elif isinstance(data, dict) and "columns" in data:
+        cols = data["columns"]
+        valid = sum(
+            1
+            for v, lat, lon in zip(cols.get("value") or [], cols.get("latitude") or [], cols.get("longitude") or [])
+            if v is not None and lat is not None and lon is not None
+        )
+        missing = count_rows(data) - valid
+        if missing:
+            issues.append(f"{missing} measurements missing value or coordinates")
+    elif isinstance(data, dict) and "hourly" in data:
+        hourly = data["hourly"]
+        n = len(hourly.get("time") or [])
+        series = {k: v for k, v in hourly.items() if k != "time" and isinstance(v, list)}
+        valid = sum(1 for i in range(n) if all(v[i] is not None for v in series.values() if i < len(v)))
+        for name, values in series.items():
+            nulls = sum(1 for v in values if v is None)
+            if n and nulls / n > MAX_NULL_FRACTION:
+                issues.append(f"{name}: {nulls}/{n} values missing")
+    else:
+        valid = count_rows(data)
+    if valid == 0:
+        issues.append("no usable rows")
+    return valid, issues
@@ -0,0 +1,234 @@
+"""EXPLAIN ANALYZE the hot aqi_readings queries, before and after a migration.
+
+    python explain_hot_queries.py --out before.json            # on the current schema
+    psql ... -f ../migrations/003_indexes_compression.sql    # or 006_hierarchical_grid_cell.sql
+    python explain_hot_queries.py --out after.json
+    python explain_hot_queries.py --compare before.json after.json
+
+Connection settings come from --dsn or the backend's DB_USER / DB_PASSWORD / DB_HOST /
+DB_PORT / DB_NAME variables. ``--seed-stations/--seed-days`` fill an empty database
+with synthetic hourly readings around Delhi so runs are comparable across machines.
+Each query runs ``--repeat`` times; the fastest run's plan is reported (execution and
+planning time, shared buffers hit/read, rows, the indexes the plan used).
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+import asyncpg
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend"))
+
+from app.services.spatial_service import grid_cell_ranges_in_bbox  # noqa: E402
+
+# Delhi centre and a ~5 km box around it (the /historical/aqi default radius)
+CENTER_LAT, CENTER_LON = 28.6139, 77.2090
+BOX_DEG_LAT, BOX_DEG_LON = 0.045, 0.051
+# grid_cell as written by 003 and, once 006 has added core.grid_cell_key, the
+# hierarchical key
+GRID_CELL_SQL = "(floor({lat} / 0.01)::bigint + 9000) * 36000 + floor({lon} / 0.01)::bigint + 18000"
+CELL_KEY_SQL = "core.grid_cell_key({lat}, {lon})"
+MAX_FILTER_RANGES = 16  # as app.services.historical_service
+
+
+def _dsn_from_env() -> str:
+    return "postgresql://{user}:{password}@{host}:{port}/{name}".format(
+        user=os.getenv("DB_USER", ""),
+        password=os.getenv("DB_PASSWORD", ""),
+        host=os.getenv("DB_HOST", "localhost"),
+        port=os.getenv("DB_PORT", "5432"),
+        name=os.getenv("DB_NAME", ""),
+    )
+
+
+async def _has_grid_cell(conn: asyncpg.Connection) -> bool:
+    return bool(
+        await conn.fetchval(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_schema = 'core' AND table_name = 'aqi_readings' AND column_name = 'grid_cell'"
+        )
+    )
+
+
+async def _has_cell_keys(conn: asyncpg.Connection) -> bool:
+    return bool(
+        await conn.fetchval(
+            "SELECT to_regprocedure('core.grid_cell_key(double precision, double precision)') IS NOT NULL"
+        )
+    )
+
+
+async def seed(conn: asyncpg.Connection, stations: int, days: int) -> None:
+    """Insert hourly readings for ``stations`` stations spread over ~60 x 60 km."""
+    grid = await _has_grid_cell(conn)
+    columns = "id, station_id, \"timestamp\", latitude, longitude, pm2_5, pm10, aqi" + (", grid_cell" if grid else "")
+    key_sql = CELL_KEY_SQL if await _has_cell_keys(conn) else GRID_CELL_SQL
+    grid_expr = ", " + key_sql.format(lat="lat", lon="lon") if grid else ""
+    await conn.execute(
+        f"""
+INSERT INTO core.aqi_readings ({columns})
+SELECT gen_random_uuid(), 'bench_' || s, ts, lat, lon,
+       40 + 200 * random(), 80 + 300 * random(), (50 + 400 * random())::int{grid_expr}
+FROM (
+    SELECT s,
+           {CENTER_LAT} - 0.27 + 0.54 * ((s * 7919) % 1000) / 1000.0 AS lat,
+           {CENTER_LON} - 0.31 + 0.62 * ((s * 104729) % 1000) / 1000.0 AS lon
+    FROM generate_series(1, $1) AS s
+) st
+CROSS JOIN generate_series(date_trunc('hour', now()) - make_interval(days => $2), date_trunc('hour', now()), INTERVAL '1 hour') AS ts
+ON CONFLICT DO NOTHING
+""",
+        stations,
+        days,
+    )
+    await conn.execute("ANALYZE core.aqi_readings")
+
+
+async def hot_queries(conn: asyncpg.Connection) -> Dict[str, Dict[str, Any]]:
+    latest = await conn.fetchval('SELECT max("timestamp") FROM core.aqi_readings')
+    if latest is None:
+        raise SystemExit("core.aqi_readings is empty; use --seed-stations/--seed-days")
+    station = await conn.fetchval(
+        'SELECT station_id FROM core.aqi_readings WHERE "timestamp" = $1 LIMIT 1', latest
+    )
+    bbox = {
+        "min_lat": CENTER_LAT - BOX_DEG_LAT,
+        "max_lat": CENTER_LAT + BOX_DEG_LAT,
+        "min_lon": CENTER_LON - BOX_DEG_LON,
+        "max_lon": CENTER_LON + BOX_DEG_LON,
+    }
+    bbox_filter = "latitude BETWEEN $2 AND $3 AND longitude BETWEEN $4 AND $5"
+    if await _has_cell_keys(conn):
+        # Same cell ranges HistoricalService adds for small boxes
+        ranges = grid_cell_ranges_in_bbox(
+            bbox["min_lat"], bbox["max_lat"], bbox["min_lon"], bbox["max_lon"], MAX_FILTER_RANGES
+        )
+        terms = " OR ".join(f"grid_cell BETWEEN {lo} AND {hi}" for lo, hi in ranges)
+        bbox_filter = f"({terms}) AND " + bbox_filter
+    elif await _has_grid_cell(conn):
+        # Same cell filter HistoricalService adds for small boxes
+        bbox_filter = (
+            "grid_cell = ANY(ARRAY(SELECT (y + 9000) * 36000 + x + 18000 "
+            "FROM generate_series(floor($2 / 0.01)::bigint, floor($3 / 0.01)::bigint) y, "
+            "generate_series(floor($4 / 0.01)::bigint, floor($5 / 0.01)::bigint) x)) AND " + bbox_filter
+        )
+    box_args = [bbox["min_lat"], bbox["max_lat"], bbox["min_lon"], bbox["max_lon"]]
+    return {
+        "station_latest_24h": {
+            "sql": 'SELECT * FROM core.aqi_readings WHERE station_id = $1 '
+            'AND "timestamp" > $2::timestamp - INTERVAL \'24 hours\' ORDER BY "timestamp" DESC',
+            "args": [station, latest],
+        },
+        "station_latest_reading": {
+            "sql": 'SELECT * FROM core.aqi_readings WHERE station_id = $1 ORDER BY "timestamp" DESC LIMIT 1',
+            "args": [station],
+        },
+        "bbox_7d": {
+            "sql": f'SELECT * FROM core.aqi_readings WHERE "timestamp" > $1::timestamp - INTERVAL \'7 days\' '
+            f"AND {bbox_filter} ORDER BY \"timestamp\"",
+            "args": [latest, *box_args],
+        },
+        "bbox_hourly_avg_30d": {
+            "sql": f"SELECT date_trunc('hour', \"timestamp\") AS h, avg(aqi) FROM core.aqi_readings "
+            f'WHERE "timestamp" > $1::timestamp - INTERVAL \'30 days\' AND {bbox_filter} GROUP BY 1 ORDER BY 1',
+            "args": [latest, *box_args],
+        },
+    }
+
+
+def _walk(plan: Dict[str, Any], acc: Dict[str, Any]) -> None:
+    if plan.get("Index Name"):
+        acc["indexes"].add(plan["Index Name"])
+    acc["nodes"].add(plan["Node Type"])
+    for child in plan.get("Plans", []):
+        _walk(child, acc)
+
+
+async def explain(conn: asyncpg.Connection, sql: str, args: List[Any], repeat: int) -> Dict[str, Any]:
+    best: Optional[Dict[str, Any]] = None
+    for _ in range(repeat):
+        raw = await conn.fetchval(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", *args)
+        doc = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+        if best is None or doc["Execution Time"] < best["Execution Time"]:
+            best = doc
+    assert best is not None
+    plan = best["Plan"]
+    acc: Dict[str, Any] = {"indexes": set(), "nodes": set()}
+    _walk(plan, acc)
+    return {
+        "execution_ms": round(best["Execution Time"], 3),
+        "planning_ms": round(best["Planning Time"], 3),
+        "rows": plan.get("Actual Rows"),
+        "shared_hit": plan.get("Shared Hit Blocks", 0),
+        "shared_read": plan.get("Shared Read Blocks", 0),
+        "top_node": plan["Node Type"],
+        "indexes": sorted(acc["indexes"]),
+        "nodes": sorted(acc["nodes"]),
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    conn = await asyncpg.connect(args.dsn or _dsn_from_env())
+    try:
+        if args.seed_stations:
+            await seed(conn, args.seed_stations, args.seed_days)
+        report: Dict[str, Any] = {
+            "rows": await conn.fetchval("SELECT count(*) FROM core.aqi_readings"),
+            "grid_cell": await _has_grid_cell(conn),
+            "queries": {},
+        }
+        for name, q in (await hot_queries(conn)).items():
+            report["queries"][name] = await explain(conn, q["sql"], q["args"], args.repeat)
+        return report
+    finally:
+        await conn.close()
+
+
+def compare(before: Dict[str, Any], after: Dict[str, Any]) -> None:
+    print(f"rows: {before.get('rows')} -> {after.get('rows')}")
+    header = f"{'query':<24}{'exec ms':>20}{'buffers':>20}  plan"
+    print(header)
+    print("-" * len(header))
+    for name in sorted(set(before["queries"]) | set(after["queries"])):
+        a, b = before["queries"].get(name, {}), after["queries"].get(name, {})
+        exec_ms = f"{a.get('execution_ms', '-')} -> {b.get('execution_ms', '-')}"
+        buffers = (
+            f"{a.get('shared_hit', 0) + a.get('shared_read', 0)} -> "
+            f"{b.get('shared_hit', 0) + b.get('shared_read', 0)}"
+        )
+        plan = f"{','.join(a.get('indexes') or ['seq'])} -> {','.join(b.get('indexes') or ['seq'])}"
+        print(f"{name:<24}{exec_ms:>20}{buffers:>20}  {plan}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", help="postgresql:// DSN (default: built from DB_* env vars)")
+    parser.add_argument("--out", help="Write the report as JSON to this file")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query; the fastest is kept")
+    parser.add_argument("--seed-stations", type=int, default=0)
+    parser.add_argument("--seed-days", type=int, default=90)
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f:
+            before = json.load(f)
+        with open(args.compare[1], encoding="utf-8") as f:
+            after = json.load(f)
+        compare(before, after)
+        return 0
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2, default=str)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,12 +12,15 @@ CREATE SCHEMA IF NOT EXISTS core;
 CREATE SCHEMA IF NOT EXISTS analytics;
 
 -- Example hypertable for AQI readings
+-- Unique constraints on a compressed hypertable may only use the partitioning, segmentby
+-- and orderby columns, so the natural key (station_id, "timestamp") is the primary key.
 CREATE TABLE IF NOT EXISTS core.aqi_readings (
-    id UUID PRIMARY KEY,
+    id UUID NOT NULL,
     station_id TEXT NOT NULL,
     timestamp TIMESTAMPTZ NOT NULL,
     latitude DOUBLE PRECISION NOT NULL,
     longitude DOUBLE PRECISION NOT NULL,
+    grid_cell BIGINT,
     pm2_5 DOUBLE PRECISION,
     pm10 DOUBLE PRECISION,
     no2 DOUBLE PRECISION,
@@ -32,7 +35,8 @@ CREATE TABLE IF NOT EXISTS core.aqi_readings (
     wind_direction DOUBLE PRECISION,
     pressure DOUBLE PRECISION,
     data_source TEXT DEFAULT 'CPCB',
-    quality_flag TEXT DEFAULT 'valid'
+    quality_flag TEXT DEFAULT 'valid',
+    CONSTRAINT pk_aqi_readings PRIMARY KEY (station_id, "timestamp")
 );
 
 SELECT create_hypertable('core.aqi_readings', 'timestamp', if_not_exists => TRUE);
@@ -41,4 +45,4 @@ SELECT create_hypertable('core.aqi_readings', 'timestamp', if_not_exists => TRUE
 -- SELECT AddGeometryColumn('core', 'aqi_readings', 'geom', 4326, 'POINT', 2);
 -- CREATE INDEX IF NOT EXISTS idx_aqi_geom ON core.aqi_readings USING GIST (geom);
 
--- Additional tables can be created later via migrations
\ No newline at end of file
+-- Additional tables, rollups and policies are applied from database/migrations/ in order
\ No newline at end of file
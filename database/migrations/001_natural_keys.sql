@@ -0,0 +1,14 @@
+-- Natural keys used by the COPY bulk loader (backend/app/services/bulk_loader.py)
+-- for its staging-table upserts. New databases get these from the ORM models via
+-- init_db(); apply this file to databases created before the constraints existed.
+-- Existing duplicates must be removed first or the ALTERs will fail.
+
+ALTER TABLE core.aqi_readings
+    ADD CONSTRAINT uq_aqi_readings_station_id UNIQUE (station_id, "timestamp");
+
+ALTER TABLE fire_hotspots
+    ADD CONSTRAINT uq_fire_hotspots_timestamp UNIQUE ("timestamp", latitude, longitude, satellite);
+
+ALTER TABLE aqi_forecasts
+    ADD CONSTRAINT uq_aqi_forecasts_forecast_timestamp
+    UNIQUE (forecast_timestamp, target_timestamp, latitude, longitude, model_version);
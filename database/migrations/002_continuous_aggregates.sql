@@ -0,0 +1,112 @@
+-- Hourly and daily AQI rollups over core.aqi_readings, per station and per grid cell,
+-- kept up to date by continuous-aggregate refresh policies. HistoricalService
+-- (backend/app/services/historical_service.py) reads these instead of scanning raw
+-- readings for ranges longer than a couple of days.
+--
+-- Percentiles use timescaledb_toolkit's percentile_agg() so the daily rollups can be
+-- built from the hourly ones with rollup(). The toolkit ships with the
+-- timescale/timescaledb-ha images; on timescale/timescaledb:latest-pg14 install it first.
+--
+-- Averages are stored as sum + count (avg = sum_x / n_x) so coarser rollups, and
+-- averages across several stations or cells, stay exact.
+--
+-- Grid cells are 0.01 degree (~1.1 km) lat/lon squares: cell_y = floor(lat / 0.01),
+-- cell_x = floor(lon / 0.01).
+
+CREATE EXTENSION IF NOT EXISTS timescaledb_toolkit;
+
+-- Hourly per station ---------------------------------------------------------------
+CREATE MATERIALIZED VIEW IF NOT EXISTS analytics.aqi_hourly_station
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT
+    time_bucket(INTERVAL '1 hour', "timestamp") AS bucket,
+    station_id,
+    avg(latitude) AS latitude,
+    avg(longitude) AS longitude,
+    count(*) AS samples,
+    sum(aqi) AS sum_aqi, count(aqi) AS n_aqi, min(aqi) AS min_aqi, max(aqi) AS max_aqi,
+    percentile_agg(aqi) AS pct_aqi,
+    sum(pm2_5) AS sum_pm2_5, count(pm2_5) AS n_pm2_5, min(pm2_5) AS min_pm2_5, max(pm2_5) AS max_pm2_5,
+    percentile_agg(pm2_5) AS pct_pm2_5,
+    sum(pm10) AS sum_pm10, count(pm10) AS n_pm10, min(pm10) AS min_pm10, max(pm10) AS max_pm10,
+    percentile_agg(pm10) AS pct_pm10
+FROM core.aqi_readings
+GROUP BY bucket, station_id
+WITH NO DATA;
+
+-- Hourly per grid cell -------------------------------------------------------------
+CREATE MATERIALIZED VIEW IF NOT EXISTS analytics.aqi_hourly_cell
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT
+    time_bucket(INTERVAL '1 hour', "timestamp") AS bucket,
+    floor(latitude / 0.01)::int AS cell_y,
+    floor(longitude / 0.01)::int AS cell_x,
+    count(*) AS samples,
+    sum(aqi) AS sum_aqi, count(aqi) AS n_aqi, min(aqi) AS min_aqi, max(aqi) AS max_aqi,
+    percentile_agg(aqi) AS pct_aqi,
+    sum(pm2_5) AS sum_pm2_5, count(pm2_5) AS n_pm2_5, min(pm2_5) AS min_pm2_5, max(pm2_5) AS max_pm2_5,
+    percentile_agg(pm2_5) AS pct_pm2_5,
+    sum(pm10) AS sum_pm10, count(pm10) AS n_pm10, min(pm10) AS min_pm10, max(pm10) AS max_pm10,
+    percentile_agg(pm10) AS pct_pm10
+FROM core.aqi_readings
+GROUP BY bucket, cell_y, cell_x
+WITH NO DATA;
+
+-- Daily rollups, built on the hourly ones (hierarchical continuous aggregates) ------
+CREATE MATERIALIZED VIEW IF NOT EXISTS analytics.aqi_daily_station
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT
+    time_bucket(INTERVAL '1 day', bucket) AS bucket,
+    station_id,
+    avg(latitude) AS latitude,
+    avg(longitude) AS longitude,
+    sum(samples) AS samples,
+    sum(sum_aqi) AS sum_aqi, sum(n_aqi) AS n_aqi, min(min_aqi) AS min_aqi, max(max_aqi) AS max_aqi,
+    rollup(pct_aqi) AS pct_aqi,
+    sum(sum_pm2_5) AS sum_pm2_5, sum(n_pm2_5) AS n_pm2_5, min(min_pm2_5) AS min_pm2_5, max(max_pm2_5) AS max_pm2_5,
+    rollup(pct_pm2_5) AS pct_pm2_5,
+    sum(sum_pm10) AS sum_pm10, sum(n_pm10) AS n_pm10, min(min_pm10) AS min_pm10, max(max_pm10) AS max_pm10,
+    rollup(pct_pm10) AS pct_pm10
+FROM analytics.aqi_hourly_station
+GROUP BY 1, station_id
+WITH NO DATA;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS analytics.aqi_daily_cell
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT
+    time_bucket(INTERVAL '1 day', bucket) AS bucket,
+    cell_y,
+    cell_x,
+    sum(samples) AS samples,
+    sum(sum_aqi) AS sum_aqi, sum(n_aqi) AS n_aqi, min(min_aqi) AS min_aqi, max(max_aqi) AS max_aqi,
+    rollup(pct_aqi) AS pct_aqi,
+    sum(sum_pm2_5) AS sum_pm2_5, sum(n_pm2_5) AS n_pm2_5, min(min_pm2_5) AS min_pm2_5, max(max_pm2_5) AS max_pm2_5,
+    rollup(pct_pm2_5) AS pct_pm2_5,
+    sum(sum_pm10) AS sum_pm10, sum(n_pm10) AS n_pm10, min(min_pm10) AS min_pm10, max(max_pm10) AS max_pm10,
+    rollup(pct_pm10) AS pct_pm10
+FROM analytics.aqi_hourly_cell
+GROUP BY 1, cell_y, cell_x
+WITH NO DATA;
+
+-- Refresh policies -----------------------------------------------------------------
+-- Hourly rollups trail ingestion by one hour and re-materialise the last three days so
+-- late OpenAQ/CPCB readings are picked up; real-time aggregation (materialized_only =
+-- false) covers the still-open hour. Daily rollups refresh from the hourly ones.
+SELECT add_continuous_aggregate_policy('analytics.aqi_hourly_station',
+    start_offset => INTERVAL '3 days', end_offset => INTERVAL '1 hour',
+    schedule_interval => INTERVAL '30 minutes', if_not_exists => TRUE);
+SELECT add_continuous_aggregate_policy('analytics.aqi_hourly_cell',
+    start_offset => INTERVAL '3 days', end_offset => INTERVAL '1 hour',
+    schedule_interval => INTERVAL '30 minutes', if_not_exists => TRUE);
+SELECT add_continuous_aggregate_policy('analytics.aqi_daily_station',
+    start_offset => INTERVAL '30 days', end_offset => INTERVAL '1 day',
+    schedule_interval => INTERVAL '1 hour', if_not_exists => TRUE);
+SELECT add_continuous_aggregate_policy('analytics.aqi_daily_cell',
+    start_offset => INTERVAL '30 days', end_offset => INTERVAL '1 day',
+    schedule_interval => INTERVAL '1 hour', if_not_exists => TRUE);
+
+-- Backfill existing history once (policies only look back start_offset):
+--   CALL refresh_continuous_aggregate('analytics.aqi_hourly_station', NULL, now() - INTERVAL '1 hour');
+--   CALL refresh_continuous_aggregate('analytics.aqi_hourly_cell', NULL, now() - INTERVAL '1 hour');
+--   CALL refresh_continuous_aggregate('analytics.aqi_daily_station', NULL, now() - INTERVAL '1 day');
+--   CALL refresh_continuous_aggregate('analytics.aqi_daily_cell', NULL, now() - INTERVAL '1 day');
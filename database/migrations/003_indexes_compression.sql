@@ -0,0 +1,60 @@
+-- Indexes and compression shaped by the hot queries:
+--   * "latest N hours for station X"  -> the (station_id, "timestamp") primary key,
+--                                        scanned backwards for newest-first reads
+--   * "bbox over a time range"        -> grid_cell column + (grid_cell, "timestamp" DESC)
+-- grid_cell packs the 0.01 degree cell of (latitude, longitude) into one integer; the
+-- application fills it on insert (app.services.spatial_service.grid_cell_id) and this
+-- migration backfills existing rows with the same formula. Compressed chunks are
+-- segmented by station_id so per-station reads decompress only that station's segment.
+--
+-- Measure before and after with database/benchmarks/explain_hot_queries.py.
+
+-- grid_cell columns + backfill (before compression: updates on compressed chunks are slow)
+ALTER TABLE core.aqi_readings ADD COLUMN IF NOT EXISTS grid_cell BIGINT;
+ALTER TABLE fire_hotspots ADD COLUMN IF NOT EXISTS grid_cell BIGINT;
+ALTER TABLE aqi_forecasts ADD COLUMN IF NOT EXISTS grid_cell BIGINT;
+
+UPDATE core.aqi_readings
+SET grid_cell = (floor(latitude / 0.01)::bigint + 9000) * 36000 + floor(longitude / 0.01)::bigint + 18000
+WHERE grid_cell IS NULL;
+UPDATE fire_hotspots
+SET grid_cell = (floor(latitude / 0.01)::bigint + 9000) * 36000 + floor(longitude / 0.01)::bigint + 18000
+WHERE grid_cell IS NULL;
+UPDATE aqi_forecasts
+SET grid_cell = (floor(latitude / 0.01)::bigint + 9000) * 36000 + floor(longitude / 0.01)::bigint + 18000
+WHERE grid_cell IS NULL;
+
+-- Natural key as primary key; (id, "timestamp") and the separate unique constraint
+-- would block compression segmented by station_id.
+ALTER TABLE core.aqi_readings DROP CONSTRAINT IF EXISTS uq_aqi_readings_station_id;
+ALTER TABLE core.aqi_readings DROP CONSTRAINT IF EXISTS pk_aqi_readings;
+ALTER TABLE core.aqi_readings ADD CONSTRAINT pk_aqi_readings PRIMARY KEY (station_id, "timestamp");
+
+-- Composite indexes. The primary key covers both the single-column station_id index
+-- and a separate (station_id, "timestamp" DESC) index (a btree scans backwards as
+-- well), so neither is kept: each would only add work to every ingest.
+DROP INDEX IF EXISTS core.ix_aqi_readings_station_id_timestamp;
+CREATE INDEX IF NOT EXISTS ix_aqi_readings_grid_cell_timestamp
+    ON core.aqi_readings (grid_cell, "timestamp" DESC);
+DROP INDEX IF EXISTS core.ix_core_aqi_readings_station_id;
+CREATE INDEX IF NOT EXISTS ix_fire_hotspots_grid_cell_timestamp
+    ON fire_hotspots (grid_cell, "timestamp");
+CREATE INDEX IF NOT EXISTS ix_aqi_forecasts_grid_cell_target_timestamp
+    ON aqi_forecasts (grid_cell, target_timestamp);
+
+ANALYZE core.aqi_readings;
+ANALYZE fire_hotspots;
+ANALYZE aqi_forecasts;
+
+-- Compression: chunks older than 7 days (past the 3-day rollup refresh window and the
+-- late-arrival window of the ingestors) are compressed per station, newest first.
+ALTER TABLE core.aqi_readings SET (
+    timescaledb.compress,
+    timescaledb.compress_segmentby = 'station_id',
+    timescaledb.compress_orderby = '"timestamp" DESC'
+);
+SELECT add_compression_policy('core.aqi_readings', INTERVAL '7 days', if_not_exists => TRUE);
+
+-- Retention is deliberately not enabled: raw readings back the NDJSON/CSV export and
+-- the rollups are refreshed from them. To cap raw history, e.g.:
+--   SELECT add_retention_policy('core.aqi_readings', INTERVAL '3 years', if_not_exists => TRUE);
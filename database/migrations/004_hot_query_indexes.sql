@@ -0,0 +1,10 @@
+-- Indexes backing the prepared hot-path queries in app.services.query_catalog:
+--   * alerts_by_user     -> health_recommendations (user_id, "timestamp" DESC)
+--   * forecasts_by_cell  -> aqi_forecasts (grid_cell, target_timestamp), see 003
+--   * latest_reading_by_station -> core.aqi_readings (station_id, "timestamp" DESC), see 003
+
+CREATE INDEX IF NOT EXISTS ix_health_recommendations_user_id_timestamp
+    ON health_recommendations (user_id, "timestamp" DESC);
+DROP INDEX IF EXISTS ix_health_recommendations_user_id;
+
+ANALYZE health_recommendations;
@@ -0,0 +1,47 @@
+-- Latest reading per station, maintained by the application on ingest: every bulk load
+-- of core.aqi_readings upserts the stations it touched in the same transaction
+-- (app.services.station_service.refresh_latest_readings). Station-map and "current
+-- AQI" reads then cost one row per station instead of a DISTINCT ON over the history.
+
+CREATE TABLE IF NOT EXISTS core.latest_readings (
+    station_id TEXT PRIMARY KEY,
+    reading_id UUID NOT NULL,
+    timestamp TIMESTAMPTZ NOT NULL,
+    latitude DOUBLE PRECISION NOT NULL,
+    longitude DOUBLE PRECISION NOT NULL,
+    grid_cell BIGINT,
+    pm2_5 DOUBLE PRECISION,
+    pm10 DOUBLE PRECISION,
+    no2 DOUBLE PRECISION,
+    so2 DOUBLE PRECISION,
+    o3 DOUBLE PRECISION,
+    co DOUBLE PRECISION,
+    aqi INTEGER,
+    aqi_category TEXT,
+    temperature DOUBLE PRECISION,
+    humidity DOUBLE PRECISION,
+    wind_speed DOUBLE PRECISION,
+    wind_direction DOUBLE PRECISION,
+    pressure DOUBLE PRECISION,
+    data_source TEXT,
+    quality_flag TEXT,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS ix_latest_readings_grid_cell ON core.latest_readings (grid_cell);
+
+-- One-off backfill from history; walks (station_id, "timestamp" DESC) from 003
+INSERT INTO core.latest_readings (
+    station_id, reading_id, "timestamp", latitude, longitude, grid_cell,
+    pm2_5, pm10, no2, so2, o3, co, aqi, aqi_category,
+    temperature, humidity, wind_speed, wind_direction, pressure, data_source, quality_flag
+)
+SELECT DISTINCT ON (station_id)
+    station_id, id, "timestamp", latitude, longitude, grid_cell,
+    pm2_5, pm10, no2, so2, o3, co, aqi, aqi_category,
+    temperature, humidity, wind_speed, wind_direction, pressure, data_source, quality_flag
+FROM core.aqi_readings
+ORDER BY station_id, "timestamp" DESC
+ON CONFLICT (station_id) DO NOTHING;
+
+ANALYZE core.latest_readings;
@@ -0,0 +1,36 @@
+-- Hierarchical grid_cell keys: the 0.01 degree cell of (latitude, longitude) is now the
+-- finest level of a 16-level quadtree whose keys interleave the bits of (cell_y, cell_x)
+-- in Z-order followed by a marker bit (app.services.spatial_service, CELL_LEVELS).
+-- Every coarser cell then covers one contiguous range of finest keys, so bbox filters
+-- become a handful of "grid_cell BETWEEN lo AND hi" range scans on the existing
+-- (grid_cell, "timestamp") indexes instead of one long "grid_cell = ANY(...)" list.
+--
+-- The application writes the new keys from this release on; this migration rewrites
+-- the stored ones with the same formula. Deploy the two together: until it has run,
+-- bbox reads miss rows that still carry the 003 keys.
+--
+-- Measure before and after with database/benchmarks/explain_hot_queries.py.
+
+CREATE OR REPLACE FUNCTION core.grid_cell_key(lat DOUBLE PRECISION, lon DOUBLE PRECISION)
+RETURNS BIGINT
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT (2 * sum(
+        ((((floor(lat / 0.01)::bigint + 9000) >> b) & 1) << (2 * b + 1))
+        | ((((floor(lon / 0.01)::bigint + 18000) >> b) & 1) << (2 * b))
+    ) + 1)::bigint
+    FROM generate_series(0, 15) AS b
+$$;
+
+-- Updates on compressed chunks are slow; decompress first; the compression policy
+-- from 003 recompresses chunks older than 7 days on its next run.
+SELECT decompress_chunk(c, if_compressed => TRUE) FROM show_chunks('core.aqi_readings') AS c;
+
+UPDATE core.aqi_readings SET grid_cell = core.grid_cell_key(latitude, longitude);
+UPDATE core.latest_readings SET grid_cell = core.grid_cell_key(latitude, longitude);
+UPDATE fire_hotspots SET grid_cell = core.grid_cell_key(latitude, longitude);
+UPDATE aqi_forecasts SET grid_cell = core.grid_cell_key(latitude, longitude);
+
+ANALYZE core.aqi_readings;
+ANALYZE core.latest_readings;
+ANALYZE fire_hotspots;
+ANALYZE aqi_forecasts;
@@ -1,5 +1,6 @@
 # [file name]: ml-models/fetch_data.py
 """Data pipeline to fetch air quality and weather data from Open-Meteo API."""
+import os
 import requests
 import json
 from pathlib import Path
@@ -9,9 +10,13 @@ from config import DATA_OUTPUT_DIR
 DELHI_LAT = 28.6139
 DELHI_LON = 77.2090
 
+# Same overrides as data-pipeline ingestors (point at the replay stand-in for offline runs)
+OPEN_METEO_BASE = os.getenv("OPEN_METEO_BASE", "https://api.open-meteo.com/v1")
+OPEN_METEO_AIR_BASE = os.getenv("OPEN_METEO_AIR_BASE", "https://air-quality-api.open-meteo.com/v1")
+
 def fetch_air_quality_data():
     """Fetch air quality data from Open-Meteo API."""
-    url = "https://air-quality-api.open-meteo.com/v1/air-quality"
+    url = f"{OPEN_METEO_AIR_BASE}/air-quality"
     params = {
         'latitude': DELHI_LAT,
         'longitude': DELHI_LON,
@@ -27,7 +32,7 @@ def fetch_air_quality_data():
 
 def fetch_weather_data():
     """Fetch weather data from Open-Meteo API."""
-    url = "https://api.open-meteo.com/v1/forecast"
+    url = f"{OPEN_METEO_BASE}/forecast"
     params = {
         'latitude': DELHI_LAT,
         'longitude': DELHI_LON,
@@ -2,6 +2,7 @@ from __future__ import annotations
 from pathlib import Path
 import json
 import joblib
+import numpy as np
 import pandas as pd
 from typing import Dict, Any
 from config import MODEL_BUNDLE_PATH, AQI_BREAKPOINTS_PM25, CATEGORY_LABELS
@@ -16,6 +17,17 @@ def pm25_to_aqi(pm25: float) -> int:
     return 500
 
 
+def pm25_to_aqi_array(pm25: np.ndarray) -> np.ndarray:
+    """Vectorized ``pm25_to_aqi`` (int array, same shape)."""
+    pm25 = np.asarray(pm25, dtype=np.float64)
+    aqi = np.full(pm25.shape, 500, dtype=np.int64)
+    # Walk the ranges high to low so a shared boundary takes the lower band, as above
+    for low_c, high_c, low_i, high_i in reversed(AQI_BREAKPOINTS_PM25):
+        band = (pm25 >= low_c) & (pm25 <= high_c)
+        aqi[band] = ((high_i - low_i) / (high_c - low_c) * (pm25[band] - low_c) + low_i).astype(np.int64)
+    return aqi
+
+
 def aqi_category(aqi: int) -> str:
     idx = 0
     if aqi <= 50:
@@ -49,3 +61,8 @@ def predict_pm25(bundle: Dict[str, Any], row: Dict[str, Any]) -> Dict[str, Any]:
     pm25 = float(pipe.predict(df)[0])
     aqi = pm25_to_aqi(pm25)
     return {"pm25": pm25, "aqi": aqi, "category": aqi_category(aqi)}
+
+
+def predict_pm25_batch(bundle: Dict[str, Any], rows: pd.DataFrame) -> np.ndarray:
+    """PM2.5 for every row of ``rows`` in one pipeline call."""
+    return np.asarray(bundle["pipeline"].predict(rows[bundle["feature_columns"]]), dtype=np.float64)